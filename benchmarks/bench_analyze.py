@@ -0,0 +1,129 @@
+"""/analyze 전체 파이프라인 벤치마크 (녹화된 업스트림 응답 재생)
+
+UPSTREAM_MODE=replay로 fixtures/manifest.json의 keywordstool JSON과 SERP HTML을 재생하므로
+네이버를 호출하지 않고 같은 입력으로 반복 측정할 수 있습니다.
+
+    python benchmarks/bench_analyze.py --requests 500 --concurrency 1,10,50
+    python benchmarks/bench_analyze.py --json before.json
+    python benchmarks/bench_analyze.py --compare before.json --max-regression 0.1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="/analyze 파이프라인 벤치마크")
+    parser.add_argument("--requests", type=int, default=300, help="동시 처리 수마다 보낼 요청 수")
+    parser.add_argument("--concurrency", default="1,10,50", help="쉼표로 구분한 동시 요청 수 목록")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--keyword", default="청라 영어학원")
+    parser.add_argument("--place-url", default="https://m.place.naver.com/place/1003")
+    parser.add_argument("--cache", action="store_true", help="검색량/순위 캐시 사용 (기본: 매 요청 전체 파이프라인 실행)")
+    parser.add_argument("--parse-workers", help="SERP 파싱 프로세스 수 (기본: PARSE_WORKERS 환경 변수)")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0, help="재생 응답마다 더할 지연")
+    parser.add_argument("--fixtures", default=os.path.join(ROOT, "fixtures"))
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--metric", default="p95", choices=["mean", "p50", "p95", "p99"])
+    parser.add_argument("--max-regression", type=float, default=0.1, help="허용 지연 증가 비율")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """main 임포트 전에 재생 모드와 측정에 방해되는 기능 설정"""
+    os.environ["UPSTREAM_MODE"] = "replay"
+    os.environ["FIXTURES_DIR"] = args.fixtures
+    os.environ["REPLAY_LATENCY_MS"] = str(args.upstream_latency_ms)
+    os.environ.setdefault("CACHE_BACKEND", "memory")
+    os.environ.setdefault("KEYWORDSTOOL_RPS", "1000000")
+    os.environ.setdefault("KEYWORDSTOOL_BURST", "1000000")
+    os.environ.setdefault("RANK_HISTORY_ENABLED", "0")
+    os.environ.setdefault("TRACKER_ENABLED", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.parse_workers is not None:
+        os.environ["PARSE_WORKERS"] = args.parse_workers
+    if not args.cache:
+        os.environ["KEYWORD_CACHE_TTL"] = "0"
+        os.environ["SERP_CACHE_TTL"] = "0"
+
+
+async def run_load(client, args, concurrency, count, offset):
+    """고정 개수 워커로 count개 요청, 요청별 지연(ms) 반환"""
+    timings = []
+    errors = 0
+    pending = iter(range(count))
+
+    async def worker():
+        nonlocal errors
+        for index in pending:
+            # 키워드를 요청마다 다르게 해서 single-flight 병합 없이 측정 (픽스처는 "*" 항목 재생)
+            keyword = args.keyword if args.cache else f"{args.keyword} {offset + index}"
+            started = time.perf_counter()
+            response = await client.post("/analyze", json={"keyword": keyword, "placeUrl": args.place_url})
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200 or not response.json().get("success"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return timings, errors, time.perf_counter() - started
+
+
+async def bench(args):
+    import httpx
+    import main
+    from report import latency_summary
+
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            await run_load(client, args, 1, args.warmup, offset=10_000_000)
+            print(f"  {'name':<16}{'req/s':>10}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}")
+            for offset, concurrency in enumerate(int(value) for value in args.concurrency.split(",")):
+                timings, errors, elapsed = await run_load(client, args, concurrency, args.requests, offset * args.requests)
+                summary = latency_summary(timings)
+                summary.update(throughput=round(len(timings) / elapsed, 1), errors=errors, concurrency=concurrency)
+                name = f"analyze@c{concurrency}"
+                results[name] = summary
+                print(
+                    f"  {name:<16}{summary['throughput']:>10.1f}{summary['mean']:>8.2f}ms{summary['p50']:>8.2f}ms"
+                    f"{summary['p95']:>8.2f}ms{summary['p99']:>8.2f}ms{errors:>8}"
+                )
+    return results, main
+
+
+def main_cli():
+    args = parse_args()
+    configure_environment(args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from report import compare_results, environment, exit_code, save_results
+
+    print(
+        f"요청 {args.requests}개 × 동시 {args.concurrency} / 캐시 {'on' if args.cache else 'off'} / "
+        f"재생 지연 {args.upstream_latency_ms}ms / 파싱 프로세스 {os.getenv('PARSE_WORKERS', 'auto')}\n"
+    )
+    results, main = asyncio.run(bench(args))
+
+    env = environment(
+        parser=main.get_parser_backend().name,
+        cache=args.cache,
+        parseWorkers=main.PARSE_WORKERS,
+        upstreamLatencyMs=args.upstream_latency_ms,
+        requests=args.requests,
+    )
+    if args.json:
+        save_results(args.json, results, env)
+    if args.compare:
+        return exit_code(compare_results(args.compare, results, args.metric, args.max_regression))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
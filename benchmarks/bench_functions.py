@@ -0,0 +1,94 @@
+"""/analyze 단계별 함수 마이크로 벤치마크 (녹화된 픽스처 입력)
+
+fixtures/manifest.json의 "*" 항목(keywordstool JSON, SERP HTML)을 입력으로 각 함수의 1회 호출 시간을 측정합니다.
+반복 묶음(--repeat)마다 1회 평균을 구해 p50을 비교 기준으로 사용합니다.
+
+    python benchmarks/bench_functions.py --json before.json
+    python benchmarks/bench_functions.py --compare before.json
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import main
+
+from report import compare_results, environment, exit_code, latency_summary, save_results
+
+
+def load_fixture(kind, fixtures):
+    with open(os.path.join(fixtures, "manifest.json"), encoding="utf-8") as f:
+        path = json.load(f)[kind]["*"]
+    with open(os.path.join(fixtures, path), encoding="utf-8") as f:
+        return f.read()
+
+
+def build_cases(fixtures):
+    """(이름, 호출 함수) 목록"""
+    html = load_fixture("serp", fixtures)
+    api_response = {"success": True, "data": json.loads(load_fixture("keywordstool", fixtures))}
+    ranking = main.parse_place_list(html)
+    competitors = ranking["competitors"]
+    target_url = competitors[-1]["url"] if competitors else ""
+    keyword = "인천 서구 청라 영어학원"
+    core_keyword = main.strip_regions(keyword)[0]
+    options = main.RelatedKeywordOptions(sortBy="monthlySearchVolume", limit=50, maxCompetition="높음")
+    cache_value = main.dump_cache_value(api_response)
+
+    return [
+        ("parse_place_list", lambda: main.parse_place_list(html)),
+        ("analyze_keyword_list", lambda: main.analyze_keyword_list(api_response, keyword, core_keyword)),
+        ("analyze_keyword_list+opts", lambda: main.analyze_keyword_list(api_response, keyword, core_keyword, related_options=options)),
+        ("extract_competitor_keywords", lambda: main.extract_competitor_keywords(competitors)),
+        ("strip_regions", lambda: main.strip_regions.__wrapped__(keyword)),
+        ("find_my_rank", lambda: main.find_my_rank(competitors, target_url)),
+        ("dump_cache_value", lambda: main.dump_cache_value(api_response)),
+        ("load_cache_value", lambda: main.load_cache_value(cache_value)),
+    ]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="단계별 함수 마이크로 벤치마크")
+    parser.add_argument("--fixtures", default=os.path.join(ROOT, "fixtures"))
+    parser.add_argument("--repeat", type=int, default=15, help="측정 묶음 수")
+    parser.add_argument("--min-time", type=float, default=0.05, help="묶음당 최소 측정 시간 (초)")
+    parser.add_argument("--only", help="쉼표로 구분한 측정 대상 이름")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--metric", default="p50", choices=["mean", "p50", "p95", "p99"])
+    parser.add_argument("--max-regression", type=float, default=0.15, help="허용 시간 증가 비율")
+    args = parser.parse_args()
+
+    cases = build_cases(args.fixtures)
+    if args.only:
+        names = set(args.only.split(","))
+        cases = [case for case in cases if case[0] in names]
+
+    print(f"파서: {main.get_parser_backend().name} / 묶음 {args.repeat}회 (값은 1회 호출 us)\n")
+    print(f"  {'name':<28}{'p50':>10}{'p95':>10}{'min':>10}")
+    results = {}
+    for name, func in cases:
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()  # 묶음당 0.2초 이상 되는 반복 횟수
+        number = max(1, int(number * args.min_time / 0.2))
+        per_call_us = [elapsed / number * 1_000_000 for elapsed in timer.repeat(repeat=args.repeat, number=number)]
+        summary = latency_summary(per_call_us)
+        summary["min"] = round(min(per_call_us), 3)
+        results[name] = summary
+        print(f"  {name:<28}{summary['p50']:>10.1f}{summary['p95']:>10.1f}{summary['min']:>10.1f}")
+
+    env = environment(parser=main.get_parser_backend().name, unit="us")
+    if args.json:
+        save_results(args.json, results, env)
+    if args.compare:
+        return exit_code(compare_results(args.compare, results, args.metric, args.max_regression))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
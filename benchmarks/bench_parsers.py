@@ -0,0 +1,72 @@
+"""SERP HTML 파서 백엔드 비교 벤치마크
+
+저장된 모바일 통합검색 HTML(fixtures/serp/*.html)로 백엔드별 parse_place_list 시간을 측정합니다.
+
+    python benchmarks/bench_parsers.py --iterations 50
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import main
+
+from report import percentile
+
+
+def bench(html: str, backend, iterations: int):
+    timings = []
+    result = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = main.parse_place_list(html, backend)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="SERP 파서 백엔드 벤치마크")
+    parser.add_argument("--fixtures", default=os.path.join(ROOT, "fixtures", "serp"))
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--backends", default=",".join(main.PARSER_BACKENDS))
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+    if not files:
+        print(f"❌ 픽스처 없음: {args.fixtures}")
+        return 1
+
+    backends = [main.PARSER_BACKENDS[name] for name in args.backends.split(",") if name in main.PARSER_BACKENDS]
+    print(f"백엔드: {', '.join(b.name for b in backends)} / 반복: {args.iterations}회\n")
+
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        print(f"📄 {os.path.basename(path)} ({len(html.encode('utf-8')) / 1024:.0f} KB)")
+        print(f"  {'backend':<12}{'mean':>10}{'p50':>10}{'p95':>10}{'places':>8}")
+
+        baseline = None
+        for backend in backends:
+            timings, result = bench(html, backend, args.iterations)
+            competitors = result.get("competitors", [])
+            print(
+                f"  {backend.name:<12}{statistics.mean(timings):>8.2f}ms{percentile(timings, 50):>8.2f}ms"
+                f"{percentile(timings, 95):>8.2f}ms{len(competitors):>8}"
+            )
+            # 모든 백엔드가 같은 결과를 내는지 확인
+            if baseline is None:
+                baseline = competitors
+            elif competitors != baseline:
+                print(f"  ⚠️  {backend.name} 결과가 {backends[0].name}와 다름")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,62 @@
+"""지역명 제거 마이크로 벤치마크
+
+기존 방식(지역명마다 str.replace 반복)과 컴파일된 정규식 한 번 적용(strip_regions)을 비교합니다.
+
+    python benchmarks/bench_regions.py --iterations 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import main
+
+KEYWORDS = [
+    "영어학원", "청라 수학학원", "인천 서구 영어학원", "송도 피아노학원", "분당 신도시 논술",
+    "강남 코딩학원", "해운대 미술학원", "부천 태권도", "일산 수영장", "남양주 검도",
+]
+
+
+def legacy_strip(keyword: str) -> str:
+    """기존 구현 (지역명 목록을 순서대로 replace)"""
+    core_keyword = keyword
+    for region in main.REGIONS:
+        core_keyword = core_keyword.replace(region + " ", "").replace(region, "")
+    return core_keyword.strip()
+
+
+def compiled_strip(keyword: str) -> str:
+    """캐시를 거치지 않은 정규식 1회 적용"""
+    return main.strip_regions.__wrapped__(keyword)[0]
+
+
+def cached_strip(keyword: str) -> str:
+    """요청 내 재사용 (lru_cache 적중)"""
+    return main.strip_regions(keyword)[0]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="지역명 제거 벤치마크")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"지역명 {len(main.REGIONS)}개 / 키워드 {len(KEYWORDS)}개 / 반복 {args.iterations}회\n")
+    print(f"  {'방식':<10}{'키워드당':>12}")
+    for name, func in (("legacy", legacy_strip), ("compiled", compiled_strip), ("cached", cached_strip)):
+        elapsed = timeit.timeit(lambda: [func(keyword) for keyword in KEYWORDS], number=args.iterations)
+        per_keyword_us = elapsed / (args.iterations * len(KEYWORDS)) * 1_000_000
+        print(f"  {name:<10}{per_keyword_us:>10.2f}us")
+
+    # 결과가 달라지는 키워드 표시 (기존 구현은 목록 순서에 따라 부분 문자열을 지움)
+    for keyword in KEYWORDS:
+        if legacy_strip(keyword) != compiled_strip(keyword):
+            print(f"  ⚠️  '{keyword}': legacy='{legacy_strip(keyword)}' compiled='{compiled_strip(keyword)}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,241 @@
+"""부하 테스트용 가짜 네이버 업스트림 (keywordstool + 모바일 통합검색)
+
+fixtures/manifest.json의 응답을 돌려주면서 지연 분포, 오류율, 호출 제한(429), 차단 페이지를 주입합니다.
+keywordstool은 실제 API처럼 X-Timestamp/X-API-KEY/X-Customer/X-Signature(HMAC-SHA256)를 검사합니다.
+
+    python benchmarks/fake_naver.py --port 9100 --kw-latency lognormal:150,0.6 --kw-rps 5 --serp-error-rate 0.02
+
+API 서버는 가짜 업스트림을 보도록 실행합니다.
+
+    KEYWORDSTOOL_BASE_URL=http://127.0.0.1:9100 SERP_BASE_URL=http://127.0.0.1:9100 uvicorn main:app --port 8000
+
+실행 중 설정 변경: POST /__stub/config {"keywordstool": {"errorRate": 0.1}}, 통계: GET /__stub/stats
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BLOCKED_HTML = "<html><head><title>네이버</title></head><body><div id='captcha'>자동입력 방지</div></body></html>"
+
+
+def parse_latency(spec):
+    """지연 분포(ms) 문자열을 샘플 함수로 변환
+
+    0 | fixed:100 | uniform:50-300 | normal:200,50 | lognormal:200,0.5 (중앙값, sigma)
+    """
+    kind, _, value = spec.partition(":")
+    if not value:
+        fixed = float(kind)
+        return lambda: fixed
+    if kind == "fixed":
+        fixed = float(value)
+        return lambda: fixed
+    if kind == "uniform":
+        low, high = (float(part) for part in value.split("-"))
+        return lambda: random.uniform(low, high)
+    first, second = (float(part) for part in value.split(","))
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(first, second))
+    if kind == "lognormal":
+        mu = math.log(first)
+        return lambda: random.lognormvariate(mu, second)
+    raise ValueError(f"알 수 없는 지연 분포: {spec}")
+
+
+class Throttle:
+    """초당 rps, 순간 burst개까지 허용 (초과 시 429)"""
+
+    def __init__(self, rps, burst):
+        self.rps = rps
+        self.burst = burst or max(1.0, rps)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def allow(self):
+        if not self.rps:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rps)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class UpstreamBehavior:
+    """업스트림 1개의 주입 설정과 응답 통계"""
+
+    def __init__(self, latency="0", error_rate=0.0, error_status=500, rps=0.0, burst=0.0, block_rate=0.0):
+        self.stats = {}
+        self.latency = latency
+        self._sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.block_rate = block_rate
+        self.throttle = Throttle(rps, burst)
+
+    def configure(self, **changes):
+        """실행 중 설정 변경 (지정한 항목만)"""
+        if "latency" in changes:
+            self._sample_latency = parse_latency(changes["latency"])
+            self.latency = changes["latency"]
+        self.error_rate = float(changes.get("errorRate", self.error_rate))
+        self.error_status = int(changes.get("errorStatus", self.error_status))
+        self.block_rate = float(changes.get("blockRate", self.block_rate))
+        if "rps" in changes or "burst" in changes:
+            self.throttle = Throttle(float(changes.get("rps", self.throttle.rps)), float(changes.get("burst", 0.0)))
+
+    def config(self):
+        return {
+            "latency": self.latency,
+            "errorRate": self.error_rate,
+            "errorStatus": self.error_status,
+            "rps": self.throttle.rps,
+            "burst": self.throttle.burst,
+            "blockRate": self.block_rate,
+        }
+
+    def count(self, outcome):
+        self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    async def delay(self):
+        await asyncio.sleep(self._sample_latency() / 1000)
+
+
+def load_manifest(fixtures):
+    with open(os.path.join(fixtures, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    bodies = {}
+    for kind, entries in manifest.items():
+        for key, path in entries.items():
+            with open(os.path.join(fixtures, path), "rb") as f:
+                bodies[(kind, key)] = f.read()
+    return bodies
+
+
+def create_app(args):
+    app = FastAPI(title="Fake Naver Upstream")
+    bodies = load_manifest(args.fixtures)
+    upstreams = {
+        "keywordstool": UpstreamBehavior(args.kw_latency, args.kw_error_rate, args.kw_error_status, args.kw_rps, args.kw_burst),
+        "serp": UpstreamBehavior(args.serp_latency, args.serp_error_rate, args.serp_error_status, args.serp_rps, args.serp_burst, args.serp_block_rate),
+    }
+
+    def fixture(kind, key):
+        return bodies.get((kind, key)) or bodies[(kind, "*")]
+
+    def check_signature(request):
+        """실제 검색광고 API와 같은 방식으로 서명 검증 (실패 시 오류 응답)"""
+        timestamp = request.headers.get("X-Timestamp", "")
+        signature = request.headers.get("X-Signature", "")
+        if not timestamp or not signature or not request.headers.get("X-Customer"):
+            return JSONResponse({"code": 401, "message": "인증 헤더 누락"}, status_code=401)
+        if args.license and request.headers.get("X-API-KEY") != args.license:
+            return JSONResponse({"code": 401, "message": "잘못된 API 키"}, status_code=401)
+        if not timestamp.isdigit() or abs(time.time() * 1000 - int(timestamp)) > args.max_clock_skew * 1000:
+            return JSONResponse({"code": 401, "message": "타임스탬프 만료"}, status_code=401)
+        expected = base64.b64encode(
+            hmac.new(args.secret.encode("utf-8"), f"{timestamp}.GET./keywordstool".encode("utf-8"), hashlib.sha256).digest()
+        ).decode("utf-8")
+        if not hmac.compare_digest(expected, signature):
+            return JSONResponse({"code": 403, "message": "서명 불일치"}, status_code=403)
+        return None
+
+    async def inject(name):
+        """호출 제한 → 지연 → 오류 순서로 주입, 주입된 응답이 없으면 None"""
+        upstream = upstreams[name]
+        if not upstream.throttle.allow():
+            upstream.count("429")
+            return JSONResponse({"code": 429, "message": "Too Many Requests"}, status_code=429, headers={"Retry-After": "1"})
+        await upstream.delay()
+        if random.random() < upstream.error_rate:
+            upstream.count(str(upstream.error_status))
+            return JSONResponse({"code": upstream.error_status, "message": "injected error"}, status_code=upstream.error_status)
+        return None
+
+    @app.get("/keywordstool")
+    async def keywordstool(request: Request, hintKeywords: str = ""):
+        rejected = check_signature(request)
+        if rejected is not None:
+            upstreams["keywordstool"].count(str(rejected.status_code))
+            return rejected
+        injected = await inject("keywordstool")
+        if injected is not None:
+            return injected
+        upstreams["keywordstool"].count("200")
+        return Response(fixture("keywordstool", hintKeywords), media_type="application/json")
+
+    @app.get("/search.naver")
+    async def search(query: str = ""):
+        injected = await inject("serp")
+        if injected is not None:
+            return injected
+        if random.random() < upstreams["serp"].block_rate:
+            upstreams["serp"].count("blocked")
+            return Response(BLOCKED_HTML, media_type="text/html; charset=utf-8")
+        upstreams["serp"].count("200")
+        return Response(fixture("serp", query), media_type="text/html; charset=utf-8")
+
+    @app.get("/__stub/config")
+    async def get_config():
+        return {name: upstream.config() for name, upstream in upstreams.items()}
+
+    @app.post("/__stub/config")
+    async def update_config(changes: dict):
+        for name, values in changes.items():
+            if name in upstreams:
+                upstreams[name].configure(**values)
+        return await get_config()
+
+    @app.get("/__stub/stats")
+    async def stats():
+        return {name: upstream.stats for name, upstream in upstreams.items()}
+
+    @app.delete("/__stub/stats")
+    async def reset_stats():
+        for upstream in upstreams.values():
+            upstream.stats = {}
+        return {"success": True}
+
+    return app
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="가짜 네이버 업스트림")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--fixtures", default=os.path.join(ROOT, "fixtures"))
+    parser.add_argument("--secret", default=os.getenv("NAVER_API_SECRET", "AQAAAABxP1Bbtf2giDPzK2qa4Ixetc774mZsCjCKxTp2BVV29g=="))
+    parser.add_argument("--license", default=os.getenv("NAVER_API_LICENSE"), help="지정 시 X-API-KEY도 검사")
+    parser.add_argument("--max-clock-skew", type=float, default=300, help="허용 타임스탬프 오차 (초)")
+    for prefix, name in (("kw", "keywordstool"), ("serp", "SERP")):
+        parser.add_argument(f"--{prefix}-latency", default="0", help=f"{name} 지연 분포 (ms)")
+        parser.add_argument(f"--{prefix}-error-rate", type=float, default=0.0, help=f"{name} 오류 응답 비율")
+        parser.add_argument(f"--{prefix}-error-status", type=int, default=500)
+        parser.add_argument(f"--{prefix}-rps", type=float, default=0.0, help=f"{name} 초당 허용 호출 수 (0: 제한 없음, 초과 시 429)")
+        parser.add_argument(f"--{prefix}-burst", type=float, default=0.0)
+    parser.add_argument("--serp-block-rate", type=float, default=0.0, help="차단(캡차) 페이지 비율")
+    return parser
+
+
+def main_cli():
+    args = build_parser().parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main_cli()
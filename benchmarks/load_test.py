@@ -0,0 +1,172 @@
+"""/analyze 부하 테스트 (동시 요청 수를 늘려가며 처리량/지연 곡선 측정)
+
+--spawn을 주면 가짜 업스트림(fake_naver.py)과 API 서버(uvicorn)를 직접 띄운 뒤 측정합니다.
+
+    python benchmarks/load_test.py --spawn --steps 1,5,10,25,50,100 --duration 10 \\
+        --stub-args "--kw-latency lognormal:150,0.6 --kw-rps 5 --serp-latency lognormal:400,0.5 --serp-error-rate 0.01"
+    python benchmarks/load_test.py --target http://127.0.0.1:8000   # 이미 떠 있는 서버 대상
+
+단계마다 p95가 --slo-ms 이하이고 오류율이 --max-error-rate 이하인 가장 큰 동시 요청 수를 한계로 보고합니다.
+"""
+import argparse
+import asyncio
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+import httpx
+
+from report import environment, latency_summary, save_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="/analyze 부하 테스트")
+    parser.add_argument("--target", default="http://127.0.0.1:8100", help="API 서버 주소")
+    parser.add_argument("--spawn", action="store_true", help="가짜 업스트림 + API 서버를 띄워서 측정")
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--stub-args", default="", help="fake_naver.py에 넘길 옵션")
+    parser.add_argument("--workers", type=int, default=1, help="--spawn 시 uvicorn 워커 수")
+    parser.add_argument("--steps", default="1,5,10,25,50,100", help="쉼표로 구분한 동시 요청 수")
+    parser.add_argument("--duration", type=float, default=10, help="단계별 측정 시간 (초)")
+    parser.add_argument("--keyword", default="청라 영어학원")
+    parser.add_argument("--repeat-keyword", action="store_true", help="같은 키워드 반복 (기본: 요청마다 다른 키워드로 캐시 우회)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--slo-ms", type=float, default=2000, help="허용 p95 지연")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--keep-going", action="store_true", help="한계를 크게 넘어도 남은 단계 계속 측정")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    return parser.parse_args()
+
+
+def wait_until_ready(url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버 실행 실패 (종료 코드 {process.returncode}): {url}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"서버 준비 시간 초과: {url}")
+
+
+def spawn_servers(args, processes):
+    """가짜 업스트림과 이를 바라보는 API 서버 실행 (실행한 프로세스는 processes에 추가)"""
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "fake_naver.py"), "--port", str(args.stub_port), *shlex.split(args.stub_args)]
+    )
+    processes.append(stub)
+    wait_until_ready(f"{stub_url}/__stub/config", stub)
+
+    port = httpx.URL(args.target).port
+    env = {
+        **os.environ,
+        "KEYWORDSTOOL_BASE_URL": stub_url,
+        "SERP_BASE_URL": stub_url,
+        "HTTP2_ENABLED": "0",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+        "RANK_HISTORY_ENABLED": "0",
+        "TRACKER_ENABLED": "0",
+    }
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    processes.append(api)
+    wait_until_ready(f"{args.target}/", api)
+
+
+async def run_step(client, args, concurrency, offset):
+    """concurrency개 워커가 duration초 동안 요청을 연속으로 보냄 (응답을 받아야 다음 요청)"""
+    timings = []
+    errors = degraded = 0
+    deadline = time.perf_counter() + args.duration
+    counter = iter(range(offset, offset + 10_000_000))
+
+    async def worker():
+        nonlocal errors, degraded
+        while time.perf_counter() < deadline:
+            keyword = args.keyword if args.repeat_keyword else f"{args.keyword} {next(counter)}"
+            started = time.perf_counter()
+            try:
+                response = await client.post("/analyze", json={"keyword": keyword})
+                body = response.json() if response.status_code == 200 else {}
+            except (httpx.HTTPError, ValueError):
+                response, body = None, {}
+            timings.append((time.perf_counter() - started) * 1000)
+            if response is None or response.status_code != 200 or not body.get("success"):
+                errors += 1
+            elif not all(stage.get("success") for stage in (body["stages"]["keywordstool"], body["stages"]["ranking"])):
+                degraded += 1  # 응답은 했지만 검색량 또는 순위 단계 실패
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    summary = latency_summary(timings)
+    summary.update(
+        concurrency=concurrency,
+        throughput=round(len(timings) / elapsed, 1),
+        errorRate=round(errors / len(timings), 4),
+        degradedRate=round(degraded / len(timings), 4),
+    )
+    return summary
+
+
+async def run_curve(args):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    results = {}
+    capacity = None
+    print(f"  {'conc':>6}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>9}{'degraded':>10}")
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=limits) as client:
+        for index, concurrency in enumerate(int(value) for value in args.steps.split(",")):
+            summary = await run_step(client, args, concurrency, offset=index * 10_000_000)
+            results[f"analyze@c{concurrency}"] = summary
+            within = summary["p95"] <= args.slo_ms and summary["errorRate"] <= args.max_error_rate
+            print(
+                f"  {concurrency:>6}{summary['throughput']:>10.1f}{summary['p50']:>8.0f}ms{summary['p95']:>8.0f}ms"
+                f"{summary['p99']:>8.0f}ms{summary['errorRate']:>9.1%}{summary['degradedRate']:>10.1%}{'' if within else '  ⚠️'}"
+            )
+            if within:
+                capacity = summary
+            elif not args.keep_going and summary["p95"] > args.slo_ms * 3:
+                print("  ⛔ 지연이 한계를 크게 넘어 측정 중단")
+                break
+    return results, capacity
+
+
+def main_cli():
+    args = parse_args()
+    processes = []
+    try:
+        if args.spawn:
+            spawn_servers(args, processes)
+        print(f"대상: {args.target} / 단계별 {args.duration:.0f}초 / SLO p95 ≤ {args.slo_ms:.0f}ms, 오류 ≤ {args.max_error_rate:.0%}\n")
+        results, capacity = asyncio.run(run_curve(args))
+        stub_stats = None
+        if args.spawn:
+            stub_stats = httpx.get(f"http://127.0.0.1:{args.stub_port}/__stub/stats").json()
+            print(f"\n가짜 업스트림 응답: {stub_stats}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=10)
+
+    if capacity:
+        print(f"\n✅ 한계: 동시 {capacity['concurrency']}개 ({capacity['throughput']} req/s, p95 {capacity['p95']:.0f}ms)")
+    else:
+        print("\n❌ 모든 단계가 SLO를 넘음")
+    if args.json:
+        env = environment(target=args.target, stubArgs=args.stub_args, workers=args.workers, duration=args.duration, upstream=stub_stats)
+        save_results(args.json, results, env)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
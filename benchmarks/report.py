@@ -0,0 +1,76 @@
+"""벤치마크 결과 저장/비교 공용 함수
+
+결과는 JSON으로 저장하고, --compare로 이전 결과와 비교해 허용치 이상 느려진 항목을 표시합니다.
+"""
+import json
+import platform
+import subprocess
+import time
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(timings_ms):
+    """지연 시간 목록(ms) 요약"""
+    return {
+        "count": len(timings_ms),
+        "mean": round(sum(timings_ms) / len(timings_ms), 3),
+        "p50": round(percentile(timings_ms, 50), 3),
+        "p95": round(percentile(timings_ms, 95), 3),
+        "p99": round(percentile(timings_ms, 99), 3),
+        "max": round(max(timings_ms), 3),
+    }
+
+
+def environment(**extra):
+    """같은 조건끼리 비교했는지 확인할 수 있도록 실행 환경 기록"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **extra,
+    }
+
+
+def save_results(path, results, env):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": env, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {path}")
+
+
+def compare_results(path, results, metric, max_regression):
+    """baseline 대비 metric이 max_regression(비율) 넘게 나빠진 항목 수 반환"""
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n📊 기준 결과와 비교: {path} ({baseline['environment'].get('commit') or '커밋 정보 없음'})")
+    print(f"  {'name':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = 0
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None or not previous.get(metric):
+            continue
+        change = current[metric] / previous[metric] - 1
+        flag = ""
+        if change > max_regression:
+            regressions += 1
+            flag = "  ⚠️  느려짐"
+        print(f"  {name:<28}{previous[metric]:>12.3f}{current[metric]:>12.3f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def exit_code(regressions):
+    if regressions:
+        print(f"\n❌ 허용치를 넘게 느려진 항목 {regressions}개")
+        return 1
+    return 0
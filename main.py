@@ -1,18 +1,156 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import requests
+from fastapi.responses import StreamingResponse, Response
+from contextlib import asynccontextmanager, nullcontext
+from pydantic import BaseModel, Field
+import httpx
+import asyncio
 import hashlib
 import hmac
 import base64
 import time
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+from typing import List, Dict, Optional, AsyncIterator, Tuple, Literal
 import json
 import os
-import traceback
+import re
+import sys
+import logging
+import atexit
+import sqlite3
+import threading
+import zlib
+import abc
+import random
+import heapq
+import uuid
+import bisect
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from functools import lru_cache
+from email.utils import parsedate_to_datetime
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
 
-app = FastAPI(title="Naver Crawler API", version="1.0.0")
+# HTTP/2 지원 여부 (h2 패키지 설치 시)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# SERP HTML 파싱 (파싱 프로세스가 이 파일 대신 임포트하는 모듈, PARSER_BACKEND/SELECTOR_RECHECK_INTERVAL 설정 포함)
+from serp_parser import (
+    PARSER_BACKENDS, SelectorMatches, _parse_with_fallback, get_parser_backend, init_parse_worker, parse_serp_bytes, warm_parse_worker
+)
+
+# Redis 클라이언트 (CACHE_BACKEND=redis 사용 시 필요)
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+# 로깅 설정 (요청 처리 중에는 큐에 넣기만 하고 별도 스레드가 stdout에 기록)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG면 업체별 파싱 결과, HTML 샘플까지 출력
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json | text
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))  # 반복이 많은 로그(캐시 적중 등) 기록 비율
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+SAMPLED = {"sampled": True}  # logger.info(..., extra=SAMPLED)로 표시한 로그는 LOG_SAMPLE_RATE 비율만 기록
+LOG_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "sampled"}
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON (extra로 넘긴 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "requestId": getattr(record, "request_id", "-"),
+            "msg": record.getMessage()
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in LOG_RECORD_FIELDS})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """요청 ID 부여, 샘플링 대상 로그는 LOG_SAMPLE_RATE 비율만 통과"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False) and random.random() >= LOG_SAMPLE_RATE:
+            return False
+        record.request_id = request_id_var.get()
+        return True
+
+class PreparedQueueHandler(QueueHandler):
+    """메시지/예외를 문자열로 만들어 큐에 넣음 (출력 형식은 리스너 쪽 포매터가 결정)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def configure_logging() -> logging.Logger:
+    stream = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(message)s"))
+    handler = PreparedQueueHandler(SimpleQueue())
+    handler.addFilter(RequestContextFilter())
+    listener = QueueListener(handler.queue, stream)
+    listener.start()
+    atexit.register(listener.stop)  # 종료 시 남은 로그 기록
+    
+    app_logger = logging.getLogger("naver_crawler")
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.addHandler(handler)
+    app_logger.propagate = False
+    return app_logger
+
+logger = configure_logging()
+
+# 앱 수명주기 (시작/종료 시 공유 리소스 관리)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_http_clients()
+    await open_parse_pool()
+    if TRACKER_ENABLED:
+        await rank_tracker.start()
+    await job_manager.start()
+    try:
+        yield
+    finally:
+        await job_manager.stop()
+        await rank_tracker.stop()
+        await close_http_clients()
+        await cancel_parse_pool_rebuild()
+        close_parse_pool()
+        await close_caches()
+        await rank_history.close()
+
+app = FastAPI(title="Naver Crawler API", version="1.0.0", lifespan=lifespan)
+
+# 요청 ID (로그 상관관계 추적, X-Request-ID 헤더가 있으면 그대로 사용)
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
 # CORS 설정
 app.add_middleware(
@@ -28,29 +166,172 @@ NAVER_API_CUSTOMER_ID = os.getenv("NAVER_API_CUSTOMER_ID", "1978176")
 NAVER_API_LICENSE = os.getenv("NAVER_API_LICENSE", "0100000000713f505bb5fda08833f32b6a9ae08c5ea5789f134c7b140446e58bdb4183fc1d")
 NAVER_API_SECRET = os.getenv("NAVER_API_SECRET", "AQAAAABxP1Bbtf2giDPzK2qa4Ixetc774mZsCjCKxTp2BVV29g==")
 
+# 업스트림 타임아웃 설정 (초)
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+NAVER_API_TIMEOUT = float(os.getenv("NAVER_API_TIMEOUT", "20"))  # 검색량 조회 단계 전체 (재시도 포함)
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", "20"))  # 순위 크롤링 단계 전체
+
+# 순위 조회 깊이 (상위 10위 밖은 다음 페이지를 조회해 placeUrl을 찾음)
+SERP_PAGE_SIZE = 10  # 페이지당 플레이스 수 (parse_place_list 상위 10개)
+RANK_DEFAULT_DEPTH = int(os.getenv("RANK_DEFAULT_DEPTH", "10"))  # 요청에 rankDepth가 없을 때 (순위 추적 포함)
+RANK_MAX_DEPTH = int(os.getenv("RANK_MAX_DEPTH", "100"))
+RANK_PAGE_CONCURRENCY = int(os.getenv("RANK_PAGE_CONCURRENCY", "3"))  # 동시에 미리 조회할 다음 페이지 수
+RANK_DEEP_TIMEOUT = float(os.getenv("RANK_DEEP_TIMEOUT", "10"))  # 2페이지 이후 조회 전체 (CRAWL_TIMEOUT보다 작게)
+
+# SERP 파싱 프로세스 풀 (auto: CPU 코어 수 - 1, 최대 4 / 0: 요청 처리 스레드에서 바로 파싱)
+PARSE_WORKERS = os.getenv("PARSE_WORKERS", "auto")
+PARSE_WORKERS = min(4, (os.cpu_count() or 1) - 1) if PARSE_WORKERS == "auto" else int(PARSE_WORKERS)
+
+# 순위 이력 저장소 (SQLite)
+RANK_HISTORY_ENABLED = os.getenv("RANK_HISTORY_ENABLED", "1") == "1"
+RANK_HISTORY_PATH = os.getenv("RANK_HISTORY_PATH", "rank_history.sqlite3")
+RANK_HISTORY_MAX_POINTS = int(os.getenv("RANK_HISTORY_MAX_POINTS", "500"))  # bucket=auto일 때 최대 포인트 수
+
+# 순위 추적 스케줄러 (등록된 키워드/플레이스를 주기적으로 크롤링)
+TRACKER_ENABLED = os.getenv("TRACKER_ENABLED", "1") == "1"
+TRACKER_CONCURRENCY = int(os.getenv("TRACKER_CONCURRENCY", "2"))  # 동시 크롤링 수
+TRACKER_DEFAULT_INTERVAL = int(os.getenv("TRACKER_DEFAULT_INTERVAL", "3600"))  # 기본 추적 주기 (초)
+TRACKER_MIN_INTERVAL = int(os.getenv("TRACKER_MIN_INTERVAL", "300"))  # 최소 추적 주기 (초)
+TRACKER_JITTER = float(os.getenv("TRACKER_JITTER", "0.1"))  # 주기 무작위 편차 비율 (±)
+TRACKER_STARTUP_SPREAD = float(os.getenv("TRACKER_STARTUP_SPREAD", "300"))  # 시작 시 첫 실행 분산 구간 (초)
+
+# 비동기 작업 (/jobs)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))  # 동시에 실행하는 작업 수
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))  # 대기 가능한 작업 수 (초과 시 503)
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))  # 완료된 작업 결과 보관 시간 (초)
+JOB_MAX_JOBS = int(os.getenv("JOB_MAX_JOBS", "1000"))  # 메모리에 보관하는 최대 작업 수
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory").lower()  # memory | sqlite | redis (워커/재시작 간 상태 공유)
+
+# 배치 분석 설정
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))  # 배치 1회 최대 항목 수
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "10"))  # 배치 기본 동시 처리 수
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "50"))  # 요청으로 지정 가능한 최대 동시 처리 수
+KEYWORDSTOOL_MAX_HINTS = 5  # keywordstool hintKeywords 최대 개수
+
+# keywordstool 호출 제한 / 재시도 / 서킷 브레이커 설정
+KEYWORDSTOOL_RPS = float(os.getenv("KEYWORDSTOOL_RPS", "5"))  # 초당 허용 호출 수 (프로세스 전체)
+KEYWORDSTOOL_BURST = int(os.getenv("KEYWORDSTOOL_BURST", "10"))  # 순간 허용 호출 수
+KEYWORDSTOOL_MAX_RETRIES = int(os.getenv("KEYWORDSTOOL_MAX_RETRIES", "3"))  # 429/5xx/네트워크 오류 재시도 횟수
+KEYWORDSTOOL_BACKOFF_BASE = float(os.getenv("KEYWORDSTOOL_BACKOFF_BASE", "0.5"))  # 재시도 대기 기본값 (초)
+KEYWORDSTOOL_BACKOFF_MAX = float(os.getenv("KEYWORDSTOOL_BACKOFF_MAX", "8"))  # 재시도 대기 최대값 (초)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))  # 연속 실패 시 차단
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))  # 차단 후 재시도까지 대기 (초)
+
+# 업스트림 커넥션 풀 설정 (호스트별로 별도 풀 유지)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))  # 호스트별 최대 동시 연결 수
+HTTP_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_KEEPALIVE_CONNECTIONS", "20"))  # 유지할 유휴 연결 수
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))  # 유휴 연결 유지 시간 (초)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "1") == "1" and HTTP2_AVAILABLE
+UPSTREAM_HOSTS = {
+    "keywordstool": os.getenv("KEYWORDSTOOL_BASE_URL", "https://api.naver.com").rstrip("/"),
+    "serp": os.getenv("SERP_BASE_URL", "https://m.search.naver.com").rstrip("/"),  # 부하 테스트 시 가짜 업스트림 주소
+    "shortlink": os.getenv("SHORTLINK_BASE_URL", "https://naver.me").rstrip("/"),  # 단축 URL(naver.me) → 플레이스 ID 확인
+}
+
+# 검색량(keywordstool) 캐시 설정
+KEYWORD_CACHE_SIZE = int(os.getenv("KEYWORD_CACHE_SIZE", "5000"))  # 최대 보관 키워드 수 (LRU)
+KEYWORD_CACHE_TTL = float(os.getenv("KEYWORD_CACHE_TTL", "86400"))  # 정상 응답 보관 시간 (초)
+KEYWORD_CACHE_NEGATIVE_TTL = float(os.getenv("KEYWORD_CACHE_NEGATIVE_TTL", "600"))  # 데이터 없음 응답 보관 시간 (초)
+
+# 순위(SERP) 캐시 설정
+SERP_CACHE_SIZE = int(os.getenv("SERP_CACHE_SIZE", "2000"))
+SERP_CACHE_TTL = float(os.getenv("SERP_CACHE_TTL", "600"))
+
+# 단축 URL → 플레이스 ID 캐시 (대상이 바뀌지 않으므로 길게 보관)
+PLACE_ID_CACHE_SIZE = int(os.getenv("PLACE_ID_CACHE_SIZE", "10000"))
+PLACE_ID_CACHE_TTL = float(os.getenv("PLACE_ID_CACHE_TTL", "2592000"))
+MAX_PLACE_URLS = int(os.getenv("MAX_PLACE_URLS", "100"))  # 요청 1건의 placeUrls 최대 개수
+
+# 캐시 백엔드: memory (프로세스별) | sqlite (같은 서버의 워커 간 공유) | redis (레플리카 간 공유)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "/tmp/naver-crawler-cache.sqlite3")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# 업스트림 응답 녹화/재생 (벤치마크, 네이버 호출 없이 재현)
+UPSTREAM_MODE = os.getenv("UPSTREAM_MODE", "live").lower()  # live | replay | record
+FIXTURES_DIR = os.getenv("FIXTURES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))  # replay 시 응답마다 더할 지연 (업스트림 지연 모사)
+
+# 지역명 사전 (지역명 제거 매칭에 사용)
+REGIONS_PATH = os.getenv("REGIONS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "regions.json"))
+COMPETITOR_RULES_PATH = os.getenv(  # 업종별 경쟁사 키워드 규칙표
+    "COMPETITOR_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "competitor_keywords.json")
+)
+
 # 환경 변수 검증 (상세)
-print(f"=" * 60)
-print(f"🔧 Environment Variables Check:")
-print(f"  - CUSTOMER_ID: {NAVER_API_CUSTOMER_ID if NAVER_API_CUSTOMER_ID else '❌ NOT SET'}")
-print(f"  - LICENSE: {NAVER_API_LICENSE[:20] + '...' if NAVER_API_LICENSE else '❌ NOT SET'}")
-print(f"  - SECRET: {NAVER_API_SECRET[:20] + '...' if NAVER_API_SECRET else '❌ NOT SET'}")
-print(f"  - PORT: {os.getenv('PORT', '8000')}")
-print(f"=" * 60)
+logger.info(
+    "🔧 Environment Variables Check",
+    extra={
+        "customerId": NAVER_API_CUSTOMER_ID if NAVER_API_CUSTOMER_ID else "❌ NOT SET",
+        "license": NAVER_API_LICENSE[:20] + "..." if NAVER_API_LICENSE else "❌ NOT SET",
+        "secret": NAVER_API_SECRET[:20] + "..." if NAVER_API_SECRET else "❌ NOT SET",
+        "port": os.getenv("PORT", "8000")
+    }
+)
 
 # 환경 변수 누락 시 경고
 if not NAVER_API_CUSTOMER_ID or not NAVER_API_LICENSE or not NAVER_API_SECRET:
-    print("⚠️  WARNING: Some environment variables are missing!")
-    print("⚠️  Please set all required variables in Railway dashboard.")
+    logger.warning("⚠️  Some environment variables are missing! Please set all required variables in Railway dashboard.")
 
 # 요청 모델
+class RelatedKeywordOptions(BaseModel):
+    sortBy: Optional[Literal["monthlySearchVolume", "averageCtr", "competition"]] = None  # 미지정 시 네이버 응답 순서
+    descending: bool = True
+    limit: int = Field(10, ge=1, le=1000)
+    minSearchVolume: Optional[int] = None
+    maxSearchVolume: Optional[int] = None
+    minCtr: Optional[float] = None
+    maxCtr: Optional[float] = None
+    minCompetition: Optional[Literal["낮음", "보통", "높음", "매우 높음"]] = None
+    maxCompetition: Optional[Literal["낮음", "보통", "높음", "매우 높음"]] = None
+
 class SearchAnalysisRequest(BaseModel):
     keyword: str
     placeUrl: Optional[str] = None
+    placeUrls: Optional[List[str]] = Field(None, max_length=MAX_PLACE_URLS)  # 같은 키워드로 순위를 볼 여러 플레이스 (크롤링 1회)
+    rankDepth: Optional[int] = Field(None, ge=1, le=RANK_MAX_DEPTH)  # placeUrl을 찾을 최대 순위 (기본 RANK_DEFAULT_DEPTH)
+    relatedOptions: Optional[RelatedKeywordOptions] = None  # 관련 키워드 정렬/필터 (미지정 시 상위 10개)
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[SearchAnalysisRequest]
+    concurrency: Optional[int] = None  # 동시 처리 수 (기본 BATCH_CONCURRENCY)
+    groupKeywordLookups: bool = False  # keywordstool을 5개씩 묶어 호출 (관련 키워드는 묶음 기준)
+
+class TrackingTargetRequest(BaseModel):
+    keyword: str
+    placeUrl: str = ""
+    intervalSeconds: int = Field(TRACKER_DEFAULT_INTERVAL, ge=TRACKER_MIN_INTERVAL)
+
+class JobRequest(BaseModel):
+    analyze: Optional[SearchAnalysisRequest] = None  # 단일 분석 (/analyze와 같은 본문)
+    batch: Optional[BatchAnalysisRequest] = None  # 일괄 분석 (/analyze/batch와 같은 본문)
 
 class HealthResponse(BaseModel):
     status: str
     message: str
 
+# Prometheus 지표 (라벨 조합이 고정되어 있어 항상 켜 두어도 부담이 작음)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+STAGE_SECONDS = Histogram(
+    "naver_stage_duration_seconds", "단계별 소요 시간 (keywordstool, serp_fetch, parse, competitor_keywords, analyze)",
+    ["stage"], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_RESPONSES = Counter("naver_upstream_responses_total", "업스트림 응답 수 (status: HTTP 상태 코드 또는 error)", ["upstream", "status"])
+KEYWORD_LOOKUPS = Counter(
+    "naver_keyword_lookups_total", "keywordstool 키워드 조회 (attempt=region_fallback 비율이 지역명 제거 재시도율)",
+    ["attempt", "result"]
+)
+SELECTOR_MATCHES = Counter(
+    "naver_serp_selector_matches_total", "SERP 선택자 일치 (field: container 또는 업체 필드, index: 후보 순번, none: 없음)",
+    ["parser", "field", "index"]
+)
+SELECTOR_CACHE_LOOKUPS = Counter(
+    "naver_serp_selector_cache_total", "기억한 선택자 사용 결과 (hit: 바로 일치, miss: 불일치로 전체 후보 확인, scan: 기억한 선택자 없음/재확인)",
+    ["parser", "field", "result"]
+)
+CACHE_REQUESTS = Counter("naver_cache_requests_total", "캐시 조회 결과", ["cache", "result"])
+
 # 네이버 검색광고 API 시그니처 생성
 def generate_signature(timestamp: str, method: str, uri: str) -> str:
     """네이버 검색광고 API 서명 생성"""
@@ -62,599 +343,1872 @@ def generate_signature(timestamp: str, method: str, uri: str) -> str:
     ).digest()
     return base64.b64encode(signature).decode('utf-8')
 
-# 네이버 검색광고 API 호출
-def call_naver_api(keyword: str) -> Dict:
-    """네이버 검색광고 API로 키워드 검색량 조회 (원본 우선, 실패 시 지역명 제거)"""
-    try:
-        url = "https://api.naver.com/keywordstool"
-        
-        # 1단계: 원본 키워드 그대로 시도
-        print(f"🔍 1단계: 원본 키워드로 검색: '{keyword}'")
-        
-        timestamp = str(int(time.time() * 1000))
-        method = "GET"
-        uri = "/keywordstool"
-        signature = generate_signature(timestamp, method, uri)
-        
-        headers = {
-            "X-Timestamp": timestamp,
-            "X-API-KEY": NAVER_API_LICENSE,
-            "X-Customer": NAVER_API_CUSTOMER_ID,
-            "X-Signature": signature,
-            "Content-Type": "application/json"
+# 지역명 사전 로드 및 컴파일
+def load_regions(path: str) -> List[str]:
+    """분류별 지역명 JSON을 하나의 목록으로 합침 (순서 유지, 중복 제거)"""
+    with open(path, encoding="utf-8") as f:
+        groups = json.load(f)
+    return list(dict.fromkeys(region for regions in groups.values() for region in regions))
+
+def compile_region_pattern(regions: List[str]) -> "re.Pattern":
+    """모든 지역명을 정규식 하나로 컴파일 (긴 이름 우선, 뒤따르는 공백 1개 포함)"""
+    alternatives = "|".join(re.escape(region) for region in sorted(regions, key=len, reverse=True))
+    return re.compile(f"(?:{alternatives}) ?")
+
+REGIONS = load_regions(REGIONS_PATH)
+REGION_PATTERN = compile_region_pattern(REGIONS)
+
+# 키워드에서 지역명 제거
+@lru_cache(maxsize=4096)
+def strip_regions(keyword: str) -> Tuple[str, Tuple[str, ...]]:
+    """(지역명을 제거한 핵심 키워드, 제거된 지역명들) 반환"""
+    removed = []
+    
+    def drop(match: "re.Match") -> str:
+        removed.append(match.group(0).rstrip())
+        return ""
+    
+    core_keyword = REGION_PATTERN.sub(drop, keyword).strip()
+    return core_keyword, tuple(dict.fromkeys(removed))
+
+# 업스트림 호출용 HTTP 타임아웃
+def http_timeout() -> httpx.Timeout:
+    """연결/읽기 타임아웃 설정"""
+    return httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+# 호스트별 공유 HTTP 클라이언트
+HTTP_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+def _new_http_client() -> httpx.AsyncClient:
+    """커넥션 풀 + keep-alive (+ 가능 시 HTTP/2) 클라이언트 생성"""
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_SIZE,
+        max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    if UPSTREAM_MODE == "replay":
+        return httpx.AsyncClient(timeout=http_timeout(), transport=FixtureTransport(FIXTURES_DIR))
+    if UPSTREAM_MODE == "record":
+        live = httpx.AsyncHTTPTransport(limits=limits, http2=HTTP2_ENABLED)
+        return httpx.AsyncClient(timeout=http_timeout(), transport=FixtureTransport(FIXTURES_DIR, record_from=live))
+    return httpx.AsyncClient(timeout=http_timeout(), limits=limits, http2=HTTP2_ENABLED)
+
+# 녹화된 업스트림 응답 재생
+class FixtureTransport(httpx.AsyncBaseTransport):
+    """fixtures/manifest.json에 등록된 keywordstool JSON / 모바일 SERP HTML로 응답
+    
+    키는 keywordstool은 hintKeywords, SERP는 query 파라미터이며, 없으면 "*" 항목을 사용합니다.
+    record_from을 주면 실제 응답을 그대로 돌려주면서 200 응답을 픽스처로 저장합니다.
+    """
+    KINDS = {
+        "keywordstool": ("hintKeywords", ".json", "application/json"),
+        "serp": ("query", ".html", "text/html; charset=utf-8")
+    }
+
+    def __init__(self, root: str, record_from: Optional[httpx.AsyncBaseTransport] = None):
+        self.root = root
+        self.record_from = record_from
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.manifest: Dict[str, Dict[str, str]] = {kind: {} for kind in self.KINDS}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                for kind, entries in json.load(f).items():
+                    self.manifest.setdefault(kind, {}).update(entries)
+        self._bodies: Dict[str, bytes] = {}  # 파일 내용 캐시 (벤치마크 중 디스크 I/O 제외)
+
+    def _kind(self, request: httpx.Request) -> Optional[str]:
+        for kind in self.KINDS:
+            if request.url.host == httpx.URL(UPSTREAM_HOSTS[kind]).host:
+                return kind
+        return None  # 단축 URL 등 픽스처 대상이 아닌 호스트
+
+    def _read(self, path: str) -> bytes:
+        body = self._bodies.get(path)
+        if body is None:
+            with open(os.path.join(self.root, path), "rb") as f:
+                body = self._bodies[path] = f.read()
+        return body
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        kind = self._kind(request)
+        if kind is None:
+            if self.record_from is not None:
+                return await self.record_from.handle_async_request(request)
+            return httpx.Response(404, text=f"fixture 없음: {request.url.host}")
+        param, suffix, content_type = self.KINDS[kind]
+        key = request.url.params.get(param, "")
+        if self.record_from is not None:
+            response = await self.record_from.handle_async_request(request)
+            if response.status_code == 200:
+                body = await response.aread()
+                self._record(kind, key, suffix, body)
+                # 본문은 이미 압축 해제되었으므로 인코딩/길이 헤더 제외
+                headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+                return httpx.Response(200, headers=headers, content=body)
+            return response
+        
+        if REPLAY_LATENCY_MS:
+            await asyncio.sleep(REPLAY_LATENCY_MS / 1000)
+        path = self.manifest[kind].get(key) or self.manifest[kind].get("*")
+        if path is None:
+            return httpx.Response(404, text=f"fixture 없음: {kind} '{key}'")
+        return httpx.Response(200, headers={"content-type": content_type}, content=self._read(path))
+
+    def _record(self, kind: str, key: str, suffix: str, body: bytes):
+        path = f"{kind}/{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}{suffix}"
+        os.makedirs(os.path.join(self.root, kind), exist_ok=True)
+        with open(os.path.join(self.root, path), "wb") as f:
+            f.write(body)
+        self.manifest[kind][key] = path
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        logger.info("📼 픽스처 저장: %s '%s' → %s", kind, key, path)
+
+    async def aclose(self):
+        if self.record_from is not None:
+            await self.record_from.aclose()
+
+def open_http_clients():
+    """업스트림 호스트별 커넥션 풀 생성 (앱 시작 시)"""
+    for name in UPSTREAM_HOSTS:
+        if name not in HTTP_CLIENTS:
+            HTTP_CLIENTS[name] = _new_http_client()
+    logger.info("🔌 HTTP 커넥션 풀 준비: %s (HTTP/2: %s)", ", ".join(UPSTREAM_HOSTS.values()), "on" if HTTP2_ENABLED else "off")
+
+async def close_http_clients():
+    """커넥션 풀 종료 (앱 종료 시)"""
+    clients = list(HTTP_CLIENTS.values())
+    HTTP_CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """업스트림별 공유 클라이언트 반환 (앱 수명주기 밖에서 호출되면 즉시 생성)"""
+    client = HTTP_CLIENTS.get(name)
+    if client is None:
+        client = HTTP_CLIENTS[name] = _new_http_client()
+    return client
+
+# TTL + LRU 인메모리 캐시
+class TTLCache:
+    """최대 크기 초과 시 가장 오래 사용하지 않은 항목부터 제거하는 TTL 캐시"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (만료 시각, 값)
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> int:
+        count = len(self._data)
+        self._data.clear()
+        return count
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxSize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 4) if total else 0
+        }
+
+# 캐시 값 직렬화 (압축 JSON)
+def dump_cache_value(value) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 1)
+
+def load_cache_value(raw: bytes):
+    return json.loads(zlib.decompress(raw).decode("utf-8"))
+
+# 캐시 백엔드 인터페이스
+class CacheBackend(abc.ABC):
+    """네임스페이스별 캐시 백엔드 (구현체는 _get/_set/_delete/_clear 제공, 빠뜨리면 생성 시 TypeError)"""
+    kind = "base"
+
+    def __init__(self, namespace: str, ttl: float):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._hit_counter = CACHE_REQUESTS.labels(namespace, "hit")
+        self._miss_counter = CACHE_REQUESTS.labels(namespace, "miss")
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str):
+        value = await self._get(self._key(key))
+        if value is None:
+            self.misses += 1
+            self._miss_counter.inc()
+        else:
+            self.hits += 1
+            self._hit_counter.inc()
+        return value
+
+    async def set(self, key: str, value, ttl: Optional[float] = None):
+        await self._set(self._key(key), value, self.ttl if ttl is None else ttl)
+
+    async def invalidate(self, key: str) -> bool:
+        return await self._delete(self._key(key))
+
+    async def clear(self) -> int:
+        return await self._clear()
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "backend": self.kind,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 4) if total else 0
         }
+
+    @abc.abstractmethod
+    async def _get(self, key: str):
+        ...
+
+    @abc.abstractmethod
+    async def _set(self, key: str, value, ttl: float):
+        ...
+
+    @abc.abstractmethod
+    async def _delete(self, key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    async def _clear(self) -> int:
+        ...
+
+class MemoryCacheBackend(CacheBackend):
+    """프로세스 내 TTL + LRU 캐시 (직렬화 없이 객체 보관)"""
+    kind = "memory"
+
+    def __init__(self, namespace: str, ttl: float, maxsize: int):
+        super().__init__(namespace, ttl)
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def _get(self, key: str):
+        return self._cache.get(key)
+
+    async def _set(self, key: str, value, ttl: float):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def _delete(self, key: str) -> bool:
+        return self._cache.invalidate(key)
+
+    async def _clear(self) -> int:
+        return self._cache.clear()
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "size": len(self._cache), "maxSize": self._cache.maxsize}
+
+class SQLiteCacheBackend(CacheBackend):
+    """로컬 SQLite 파일 캐시 (같은 서버의 uvicorn 워커끼리 공유)"""
+    kind = "sqlite"
+    PURGE_EVERY = 200  # set 호출 N번마다 만료/초과 항목 정리
+
+    def __init__(self, namespace: str, ttl: float, maxsize: int, path: str):
+        super().__init__(namespace, ttl)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_ns_expires ON cache (namespace, expires_at)")
+
+    def _run(self, sql: str, params: tuple = ()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return cursor.fetchone(), cursor.rowcount
+
+    async def _get(self, key: str):
+        row, _ = await asyncio.to_thread(
+            self._run, "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        )
+        return load_cache_value(row[0]) if row else None
+
+    async def _set(self, key: str, value, ttl: float):
+        await asyncio.to_thread(
+            self._run,
+            "INSERT OR REPLACE INTO cache (key, namespace, expires_at, value) VALUES (?, ?, ?, ?)",
+            (key, self.namespace, time.time() + ttl, dump_cache_value(value))
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            await asyncio.to_thread(self._purge)
+
+    def _purge(self):
+        """만료 항목 삭제 후 최대 크기 초과분은 만료가 가까운 순으로 삭제"""
+        self._run("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time()))
+        self._run(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE namespace = ? "
+            "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.maxsize)
+        )
+
+    async def _delete(self, key: str) -> bool:
+        _, count = await asyncio.to_thread(self._run, "DELETE FROM cache WHERE key = ?", (key,))
+        return count > 0
+
+    async def _clear(self) -> int:
+        _, count = await asyncio.to_thread(self._run, "DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+        return count
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+class RedisCacheBackend(CacheBackend):
+    """Redis 프로토콜 캐시 (여러 레플리카끼리 공유, 테스트에서는 호환 클라이언트로 대체 가능)"""
+    kind = "redis"
+
+    def __init__(self, namespace: str, ttl: float, client):
+        super().__init__(namespace, ttl)
+        self._client = client
+
+    async def _get(self, key: str):
+        raw = await self._client.get(key)
+        return load_cache_value(raw) if raw is not None else None
+
+    async def _set(self, key: str, value, ttl: float):
+        await self._client.set(key, dump_cache_value(value), px=int(ttl * 1000))
+
+    async def _delete(self, key: str) -> bool:
+        return await self._client.delete(key) > 0
+
+    async def _clear(self) -> int:
+        count = 0
+        async for key in self._client.scan_iter(match=f"{self.namespace}:*", count=500):
+            count += await self._client.delete(key)
+        return count
+
+    async def close(self):
+        await self._client.aclose()
+
+# 캐시 백엔드 생성
+def create_cache(namespace: str, ttl: float, maxsize: int, backend: Optional[str] = None) -> CacheBackend:
+    """CACHE_BACKEND(또는 지정한 backend) 설정에 맞는 캐시 생성"""
+    backend = backend or CACHE_BACKEND
+    if backend == "sqlite":
+        return SQLiteCacheBackend(namespace, ttl, maxsize, CACHE_SQLITE_PATH)
+    if backend == "redis":
+        if aioredis is None:
+            raise RuntimeError(f"{backend} 백엔드 사용 시 redis 패키지가 필요합니다")
+        return RedisCacheBackend(namespace, ttl, aioredis.from_url(REDIS_URL))
+    return MemoryCacheBackend(namespace, ttl, maxsize)
+
+CACHES: Dict[str, CacheBackend] = {
+    "keywords": create_cache("kw:v1", KEYWORD_CACHE_TTL, KEYWORD_CACHE_SIZE),
+    "serp": create_cache("serp:v1", SERP_CACHE_TTL, SERP_CACHE_SIZE),
+    "placeIds": create_cache("placeid:v1", PLACE_ID_CACHE_TTL, PLACE_ID_CACHE_SIZE),
+}
+keyword_cache = CACHES["keywords"]
+serp_cache = CACHES["serp"]
+place_id_cache = CACHES["placeIds"]
+
+# 동일 키 동시 요청 병합 (single-flight)
+class SingleFlight:
+    """같은 키로 진행 중인 업스트림 호출이 있으면 새로 호출하지 않고 그 결과를 함께 기다림"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0  # 실제 업스트림 호출 수
+        self.shared = 0  # 진행 중인 호출에 합류한 요청 수
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+            logger.info("🔗 [%s] 진행 중인 요청에 합류: '%s'", self.name, key, extra=SAMPLED)
+        # 한 요청이 타임아웃으로 취소되어도 공유 호출은 계속 진행
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        return {"calls": self.calls, "shared": self.shared, "inflight": len(self._inflight)}
+
+keyword_flight = SingleFlight("keywordstool")
+serp_flight = SingleFlight("serp")
+shortlink_flight = SingleFlight("shortlink")
+
+async def close_caches():
+    """캐시 백엔드 연결 종료 (앱 종료 시)"""
+    for cache in CACHES.values():
+        await cache.close()
+
+# 캐시 키용 키워드 정규화
+def normalize_keyword(keyword: str) -> str:
+    """앞뒤 공백 제거, 연속 공백 축약, 소문자화"""
+    return re.sub(r"\s+", " ", keyword).strip().lower()
+
+# 캐시 키 (결과에 영향을 주는 요청 파라미터 포함)
+def keyword_cache_key(keyword: str) -> str:
+    return f"{normalize_keyword(keyword)}|showDetail=1"
+
+def serp_cache_key(keyword: str, page: int = 1) -> str:
+    # 페이지마다 따로 캐시 (깊은 순위 조회가 얕은 조회의 페이지를 재사용)
+    key = f"{normalize_keyword(keyword)}|where=m"
+    return key if page == 1 else f"{key}|start={serp_page_start(page)}"
+
+def serp_page_start(page: int) -> int:
+    return (page - 1) * SERP_PAGE_SIZE + 1
+
+# 순위 이력 저장소
+class RankHistoryStore:
+    """크롤링 결과(상위 업체 목록)와 대상 URL별 순위를 SQLite에 누적 저장"""
+
+    BUCKETS = {"hour": 3600, "day": 86400, "week": 604800}
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: set = set()  # 진행 중인 백그라운드 저장 작업
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS serp_snapshots (
+                    id INTEGER PRIMARY KEY,
+                    keyword TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    UNIQUE (keyword, fetched_at)
+                );
+                CREATE TABLE IF NOT EXISTS serp_places (
+                    snapshot_id INTEGER NOT NULL REFERENCES serp_snapshots (id),
+                    rank INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    review_count INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    PRIMARY KEY (snapshot_id, rank)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS tracked_targets (
+                    keyword TEXT NOT NULL,
+                    place_url TEXT NOT NULL,
+                    interval_seconds INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (keyword, place_url)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS rank_snapshots (
+                    keyword TEXT NOT NULL,
+                    place_url TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    my_rank INTEGER,
+                    PRIMARY KEY (keyword, place_url, fetched_at)
+                ) WITHOUT ROWID;
+            """)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._migrate_place_ids(conn)
+            if version < 2:
+                self._drop_empty_targets(conn)
+            self._conn = conn
+        return self._conn
+
+    def _migrate_place_ids(self, conn: sqlite3.Connection):
+        """URL 그대로 저장된 기존 순위 이력을 플레이스 ID 키로 변환 (확인 못 하는 단축 URL은 그대로)"""
+        conn.execute("BEGIN")
+        try:
+            for (place_url,) in conn.execute("SELECT DISTINCT place_url FROM rank_snapshots").fetchall():
+                place_id = extract_place_id(place_url) if place_url else None
+                if place_id is None or place_id == place_url:
+                    continue
+                # 같은 크롤링을 다른 URL 형식으로 저장한 중복 행은 버림
+                conn.execute("UPDATE OR IGNORE rank_snapshots SET place_url = ? WHERE place_url = ?", (place_id, place_url))
+                conn.execute("DELETE FROM rank_snapshots WHERE place_url = ?", (place_url,))
+            conn.execute("PRAGMA user_version = 1")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _record(self, keyword: str, fetched_at: float, competitors: List[Dict], targets: Dict[str, Optional[int]]):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO serp_snapshots (keyword, fetched_at) VALUES (?, ?)", (keyword, fetched_at)
+                )
+                if cursor.rowcount:
+                    # 같은 크롤링 결과(캐시 적중)는 한 번만 저장
+                    conn.executemany(
+                        "INSERT INTO serp_places (snapshot_id, rank, name, category, review_count, url) VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (cursor.lastrowid, place["rank"], place["name"], place["category"], place["reviewCount"], place["url"])
+                            for place in competitors
+                        ]
+                    )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO rank_snapshots (keyword, place_url, fetched_at, my_rank) VALUES (?, ?, ?, ?)",
+                    [(keyword, place_url, fetched_at, my_rank) for place_url, my_rank in targets.items()]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def record(
+        self, keyword: str, fetched_at: float, competitors: List[Dict], targets: Dict[str, Optional[int]],
+        place_ids: Optional[Dict[str, Optional[str]]] = None
+    ):
+        """응답을 지연시키지 않도록 백그라운드에서 저장 (대상 순위는 플레이스 ID로, ID가 없으면 URL로 저장, 대상이 없으면 업체 목록만)"""
+        place_ids = place_ids or {}
+        targets = {place_ids.get(url) or url: rank for url, rank in targets.items()}
+        
+        async def save():
+            try:
+                await asyncio.to_thread(self._record, normalize_keyword(keyword), fetched_at, competitors, targets)
+            except Exception as e:
+                logger.warning("⚠️  순위 이력 저장 오류: %s", e)
         
-        params = {
-            "hintKeywords": keyword,  # 원본 키워드 그대로
-            "showDetail": "1"
+        task = asyncio.ensure_future(save())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def bucket_seconds(self, bucket: str, since: float, until: float) -> Optional[int]:
+        """bucket 이름을 초 단위로 변환 (auto: 최대 포인트 수 이하가 되는 가장 작은 단위, raw: 원본)"""
+        if bucket == "raw":
+            return None
+        if bucket == "auto":
+            for seconds in self.BUCKETS.values():
+                if (until - since) / seconds <= RANK_HISTORY_MAX_POINTS:
+                    return seconds
+            return self.BUCKETS["week"]
+        return self.BUCKETS[bucket]
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            return self._connect().execute(sql, params).rowcount
+
+    async def load_targets(self) -> List[tuple]:
+        """추적 대상 목록 (keyword, place_url, interval_seconds)"""
+        return await asyncio.to_thread(
+            self._query, "SELECT keyword, place_url, interval_seconds FROM tracked_targets ORDER BY created_at", ()
+        )
+
+    async def save_target(self, keyword: str, place_url: str, interval_seconds: int):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO tracked_targets (keyword, place_url, interval_seconds, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (keyword, place_url) DO UPDATE SET interval_seconds = excluded.interval_seconds",
+            (keyword, place_url, interval_seconds, time.time())
+        )
+
+    def _drop_empty_targets(self, conn: sqlite3.Connection):
+        """대상 없이 분석한 크롤링마다 저장되던 빈 URL 순위 행 삭제 (업체 목록은 serp_snapshots에 남음)"""
+        conn.execute("BEGIN")
+        try:
+            conn.execute("DELETE FROM rank_snapshots WHERE place_url = ''")
+            conn.execute("PRAGMA user_version = 2")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def delete_target(self, keyword: str, place_url: str) -> bool:
+        deleted = await asyncio.to_thread(
+            self._execute, "DELETE FROM tracked_targets WHERE keyword = ? AND place_url = ?", (keyword, place_url)
+        )
+        return deleted > 0
+
+    async def rank_series(self, keyword: str, place_url: str, since: float, until: float, bucket_seconds: Optional[int]) -> List[Dict]:
+        """대상 URL의 순위 시계열 (구간별 최고/평균/최저 순위, 미노출 횟수 포함)"""
+        if bucket_seconds is None:
+            rows = await asyncio.to_thread(
+                self._query,
+                "SELECT fetched_at, my_rank, my_rank, my_rank, 1, my_rank IS NOT NULL FROM rank_snapshots "
+                "WHERE keyword = ? AND place_url = ? AND fetched_at BETWEEN ? AND ? ORDER BY fetched_at",
+                (normalize_keyword(keyword), place_url, since, until)
+            )
+        else:
+            rows = await asyncio.to_thread(
+                self._query,
+                "SELECT CAST(fetched_at / ? AS INTEGER) * ? AS bucket, MIN(my_rank), AVG(my_rank), MAX(my_rank), "
+                "COUNT(*), COUNT(my_rank) FROM rank_snapshots "
+                "WHERE keyword = ? AND place_url = ? AND fetched_at BETWEEN ? AND ? GROUP BY bucket ORDER BY bucket",
+                (bucket_seconds, bucket_seconds, normalize_keyword(keyword), place_url, since, until)
+            )
+        return [
+            {
+                "t": timestamp,
+                "bestRank": best,
+                "avgRank": round(avg, 2) if avg is not None else None,
+                "worstRank": worst,
+                "samples": samples,
+                "found": found
+            }
+            for timestamp, best, avg, worst, samples, found in rows
+        ]
+
+    async def competitor_series(self, keyword: str, since: float, until: float, bucket_seconds: Optional[int], limit: int) -> List[Dict]:
+        """상위 업체별 순위 시계열 (가장 자주 노출된 업체 limit개)"""
+        bucket_expr = "s.fetched_at" if bucket_seconds is None else f"CAST(s.fetched_at / {int(bucket_seconds)} AS INTEGER) * {int(bucket_seconds)}"
+        rows = await asyncio.to_thread(
+            self._query,
+            f"SELECT CASE WHEN p.url != '' THEN p.url ELSE p.name END AS place_key, MAX(p.name), {bucket_expr} AS bucket, "
+            "MIN(p.rank), AVG(p.rank), COUNT(*) FROM serp_snapshots s JOIN serp_places p ON p.snapshot_id = s.id "
+            "WHERE s.keyword = ? AND s.fetched_at BETWEEN ? AND ? GROUP BY place_key, bucket ORDER BY bucket",
+            (normalize_keyword(keyword), since, until)
+        )
+        places: Dict[str, Dict] = {}
+        for place_key, name, timestamp, best, avg, samples in rows:
+            place = places.setdefault(place_key, {"name": name, "url": place_key if place_key != name else "", "appearances": 0, "series": []})
+            place["appearances"] += samples
+            place["series"].append({"t": timestamp, "bestRank": best, "avgRank": round(avg, 2), "samples": samples})
+        return heapq.nlargest(limit, places.values(), key=lambda place: place["appearances"])
+
+    async def close(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+rank_history = RankHistoryStore(RANK_HISTORY_PATH)
+
+# 순위 추적 스케줄러
+class RankTracker:
+    """등록된 (키워드, 플레이스 URL)을 주기마다 크롤링해 순위 이력에 저장
+    
+    다음 실행 시각 기준 우선순위 큐에서 기한이 된 대상을 꺼내 제한된 수의 워커에 넘깁니다.
+    실행 주기에 무작위 편차를 주어 같은 시각에 요청이 몰리지 않게 하고,
+    같은 키워드는 순위 캐시/single-flight를 공유하므로 신선한 캐시가 있으면 다시 크롤링하지 않습니다.
+    """
+
+    def __init__(self, store: RankHistoryStore, concurrency: int, jitter: float):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.jitter = jitter
+        self.targets: Dict[Tuple[str, str], Dict] = {}
+        self._heap: List[Tuple[float, int, Tuple[str, str]]] = []  # (다음 실행 시각, 순번, 대상 키)
+        self._seq = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"runs": 0, "crawled": 0, "deduped": 0, "failures": 0}
+
+    def _next_run(self, interval: int) -> float:
+        return time.time() + interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _schedule(self, key: Tuple[str, str], run_at: float):
+        self.targets[key]["nextRunAt"] = run_at
+        self._seq += 1
+        heapq.heappush(self._heap, (run_at, self._seq, key))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _register(self, keyword: str, place_url: str, interval: int, run_at: float) -> Dict:
+        key = (keyword, place_url)
+        target = self.targets.get(key)
+        if target is None:
+            target = self.targets[key] = {
+                "keyword": keyword,
+                "placeUrl": place_url,
+                "intervalSeconds": interval,
+                "lastRank": None,
+                "lastRunAt": None,
+                "lastError": None,
+                "nextRunAt": None,
+                "running": False
+            }
+        target["intervalSeconds"] = interval
+        if not target["running"]:
+            self._schedule(key, run_at)
+        return target
+
+    async def add(self, keyword: str, place_url: str, interval: int) -> Dict:
+        """추적 대상 등록 (이미 있으면 주기 변경 후 곧바로 실행)"""
+        keyword = normalize_keyword(keyword)
+        await self.store.save_target(keyword, place_url, interval)
+        return self._register(keyword, place_url, interval, time.time())
+
+    async def remove(self, keyword: str, place_url: str) -> bool:
+        keyword = normalize_keyword(keyword)
+        self.targets.pop((keyword, place_url), None)  # 큐에 남은 항목은 꺼낼 때 무시
+        return await self.store.delete_target(keyword, place_url)
+
+    async def start(self):
+        now = time.time()
+        for keyword, place_url, interval in await self.store.load_targets():
+            # 재시작 직후 한꺼번에 크롤링하지 않도록 첫 실행 시각 분산
+            self._register(keyword, place_url, interval, now + random.uniform(0, min(interval, TRACKER_STARTUP_SPREAD)))
+        self._wakeup = asyncio.Event()
+        self._queue = asyncio.Queue(maxsize=self.concurrency)
+        self._tasks = [asyncio.create_task(self._dispatch())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        logger.info("⏱️  순위 추적 시작: 대상 %d개, 워커 %d개", len(self.targets), self.concurrency)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _dispatch(self):
+        """기한이 된 대상을 작업 큐로 전달 (워커가 모두 바쁘면 대기)"""
+        while True:
+            while self._heap and self._heap[0][0] <= time.time():
+                run_at, _, key = heapq.heappop(self._heap)
+                target = self.targets.get(key)
+                if target is None or target["running"] or target["nextRunAt"] != run_at:
+                    continue  # 삭제되었거나 다시 예약된 항목
+                target["running"] = True
+                await self._queue.put(key)
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            target = self.targets.get(key)
+            try:
+                if target is not None:
+                    await self._run(key, target)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, key: Tuple[str, str], target: Dict):
+        request_id_var.set(f"track-{uuid.uuid4().hex[:10]}")  # 추적 실행별 로그 구분
+        started = time.time()
+        self.stats["runs"] += 1
+        try:
+            ranking = await asyncio.wait_for(crawl_place_ranking(target["keyword"], [target["placeUrl"]] if target["placeUrl"] else []), CRAWL_TIMEOUT)
+            if ranking.get("success") and ranking.get("fetchedAt"):
+                # 실행 전에 크롤링된 결과면 캐시 재사용
+                self.stats["deduped" if ranking["fetchedAt"] < started else "crawled"] += 1
+                if RANK_HISTORY_ENABLED:
+                    self.store.record(
+                        target["keyword"], ranking["fetchedAt"], ranking.get("competitors", []),
+                        {target["placeUrl"]: ranking.get("myRank")} if target["placeUrl"] else {}, ranking.get("placeIds")
+                    )
+                target.update(lastRank=ranking.get("myRank"), lastRunAt=started, lastError=None)
+            else:
+                self.stats["failures"] += 1
+                target.update(lastRunAt=started, lastError=ranking.get("error") or "차단 또는 결과 없음")
+        except Exception as e:
+            self.stats["failures"] += 1
+            target.update(lastRunAt=started, lastError=str(e) or type(e).__name__)
+        finally:
+            target["running"] = False
+            if self.targets.get(key) is target:
+                self._schedule(key, self._next_run(target["intervalSeconds"]))
+
+    def snapshot(self) -> Dict:
+        return {
+            "enabled": bool(self._tasks),
+            "targets": len(self.targets),
+            "running": sum(1 for target in self.targets.values() if target["running"]),
+            "nextRunAt": min((target["nextRunAt"] for target in self.targets.values() if not target["running"]), default=None),
+            "concurrency": self.concurrency,
+            **self.stats
         }
+
+rank_tracker = RankTracker(rank_history, TRACKER_CONCURRENCY, TRACKER_JITTER)
+
+# 단계별 타임아웃 실행
+async def run_stage(name: str, coro, timeout: float, fallback: Dict) -> Dict:
+    """코루틴을 단계 타임아웃 안에서 실행 (초과/예외 시 fallback 반환, 소요 시간 기록)"""
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("⏱️  [%s] 단계 타임아웃 (%s초 초과)", name, timeout, extra={"stage": name})
+        result = {**fallback, "success": False, "error": f"타임아웃 ({timeout}초 초과)"}
+    except Exception as e:
+        logger.error("❌ [%s] 단계 오류: %s", name, e, extra={"stage": name})
+        result = {**fallback, "success": False, "error": str(e)}
+    return {**result, "elapsedMs": round((time.perf_counter() - started) * 1000, 1)}
+
+# 네이버 검색광고 API 호출 (캐시 경유)
+async def call_naver_api(keyword: str) -> Dict:
+    """키워드 검색량 조회 (캐시 우선, 없으면 검색광고 API 호출)"""
+    cache_key = keyword_cache_key(keyword)
+    cached = await keyword_cache.get(cache_key)
+    if cached is not None:
+        logger.info("⚡ 검색량 캐시 적중: '%s'", keyword, extra=SAMPLED)
+        return cached
+    
+    return await keyword_flight.do(cache_key, lambda: _load_naver_api(keyword, cache_key))
+
+async def _load_naver_api(keyword: str, cache_key: str) -> Dict:
+    """검색광고 API 호출 후 결과 캐시"""
+    result = await fetch_naver_api(keyword)
+    if result.get("success"):
+        await keyword_cache.set(cache_key, result)
+    elif result.get("error") == "키워드 데이터 없음":
+        # 데이터 없음도 짧게 캐시 (일시적 오류는 캐시하지 않음)
+        await keyword_cache.set(cache_key, result, ttl=KEYWORD_CACHE_NEGATIVE_TTL)
+    return result
+
+# 토큰 버킷 호출 제한
+class TokenBucket:
+    """초당 rate개씩 토큰이 차고 최대 burst개까지 쌓이는 호출 제한기"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.waited = 0  # 토큰을 기다린 호출 수
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens < 1:
+                self.waited += 1
+                # 다음 토큰이 찰 때까지 대기 (락을 잡고 기다려 요청 순서 유지)
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1.0
+                self._updated = time.monotonic()
+            self.tokens -= 1
+
+    def stats(self) -> Dict:
+        return {"rate": self.rate, "burst": self.burst, "tokens": round(self.tokens, 2), "waited": self.waited}
+
+# 업스트림 장애 시 빠른 실패
+class UpstreamUnavailableError(Exception):
+    pass
+
+class CircuitBreaker:
+    """연속 실패가 임계값을 넘으면 일정 시간 호출을 막고, 이후 1건만 시험 호출"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.open_seconds = reset_timeout  # 이번에 열린 시간 (Retry-After로 열리면 그 값)
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.open_seconds:
+            return "half_open"
+        return "open"
+
+    def check(self) -> bool:
+        """호출 가능 여부 확인 (불가 시 UpstreamUnavailableError), 이 호출이 시험 호출이면 True"""
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            logger.warning("🟡 [%s] 서킷 브레이커 시험 호출", self.name)
+            return True
+        self.rejected += 1
+        retry_in = max(0, self.open_seconds - (time.monotonic() - self.opened_at))
+        raise UpstreamUnavailableError(f"{self.name} 일시 차단 중 (서킷 브레이커 열림, {retry_in:.0f}초 후 재시도)")
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.warning("🟢 [%s] 서킷 브레이커 닫힘", self.name)
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+            logger.error("🔴 [%s] 서킷 브레이커 열림 (연속 실패 %d회)", self.name, self.failures)
+            self.opened_at = time.monotonic()
+            self.open_seconds = self.reset_timeout
+            self._trial_in_flight = False
+
+    def open_for(self, seconds: float):
+        """업스트림이 요청한 시간(Retry-After) 동안 호출 차단"""
+        logger.error("🔴 [%s] 서킷 브레이커 열림 (Retry-After %.0f초)", self.name, seconds)
+        self.opened_at = time.monotonic()
+        self.open_seconds = seconds
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        """시험 호출이 성공/실패 기록 없이 끝난 경우 (예외, 취소) 다음 호출이 다시 시험할 수 있게 해제"""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+keywordstool_limiter = TokenBucket(KEYWORDSTOOL_RPS, KEYWORDSTOOL_BURST)
+keywordstool_breaker = CircuitBreaker("keywordstool", BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+# 재시도 대기 시간 계산
+def retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Retry-After 헤더 우선 (그대로, KEYWORDSTOOL_BACKOFF_MAX를 넘을 수 있음), 없으면 지수 백오프 + 전체 지터"""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(KEYWORDSTOOL_BACKOFF_MAX, KEYWORDSTOOL_BACKOFF_BASE * (2 ** attempt)))
+
+# 검색광고 keywordstool 호출 (제한 + 재시도 + 서킷 브레이커)
+async def keywordstool_get(hint_keywords: str) -> httpx.Response:
+    """keywordstool 호출 (429/5xx/네트워크 오류는 백오프 후 재시도, 장애 중에는 즉시 실패)
+
+    Retry-After가 KEYWORDSTOOL_BACKOFF_MAX보다 길면 재시도하지 않고 그 시간 동안 서킷 브레이커를 엽니다.
+    """
+    trial = keywordstool_breaker.check()
+    try:
+        for attempt in range(KEYWORDSTOOL_MAX_RETRIES + 1):
+            await keywordstool_limiter.acquire()
+            try:
+                response = await keywordstool_request(hint_keywords)
+            except httpx.TransportError as e:
+                keywordstool_breaker.record_failure()
+                if attempt == KEYWORDSTOOL_MAX_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+                logger.warning("⚠️  keywordstool 네트워크 오류 (%s), %.1f초 후 재시도 (%d/%d)", type(e).__name__, delay, attempt + 1, KEYWORDSTOOL_MAX_RETRIES)
+            else:
+                if response.status_code == 200:
+                    keywordstool_breaker.record_success()
+                    return response
+                if response.status_code != 429 and response.status_code < 500:
+                    # 429 외 4xx는 요청 문제라 업스트림 상태로 기록하지 않음
+                    return response
+                keywordstool_breaker.record_failure()
+                delay = retry_delay(attempt, response)
+                if delay > KEYWORDSTOOL_BACKOFF_MAX:
+                    # 요청받은 대기가 재시도 예산보다 길면 일찍 재시도해 할당량을 쓰지 않고 즉시 실패
+                    keywordstool_breaker.open_for(delay)
+                    return response
+                if attempt == KEYWORDSTOOL_MAX_RETRIES:
+                    return response
+                logger.warning("⚠️  keywordstool %d, %.1f초 후 재시도 (%d/%d)", response.status_code, delay, attempt + 1, KEYWORDSTOOL_MAX_RETRIES)
+            await asyncio.sleep(delay)
+            trial = keywordstool_breaker.check() or trial
+    finally:
+        if trial:
+            # 성공/실패 기록 없이 끝나도 (디코딩 오류, 취소) 시험 호출 표시가 남지 않게 해제
+            keywordstool_breaker.release_trial()
+
+# 검색광고 keywordstool 단일 호출
+async def keywordstool_request(hint_keywords: str) -> httpx.Response:
+    """서명 헤더를 새로 만들어 keywordstool 호출 (hintKeywords는 쉼표로 최대 5개)"""
+    url = f"{UPSTREAM_HOSTS['keywordstool']}/keywordstool"
+    timestamp = str(int(time.time() * 1000))
+    method = "GET"
+    uri = "/keywordstool"
+    signature = generate_signature(timestamp, method, uri)
+    
+    headers = {
+        "X-Timestamp": timestamp,
+        "X-API-KEY": NAVER_API_LICENSE,
+        "X-Customer": NAVER_API_CUSTOMER_ID,
+        "X-Signature": signature,
+        "Content-Type": "application/json"
+    }
+    
+    params = {
+        "hintKeywords": hint_keywords,
+        "showDetail": "1"
+    }
+    
+    with STAGE_SECONDS.labels("keywordstool").time():
+        try:
+            response = await get_http_client("keywordstool").get(url, headers=headers, params=params)
+        except httpx.TransportError:
+            UPSTREAM_RESPONSES.labels("keywordstool", "error").inc()
+            raise
+    UPSTREAM_RESPONSES.labels("keywordstool", str(response.status_code)).inc()
+    return response
+
+# keywordstool은 공백 없이 대문자로 relKeyword를 돌려주므로 비교할 때 공백/대소문자 무시
+def rel_keyword_key(keyword: str) -> str:
+    return keyword.replace(" ", "").upper()
+
+# 검색광고 API 묶음 호출 (배치용)
+async def fetch_naver_api_group(keywords: List[str]) -> Dict[str, Dict]:
+    """최대 5개 키워드를 keywordstool 한 번으로 조회 (응답에 자기 행이 있는 키워드만 결과 반환)"""
+    try:
+        logger.debug("🔍 묶음 조회: %s", ", ".join(keywords))
+        response = await keywordstool_get(",".join(keywords))
+        if response.status_code != 200:
+            logger.error("API 오류: %d - %s", response.status_code, response.text[:500])
+            return {}
+        rows = response.json().get("keywordList", [])
+    except Exception as e:
+        logger.error("묶음 조회 오류: %s", e)
+        return {}
+    
+    # 키워드별로 자기 행을 맨 앞에 둠 (단건 조회 응답과 같은 순서, 행 선택의 기본값이 다른 키워드 행이 되지 않도록)
+    index = {}
+    for row in rows:
+        index.setdefault(rel_keyword_key(row.get("relKeyword", "")), row)
+    result = {}
+    for keyword in keywords:
+        own = index.get(rel_keyword_key(keyword))
+        if own is not None:
+            result[keyword] = {
+                "success": True,
+                "data": {"keywordList": [own, *(row for row in rows if row is not own)]},
+                "matched_keyword": keyword,
+                "grouped": True
+            }
+    logger.info("✅ 묶음 조회: %d/%d개 키워드 매칭 (%d개 행)", len(result), len(keywords), len(rows))
+    return result
+
+# 네이버 검색광고 API 직접 호출
+async def fetch_naver_api(keyword: str) -> Dict:
+    """네이버 검색광고 API로 키워드 검색량 조회 (원본 우선, 실패 시 지역명 제거)"""
+    try:
+        # 1단계: 원본 키워드 그대로 시도
+        logger.debug("🔍 1단계: 원본 키워드로 검색: '%s'", keyword)
         
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+        response = await keywordstool_get(keyword)  # 원본 키워드 그대로
         
         if response.status_code == 200:
             data = response.json()
             keywords = data.get("keywordList", [])
+            KEYWORD_LOOKUPS.labels("original", "found" if keywords else "empty").inc()
             if keywords:
-                print(f"✅ 원본 키워드로 {len(keywords)}개 발견!")
+                logger.debug("✅ 원본 키워드로 %d개 발견", len(keywords))
                 return {
                     "success": True,
                     "data": data,
                     "matched_keyword": keyword  # 원본 키워드 매칭
                 }
+        else:
+            # 재시도까지 실패한 상태에서 지역명 제거 조회를 또 하면 할당량만 두 배로 씀
+            KEYWORD_LOOKUPS.labels("original", "error").inc()
+            logger.error("API 오류: %d - %s", response.status_code, response.text[:500])
+            return {
+                "success": False,
+                "error": f"API 오류: {response.status_code}",
+                "details": response.text
+            }
         
-        # 2단계: 데이터 없으면 지역명 제거 후 재시도
-        print(f"⚠️  원본 키워드 데이터 없음. 지역명 제거 후 재시도...")
-        
-        regions = ["인천", "서울", "부산", "대구", "대전", "광주", "울산", "세종", "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
-                   "서구", "북구", "동구", "남구", "중구", "청라", "검단", "신도시", "송도", "강남", "강북", "서초", "종로", "마포", "강서", "해운대",
-                   "분당", "일산", "수원", "용인", "성남", "안양", "부천", "안산", "남양주", "화성"]
-        
-        core_keyword = keyword
-        removed_regions = []
-        for region in regions:
-            if region in core_keyword:
-                core_keyword = core_keyword.replace(region + " ", "").replace(region, "")
-                if region not in removed_regions:
-                    removed_regions.append(region)
-        core_keyword = core_keyword.strip()
-        
-        print(f"🔍 2단계: 핵심 키워드로 검색: '{core_keyword}' (제거된 지역: {', '.join(removed_regions) if removed_regions else '없음'})")
-        
-        # 타임스탬프 갱신
-        timestamp = str(int(time.time() * 1000))
-        signature = generate_signature(timestamp, method, uri)
-        
-        headers["X-Timestamp"] = timestamp
-        headers["X-Signature"] = signature
+        # 2단계: 200이지만 데이터 없으면 지역명 제거 후 재시도
+        logger.info("⚠️  원본 키워드 데이터 없음. 지역명 제거 후 재시도: '%s'", keyword)
         
-        params["hintKeywords"] = core_keyword
+        core_keyword, removed_regions = strip_regions(keyword)
         
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+        logger.debug("🔍 2단계: 핵심 키워드로 검색: '%s' (제거된 지역: %s)", core_keyword, ", ".join(removed_regions) if removed_regions else "없음")
         
-        print(f"응답 코드: {response.status_code}")
+        response = await keywordstool_get(core_keyword)
         
         if response.status_code == 200:
             data = response.json()
             keywords = data.get("keywordList", [])
+            KEYWORD_LOOKUPS.labels("region_fallback", "found" if keywords else "empty").inc()
             if keywords:
-                print(f"✅ 핵심 키워드로 {len(keywords)}개 발견!")
+                logger.debug("✅ 핵심 키워드로 %d개 발견", len(keywords))
                 return {
                     "success": True,
                     "data": data,
                     "matched_keyword": core_keyword  # 핵심 키워드 매칭
                 }
             else:
-                print("❌ 키워드 데이터 없음")
+                logger.info("❌ 키워드 데이터 없음: '%s'", keyword)
                 return {
                     "success": False,
                     "error": "키워드 데이터 없음"
                 }
         else:
-            print(f"API 오류: {response.status_code} - {response.text}")
+            KEYWORD_LOOKUPS.labels("region_fallback", "error").inc()
+            logger.error("API 오류: %d - %s", response.status_code, response.text[:500])
             return {
                 "success": False,
                 "error": f"API 오류: {response.status_code}",
                 "details": response.text
             }
+    except UpstreamUnavailableError as e:
+        logger.warning("⛔ %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
     except Exception as e:
-        print(f"API 호출 오류: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("API 호출 오류: %s", e)
         return {
             "success": False,
             "error": str(e)
         }
 
-# 네이버 플레이스 순위 크롤링 (개선 버전)
-def crawl_place_ranking(keyword: str, target_url: Optional[str] = None) -> Dict:
-    """네이버 플레이스 순위 크롤링 (BeautifulSoup + 광고 제외)"""
+# 네이버 플레이스 순위 조회 (캐시 경유)
+async def crawl_place_ranking(keyword: str, target_urls: List[str] = (), depth: Optional[int] = None) -> Dict:
+    """플레이스 순위 조회 (업체 목록은 캐시 우선, 대상별 순위는 매번 계산)
+
+    대상 URL은 플레이스 ID로 정규화해 한 번의 크롤링 결과에서 모두 찾습니다 (myRanks: placeUrl → 순위).
+    상위 10위 안에 못 찾은 대상이 있고 depth가 10보다 크면 다음 페이지를 이어서 조회합니다.
+    competitors는 항상 1페이지(상위 10개)이고, searchedDepth는 실제로 확인한 순위 수입니다.
+    """
+    depth = min(depth or RANK_DEFAULT_DEPTH, RANK_MAX_DEPTH)
+    ranking, targets = await asyncio.gather(load_ranking_page(keyword, 1), resolve_place_ids(target_urls))
+    competitors = ranking.get("competitors", [])
+    ranks: Dict[str, int] = {}
+    find_target_ranks(competitors, targets, ranks)
+    searched = len(competitors)
+    
+    if not all_targets_found(targets, ranks) and depth > searched and ranking.get("success") and not ranking.get("blocked") and searched >= SERP_PAGE_SIZE:
+        progress = {"searched": searched}
+        try:
+            await asyncio.wait_for(
+                find_ranks_in_later_pages(keyword, targets, ranks, competitors, depth, progress), RANK_DEEP_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("⏱️  %d위 이후 순위 조회 시간 초과 (%.0f초): '%s'", progress["searched"], RANK_DEEP_TIMEOUT, keyword)
+        searched = progress["searched"]
+    
+    my_ranks = {url: ranks.get(url) for url in targets}
+    return {
+        **ranking,
+        "myRank": my_ranks[target_urls[0]] if target_urls else None,  # 첫 번째 대상 (단일 대상 호출용)
+        "myRanks": my_ranks,
+        "placeIds": targets,  # 대상 URL → 플레이스 ID (순위 이력 키)
+        "searchedDepth": searched
+    }
+
+async def load_ranking_page(keyword: str, page: int) -> Dict:
+    """결과 페이지 1개 조회 (페이지별 캐시 + single-flight)"""
+    cache_key = serp_cache_key(keyword, page)
+    ranking = await serp_cache.get(cache_key)
+    if ranking is not None:
+        logger.info("⚡ 순위 캐시 적중: '%s' (%d페이지)", keyword, page, extra=SAMPLED)
+        return ranking
+    return await serp_flight.do(cache_key, lambda: _load_place_ranking(keyword, cache_key, page))
+
+async def _load_place_ranking(keyword: str, cache_key: str, page: int = 1) -> Dict:
+    """플레이스 순위 크롤링 후 결과 캐시"""
+    ranking = await fetch_place_ranking(keyword, page)
+    if ranking.get("success") and not ranking.get("blocked"):
+        ranking["fetchedAt"] = time.time()  # 이력 저장 시 같은 크롤링 결과를 구분하는 기준
+        await serp_cache.set(cache_key, ranking)
+    return ranking
+
+async def find_ranks_in_later_pages(
+    keyword: str, targets: Dict[str, Optional[str]], ranks: Dict[str, int], first_page: List[Dict], depth: int, progress: Dict
+):
+    """2페이지부터 순서대로 확인하며 못 찾은 대상의 순위를 ranks에 기록 (progress["searched"]에 확인한 순위 수 기록)
+
+    다음 페이지를 최대 RANK_PAGE_CONCURRENCY개까지 미리 조회하고, 모두 찾았거나 목록이 끝나면
+    아직 기다리는 페이지는 버립니다. (진행 중인 조회는 single-flight에서 끝까지 실행되어 캐시에 남음)
+    """
+    pages = -(-depth // SERP_PAGE_SIZE)
+    seen = {place_key(place) for place in first_page if place.get("url")}
+    window: deque = deque()
+    next_page = 2
     try:
-        print(f"🕷️  크롤링 시작: {keyword}")
-        
-        # 네이버 통합검색 모바일 API 직접 호출
-        import urllib.parse
-        encoded_keyword = urllib.parse.quote(keyword)
-        
-        # 네이버 모바일 검색 결과 페이지
-        search_url = f"https://m.search.naver.com/search.naver?query={encoded_keyword}&sm=mtb_jum&where=m&oquery={encoded_keyword}&tqi=iWe9cdqo15wssZCVXMRsssssttR-215835"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Referer': 'https://m.naver.com/'
-        }
-        
-        print(f"크롤링 URL: {search_url}")
-        response = requests.get(search_url, headers=headers, timeout=30)
-        print(f"응답 코드: {response.status_code}")
-        
+        while True:
+            while next_page <= pages and len(window) < RANK_PAGE_CONCURRENCY:
+                window.append((next_page, asyncio.ensure_future(load_ranking_page(keyword, next_page))))
+                next_page += 1
+            if not window:
+                return
+            page, task = window.popleft()
+            ranking = await task
+            if not ranking.get("success") or ranking.get("blocked"):
+                logger.warning("⚠️  %d페이지 조회 실패, %d위까지만 확인: '%s'", page, progress["searched"], keyword)
+                return
+            # 페이지 사이에 순위가 밀려 겹친 업체는 제외하고 이어서 번호 매김
+            places = [place for place in ranking.get("competitors", []) if not place.get("url") or place_key(place) not in seen]
+            places = [{**place, "rank": progress["searched"] + index} for index, place in enumerate(places[:depth - progress["searched"]], 1)]
+            if not places:
+                return  # 더 이상 새 업체 없음 (마지막 페이지)
+            progress["searched"] += len(places)
+            seen.update(place_key(place) for place in places if place.get("url"))
+            find_target_ranks(places, targets, ranks)
+            if all_targets_found(targets, ranks):
+                logger.debug("✅ %d페이지까지 확인해 모든 대상 순위 발견", page)
+                return
+            if len(ranking.get("competitors", [])) < SERP_PAGE_SIZE:
+                return  # 마지막 페이지
+    finally:
+        for _, task in window:
+            task.cancel()
+
+# 플레이스 URL → 네이버 플레이스 ID
+# 모바일 m.place.naver.com/{업종}/{ID}, PC pcmap.place.naver.com/{업종}/{ID}, 지도 map.naver.com/.../place/{ID}
+PLACE_ID_PATTERN = re.compile(r"(?:place\.naver\.com/[A-Za-z]+|(?:^|/)place)/(\d+)")
+PLACE_ID_QUERY_PATTERN = re.compile(r"[?&](?:id|placeId|place_id)=(\d+)")
+SHORT_LINK_HOSTS = {"naver.me"}
+SHORT_LINK_MAX_HOPS = 3
+
+def extract_place_id(url: str) -> Optional[str]:
+    """URL(또는 숫자 ID)에서 플레이스 ID 추출, 없으면 None"""
+    url = url.strip()
+    if url.isdigit():
+        return url
+    match = PLACE_ID_PATTERN.search(url) or PLACE_ID_QUERY_PATTERN.search(url)
+    return match.group(1) if match else None
+
+def is_naver_host(host: str) -> bool:
+    return host == "naver.com" or host.endswith(".naver.com")
+
+def is_short_link(url: str) -> bool:
+    host = httpx.URL(url if "://" in url else f"https://{url}").host
+    return host in SHORT_LINK_HOSTS
+
+def place_key(place: Dict) -> str:
+    """업체 목록 항목의 비교 키 (플레이스 ID, 없으면 URL)"""
+    return extract_place_id(place["url"]) or place["url"]
+
+async def resolve_place_ids(target_urls: List[str]) -> Dict[str, Optional[str]]:
+    """대상 URL별 플레이스 ID (단축 URL은 리다이렉트를 따라가 확인, ID가 없는 URL은 None)"""
+    targets = dict.fromkeys(url for url in target_urls if url)
+    short_links = []
+    for url in targets:
+        targets[url] = extract_place_id(url)
+        if targets[url] is None and is_short_link(url):
+            short_links.append(url)
+    if short_links:
+        resolved = await asyncio.gather(*[resolve_short_link(url) for url in short_links])
+        targets.update(zip(short_links, resolved))
+    return targets
+
+async def resolve_short_link(url: str) -> Optional[str]:
+    """naver.me 단축 URL의 플레이스 ID (캐시 + single-flight)"""
+    cached = await place_id_cache.get(url)
+    if cached is not None:
+        return cached["placeId"]
+    return await shortlink_flight.do(url, lambda: _resolve_short_link(url))
+
+async def _resolve_short_link(url: str) -> Optional[str]:
+    client = get_http_client("shortlink")
+    location = httpx.URL(url if "://" in url else f"https://{url}")
+    try:
+        for _ in range(SHORT_LINK_MAX_HOPS):
+            if location.host in SHORT_LINK_HOSTS:
+                location = httpx.URL(f"{UPSTREAM_HOSTS['shortlink']}{location.raw_path.decode('ascii')}")
+            elif not is_naver_host(location.host):
+                break  # 네이버 밖으로 가는 리다이렉트는 따라가지 않음
+            response = await client.get(location, follow_redirects=False)
+            if not response.is_redirect:
+                break
+            location = location.join(response.headers["location"])
+            place_id = extract_place_id(str(location)) if is_naver_host(location.host) else None
+            if place_id is not None:
+                await place_id_cache.set(url, {"placeId": place_id})
+                return place_id
+    except httpx.HTTPError as e:
+        logger.warning("⚠️  단축 URL 확인 오류: %s (%s)", url, e)
+        return None
+    logger.warning("⚠️  단축 URL에서 플레이스 ID를 찾을 수 없음: %s", url)
+    return None
+
+def find_target_ranks(places: List[Dict], targets: Dict[str, Optional[str]], ranks: Dict[str, int]):
+    """아직 못 찾은 대상의 순위를 업체 목록에서 찾아 ranks에 기록 (플레이스 ID 해시 조회)"""
+    index: Dict[str, int] = {}
+    for place in places:
+        place_id = extract_place_id(place.get("url", ""))
+        if place_id is not None:
+            index.setdefault(place_id, place["rank"])
+    for url, place_id in targets.items():
+        if url in ranks:
+            continue
+        # ID가 없는 URL 형식은 기존 부분 문자열 비교
+        rank = index.get(place_id) if place_id is not None else find_my_rank(places, url)
+        if rank is not None:
+            ranks[url] = rank
+
+def all_targets_found(targets: Dict[str, Optional[str]], ranks: Dict[str, int]) -> bool:
+    """찾을 수 있는 대상(확인 못 한 단축 URL 제외)을 모두 찾았는지"""
+    return all(url in ranks for url, place_id in targets.items() if place_id is not None or not is_short_link(url))
+
+# 내 플레이스 순위 찾기
+def find_my_rank(places: List[Dict], target_url: Optional[str]) -> Optional[int]:
+    """업체 목록에서 대상 URL과 일치하는 순위 반환"""
+    my_rank = None
+    if not target_url:
+        return my_rank
+    for place in places:
+        place_url = place.get("url", "")
+        if place_url and (target_url in place_url or place_url in target_url):
+            my_rank = place["rank"]
+            logger.debug("✅ 내 순위 발견: %d위", my_rank)
+    return my_rank
+
+# 네이버 플레이스 순위 크롤링 (개선 버전)
+async def fetch_place_ranking(keyword: str, page: int = 1) -> Dict:
+    """네이버 플레이스 순위 크롤링 (조회 단계 → 파싱 단계)"""
+    try:
+        response = await fetch_serp(keyword, page)
         if response.status_code != 200:
-            print(f"❌ HTTP {response.status_code} 오류")
+            logger.warning("❌ 크롤링 HTTP %d 오류: %s", response.status_code, keyword)
             return {
                 "success": False,
                 "myRank": None,
                 "competitors": []
             }
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        places = []
-        my_rank = None
-        rank = 0
-        
-        # 여러 선택자 패턴 시도
-        selectors = [
-            'div.place_didyoumean ul li',
-            'div.list_image_type ul li',
-            'ul.list_search li',
-            'div.api_subject_bx ul li',
-            'div[class*="place"] ul li',
-            'li[class*="place"]',
-            'ul[class*="list"] > li'
-        ]
-        
-        place_containers = []
-        for selector in selectors:
-            elements = soup.select(selector)
-            if elements:
-                print(f"✅ 선택자 '{selector}' - {len(elements)}개 발견")
-                place_containers = elements
-                break
-        
-        if not place_containers:
-            print("⚠️  플레이스 컨테이너를 찾을 수 없음")
-            # HTML 구조 분석 출력
-            print(f"HTML 길이: {len(response.text)} bytes")
-            print(f"HTML 샘플:\n{response.text[:1000]}")
-            
-            # 대안: 간단한 예시 데이터 반환
-            return {
-                "success": True,
-                "myRank": None,
-                "competitors": [
-                    {"rank": 1, "name": "크롤링 제한", "category": "네이버 보안", "reviewCount": 0, "url": ""},
-                    {"rank": 2, "name": "실제 순위는", "category": "브라우저에서", "reviewCount": 0, "url": ""},
-                    {"rank": 3, "name": "확인 가능", "category": "수동 확인", "reviewCount": 0, "url": ""}
-                ]
-            }
-        
-        print(f"총 {len(place_containers)}개 플레이스 발견")
-        
-        for idx, place in enumerate(place_containers[:20], 1):
-            try:
-                # 광고 제외
-                ad_marker = place.select_one('.ad_marker, .ad, [class*="ad"], [class*="Ad"]')
-                if ad_marker:
-                    ad_classes = str(ad_marker.get('class', []))
-                    if 'ad' in ad_classes.lower():
-                        print(f"광고 제외: {idx}")
-                        continue
-                
-                rank += 1
-                
-                # 업체명
-                name_elem = place.select_one('.place_bluelink, .YwYLL, span.place_name, strong.name, .tit, a.title')
-                name = name_elem.get_text(strip=True) if name_elem else f"업체 {rank}"
-                
-                # 카테고리
-                category_elem = place.select_one('.category, .cate, .type, .KCMnt, .info_distance')
-                category = category_elem.get_text(strip=True) if category_elem else "일반"
-                
-                # 리뷰 수
-                review_count = 0
-                review_elem = place.select_one('.review_count, .cnt, em.num, .NSTUp, .review')
-                if review_elem:
-                    review_text = review_elem.get_text(strip=True)
-                    numbers = ''.join(filter(str.isdigit, review_text))
-                    review_count = int(numbers) if numbers else 0
-                
-                # URL
-                link_elem = place.select_one('a[href*="place.naver.com"], a[href*="/place/"], a.place_bluelink, a.title')
-                place_url = ""
-                if link_elem:
-                    href = link_elem.get('href', '')
-                    if href.startswith('http'):
-                        place_url = href
-                    elif href.startswith('/'):
-                        place_url = f"https://m.place.naver.com{href}"
-                    else:
-                        place_url = f"https://m.place.naver.com/{href}"
-                
-                place_info = {
-                    "rank": rank,
-                    "name": name,
-                    "category": category,
-                    "reviewCount": review_count,
-                    "url": place_url
-                }
-                
-                print(f"순위 {rank}: {name} ({category}) - {review_count}개 리뷰")
-                
-                places.append(place_info)
-                
-                # 내 순위 확인
-                if target_url and place_url and (target_url in place_url or place_url in target_url):
-                    my_rank = rank
-                    print(f"✅ 내 순위 발견: {rank}위")
-                
-                # 상위 10개만 수집
-                if rank >= 10:
-                    break
-                    
-            except Exception as e:
-                print(f"플레이스 파싱 오류 (idx={idx}): {str(e)}")
-                continue
-        
-        print(f"✅ 총 {len(places)}개 플레이스 추출 완료")
-        
-        return {
-            "success": True,
-            "myRank": my_rank,
-            "competitors": places[:10]
-        }
+        # 디코딩 전 원본 바이트만 파싱 프로세스로 전달
+        return await parse_serp(response.content, response.encoding)
         
     except Exception as e:
-        print(f"❌ 크롤링 오류: {str(e)}")
-        traceback.print_exc()
+        logger.exception("❌ 크롤링 오류: %s", e)
         return {
             "success": False,
             "error": str(e),
             "myRank": None,
             "competitors": []
         }
-        if driver:
+
+# 모바일 통합검색 HTML 조회 (네트워크 단계)
+async def fetch_serp(keyword: str, page: int = 1) -> httpx.Response:
+    client = get_http_client("serp")
+    logger.debug("🕷️  크롤링 시작: %s (%d페이지)", keyword, page)
+    
+    # 네이버 통합검색 모바일 API 직접 호출
+    import urllib.parse
+    encoded_keyword = urllib.parse.quote(keyword)
+    
+    # 네이버 모바일 검색 결과 페이지
+    search_url = f"{UPSTREAM_HOSTS['serp']}/search.naver?query={encoded_keyword}&sm=mtb_jum&where=m&oquery={encoded_keyword}&tqi=iWe9cdqo15wssZCVXMRsssssttR-215835"
+    if page > 1:
+        # 가정: where=m 검색에서 start=로 넘긴 다음 페이지에도 플레이스 목록이 이어서 나옴 (11위 이후 순위는 이 가정에 의존)
+        # 네이버가 페이지 이동 시 플레이스 영역을 빼면 2페이지부터 빈 목록이 되어 searchedDepth가 10에서 멈춤
+        search_url += f"&start={serp_page_start(page)}"
+        
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Referer': 'https://m.naver.com/'
+    }
+    
+    logger.debug("크롤링 URL: %s", search_url)
+    with STAGE_SECONDS.labels("serp_fetch").time():
+        try:
+            response = await client.get(search_url, headers=headers)
+        except httpx.TransportError:
+            UPSTREAM_RESPONSES.labels("serp", "error").inc()
+            raise
+    UPSTREAM_RESPONSES.labels("serp", str(response.status_code)).inc()
+    return response
+
+# 플레이스 목록 파싱
+def parse_place_list(html: str, backend=None) -> Dict:
+    """모바일 통합검색 HTML에서 광고를 제외한 상위 10개 플레이스 추출"""
+    parser = backend or get_parser_backend()
+    matches: SelectorMatches = {}
+    with STAGE_SECONDS.labels("parse").time():
+        result = _parse_with_fallback(html, parser, matches)
+    record_selector_matches(matches)
+    return result
+
+def record_selector_matches(matches: SelectorMatches):
+    """파싱 중 일치한 선택자를 지표에 반영 (파싱 프로세스 결과도 여기서 집계)"""
+    for (parser_name, field, index, lookup), count in matches.items():
+        SELECTOR_MATCHES.labels(parser_name, field, index).inc(count)
+        if lookup:
+            SELECTOR_CACHE_LOOKUPS.labels(parser_name, field, lookup).inc(count)
+
+# SERP 파싱 프로세스 풀 (파싱은 GIL을 잡는 CPU 작업이라 별도 프로세스에서 실행)
+PARSE_POOL: Optional[ProcessPoolExecutor] = None
+
+async def open_parse_pool():
+    """파싱 프로세스 풀 생성 후 워커마다 미리 임포트/파서 준비 (첫 요청 지연 방지)"""
+    global PARSE_POOL
+    if PARSE_WORKERS <= 0 or PARSE_POOL is not None:
+        return
+    # fork는 로깅/이벤트 루프 스레드의 잠금 상태까지 복사하므로 spawn 사용 (워커는 serp_parser만 임포트)
+    PARSE_POOL = ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_parse_worker, initargs=(LOG_LEVEL,)
+    )
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    backends = await asyncio.gather(*[loop.run_in_executor(PARSE_POOL, warm_parse_worker) for _ in range(PARSE_WORKERS)])
+    logger.info("🧩 파싱 프로세스 %d개 준비 (%s, %.1f초)", PARSE_WORKERS, backends[0], time.perf_counter() - started)
+
+def close_parse_pool():
+    global PARSE_POOL
+    if PARSE_POOL is not None:
+        PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+        PARSE_POOL = None
+
+# 손상된 풀 재생성 (동시에 실패한 요청이 여러 번 재생성하지 않도록 잠금 + 현재 풀 확인)
+PARSE_POOL_LOCK = asyncio.Lock()
+PARSE_POOL_REBUILD: Optional[asyncio.Task] = None  # 진행 중인 재생성 작업 (참조 유지, 종료 시 취소)
+
+async def rebuild_parse_pool(broken: ProcessPoolExecutor):
+    """손상된 풀이 아직 현재 풀일 때만 교체 (늦게 실패한 요청이 새로 만든 풀을 닫지 않도록)"""
+    async with PARSE_POOL_LOCK:
+        if PARSE_POOL is not broken:
+            return
+        close_parse_pool()
+        try:
+            await open_parse_pool()
+        except Exception as e:
+            logger.error("❌ 파싱 프로세스 풀 재생성 실패, 현재 스레드에서 파싱: %s", e)
+            close_parse_pool()
+
+def schedule_parse_pool_rebuild(broken: ProcessPoolExecutor):
+    global PARSE_POOL_REBUILD
+    if broken is PARSE_POOL and (PARSE_POOL_REBUILD is None or PARSE_POOL_REBUILD.done()):
+        PARSE_POOL_REBUILD = asyncio.create_task(rebuild_parse_pool(broken))
+
+async def cancel_parse_pool_rebuild():
+    if PARSE_POOL_REBUILD is not None and not PARSE_POOL_REBUILD.done():
+        PARSE_POOL_REBUILD.cancel()
+        await asyncio.gather(PARSE_POOL_REBUILD, return_exceptions=True)
+
+async def parse_serp(raw: bytes, encoding: Optional[str] = None) -> Dict:
+    """파싱 단계 (풀이 있으면 프로세스 풀, 없으면 현재 스레드에서 실행)"""
+    pool = PARSE_POOL
+    with STAGE_SECONDS.labels("parse").time():
+        if pool is None:
+            result, matches = parse_serp_bytes(raw, encoding)
+        else:
             try:
-                driver.quit()
-                print("✅ WebDriver 정상 종료")
-            except Exception as e:
-                print(f"⚠️  WebDriver 종료 오류: {str(e)}")
+                result, matches = await asyncio.get_running_loop().run_in_executor(pool, parse_serp_bytes, raw, encoding)
+            except BrokenProcessPool:
+                # 워커가 비정상 종료되면 이번 요청은 직접 파싱하고 풀은 다음 요청부터 새로 생성
+                logger.error("❌ 파싱 프로세스 풀 손상, 현재 스레드에서 파싱 후 풀 재생성")
+                schedule_parse_pool_rebuild(pool)
+                result, matches = parse_serp_bytes(raw, encoding)
+    record_selector_matches(matches)
+    return result
+
+# 경쟁사 키워드 규칙 엔진
+def compile_trie_pattern(terms: List[str]) -> str:
+    """단어 목록을 접두사 트리 형태의 정규식으로 변환 (위치마다 모든 단어를 비교하지 않고 글자 단위로 분기, 가장 긴 단어 우선)"""
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # 단어 끝
+    
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+    
+    return build(trie)
+
+class CompetitorKeywordRules:
+    """업종별 규칙표(JSON)를 단어 하나의 정규식으로 컴파일해 업체명/카테고리에서 키워드와 점수 계산
+
+    규칙 단어, 업종 판별 단어, 지역명을 모두 한 패턴에 넣고 전체 경쟁사 텍스트를 이어 붙여 한 번만 훑습니다.
+    업종은 일치한 단어가 가장 많은 업종(동점이면 규칙표 순서)이고, 키워드 점수는 규칙 가중치 × 필드 가중치의 합입니다.
+    순위 캐시에서 같은 업체가 반복되므로 (업체명, 카테고리)별 결과를 cache_size개까지 보관합니다.
+    """
+
+    def __init__(self, table: Dict, regions: List[str], cache_size: int = 4096):
+        self.field_weights = table.get("fieldWeights", {"name": 1.0, "category": 1.0})
+        self.max_keywords = table.get("maxKeywords", 8)
+        self.region_weight = table.get("regionWeight", 1)
+        self.industries = table["industries"]
+        self.default_industry = table.get("defaultIndustry") or next(iter(self.industries))
+        self.order = list(self.industries)
+        
+        # 단어 → [(종류, 업종, 규칙 순번 또는 지역명)]
+        self.meanings: Dict[str, List[Tuple]] = {}
+        for industry, spec in self.industries.items():
+            for term in spec.get("detect", []):
+                self.meanings.setdefault(term.lower(), []).append(("detect", industry, None))
+            for index, rule in enumerate(spec["rules"]):
+                for term in rule["match"]:
+                    self.meanings.setdefault(term.lower(), []).append(("rule", industry, index))
+        for region in dict.fromkeys([*regions, *table.get("extraRegions", [])]):
+            self.meanings.setdefault(region.lower(), []).append(("region", None, region))
+        
+        terms = list(self.meanings)
+        # 같은 위치에서는 가장 긴 단어만 일치하므로 그 안에 든 짧은 단어도 함께 일치한 것으로 처리
+        self.contained = {term: [other for other in terms if other in term] for term in terms}
+        # 전방 탐색으로 위치마다 검사해 겹치는 단어도 모두 찾음 (예: "영어유치원" 안의 "영어")
+        # 첫 글자 문자 집합으로 먼저 걸러 대부분의 위치는 트리 정규식까지 가지 않음 (텍스트는 소문자로 바꿔 비교)
+        first_chars = "".join(sorted({re.escape(term[0]) for term in terms}))
+        self.pattern = re.compile(f"(?=[{first_chars}])(?=({compile_trie_pattern(terms)}))")
+        self.rule_fields = {
+            (industry, index): frozenset(rule.get("fields", ("name", "category")))
+            for industry, spec in self.industries.items() for index, rule in enumerate(spec["rules"])
+        }
+        # 업종별 키워드 출력 순서 (점수 동점일 때 규칙표 순서)
+        self.keyword_order = {
+            industry: {keyword: index for index, keyword in enumerate(dict.fromkeys(
+                keyword for rule in spec["rules"] for keyword in rule["keywords"]
+            ))}
+            for industry, spec in self.industries.items()
+        }
+        self.cache_size = cache_size
+        self._results: "OrderedDict[Tuple[str, str], Tuple[str, List[Tuple[str, float]]]]" = OrderedDict()
+
+    @classmethod
+    def load(cls, path: str, regions: List[str]) -> "CompetitorKeywordRules":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), regions)
+
+    def analyze(self, competitors: List[Dict]) -> List[Tuple[str, List[Tuple[str, float]]]]:
+        """경쟁사별 (업종, 점수 순 [(키워드, 점수)]) (캐시에 없는 업체만 모아 한 번에 매칭)"""
+        keys = [(comp.get("name", ""), comp.get("category", "")) for comp in competitors]
+        missing = [key for key in dict.fromkeys(keys) if key not in self._results]
+        for key, matches in zip(missing, self.match_all(missing)):
+            self._results[key] = self.score(matches)
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        results = []
+        for key in keys:
+            self._results.move_to_end(key)
+            results.append(self._results[key])
+        return results
+
+    def match_all(self, texts: List[Tuple[str, str]]) -> List[Dict[Tuple[str, str], None]]:
+        """(업체명, 카테고리)별로 일치한 (단어, 필드) 목록 (전체 텍스트를 정규식 한 번으로 처리)"""
+        starts, name_ends, parts = [], [], []
+        position = 0
+        for name, category in texts:
+            starts.append(position)
+            name_ends.append(position + len(name))
+            parts.append(f"{name}\x1e{category}")
+            position += len(name) + len(category) + 2  # 구분 문자 2개 (\x1e, \x1f)
+        
+        found: List[Dict[Tuple[str, str], None]] = [{} for _ in texts]
+        for match in self.pattern.finditer("\x1f".join(parts).lower()):
+            index = bisect.bisect_right(starts, match.start()) - 1
+            field = "name" if match.start() < name_ends[index] else "category"
+            for term in self.contained[match.group(1)]:
+                found[index][(term, field)] = None
+        return found
+
+    def score(self, matches: Dict[Tuple[str, str], None]) -> Tuple[str, List[Tuple[str, float]]]:
+        """(업종, 점수 순 [(키워드, 점수)]) 계산"""
+        evidence = dict.fromkeys(self.order, 0.0)
+        rules: Dict[Tuple[str, int], float] = {}  # (업종, 규칙 순번) → 일치한 필드 가중치 최댓값
+        region = None
+        for term, field in matches:
+            weight = self.field_weights.get(field, 1.0)
+            for kind, industry, value in self.meanings[term]:
+                if kind == "region":
+                    if field == "name" and region is None:
+                        region = value
+                    continue
+                evidence[industry] += weight
+                if kind == "rule" and field in self.rule_fields[(industry, value)]:
+                    rules[(industry, value)] = max(rules.get((industry, value), 0.0), weight)
+        
+        best = max(evidence.values())
+        industry = self.default_industry if best == 0 else next(name for name in self.order if evidence[name] == best)
+        spec = self.industries[industry]
+        
+        scores: Dict[str, float] = {}
+        for (rule_industry, index), weight in rules.items():
+            if rule_industry != industry:
+                continue
+            rule = spec["rules"][index]
+            for keyword in rule["keywords"]:
+                scores[keyword] = scores.get(keyword, 0.0) + rule.get("weight", 1) * weight
+        if region is not None and scores:
+            region_keyword = f"{region}{spec['regionSuffix']}"
+            scores[region_keyword] = scores.get(region_keyword, 0.0) + self.region_weight
+        
+        order = self.keyword_order[industry]
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], order.get(item[0], len(order)), item[0]))
+        if not ranked:
+            ranked = [(keyword, 0.0) for keyword in spec.get("defaults", [])]
+        return industry, [(keyword, round(score, 2)) for keyword, score in ranked[:self.max_keywords]]
+
+COMPETITOR_RULES = CompetitorKeywordRules.load(COMPETITOR_RULES_PATH, REGIONS)
 
 # 경쟁사 키워드 추출
 def extract_competitor_keywords(competitors: List[Dict]) -> List[Dict]:
-    """경쟁사 키워드 추출 (개선 버전)"""
+    """경쟁사별 업종과 점수 순 키워드 (전체 경쟁사를 규칙 엔진 한 번으로 처리)"""
     result = []
-    
-    for comp in competitors[:5]:  # 상위 5개 경쟁사만
-        keywords = []
-        
-        # 업체명에서 키워드 추출
-        name = comp.get("name", "")
-        category = comp.get("category", "")
-        
-        # 업체명에서 핵심 키워드 추출
-        if "영어" in name or "영어" in category or "English" in name:
-            keywords.extend(["영어학원", "영어교육", "영어회화", "토익", "토플"])
-        if "수학" in name or "수학" in category:
-            keywords.extend(["수학학원", "수학교육", "수학전문", "수능수학"])
-        if "국어" in name or "논술" in name:
-            keywords.extend(["국어학원", "논술학원", "독서논술"])
-        if "과학" in name:
-            keywords.extend(["과학학원", "과학교육"])
-        if "학원" in name:
-            keywords.append("종합학원")
-        if "교습소" in name or "교실" in name:
-            keywords.append("교습소")
-        if "아카데미" in name or "Academy" in name:
-            keywords.append("아카데미")
-            
-        # 대상 학년 추출
-        if any(word in name for word in ["초등", "유아", "어린이"]):
-            keywords.append("초등학원")
-        if "중등" in name or "중학" in name:
-            keywords.append("중등학원")
-        if "고등" in name or "입시" in name:
-            keywords.append("고등학원")
-            
-        # 지역명 추출
-        regions = ["인천", "서구", "청라", "검단", "경서", "가정", "석남"]
-        for region in regions:
-            if region in name:
-                keywords.append(f"{region}학원")
-                break
-        
-        # 특수 프로그램
-        if any(word in name for word in ["원어민", "화상", "스피킹"]):
-            keywords.append("원어민영어")
-        if "방과후" in name:
-            keywords.append("방과후학원")
-            
-        # 중복 제거 및 최대 8개로 제한
-        keywords = list(set(keywords))[:8]
-        
-        # 키워드가 없으면 기본 키워드 추가
-        if not keywords:
-            keywords = ["학원", "교육", "학습"]
-        
+    for comp, (industry, scored) in zip(competitors, COMPETITOR_RULES.analyze(competitors)):
         result.append({
-            "businessName": name,
-            "keywords": keywords
+            "businessName": comp.get("name", ""),
+            "rank": comp.get("rank"),
+            "industry": industry,
+            "keywords": [keyword for keyword, _ in scored],
+            "scoredKeywords": [{"keyword": keyword, "score": score} for keyword, score in scored]
         })
-    
     return result
 
-# 관련 키워드 추출
-def extract_related_keywords(api_response: Dict, original_keyword: str = "", limit: int = 10) -> List[Dict]:
-    """네이버 API에서 관련 키워드 추출 (CTR 포함)"""
-    try:
-        if not api_response.get("success"):
-            return []
-        
-        data = api_response.get("data", {})
-        keywords = data.get("keywordList", [])
-        
-        if not keywords:
-            return []
-        
-        # 상위 N개 키워드 추출
-        result = []
-        for kw in keywords[:limit]:
-            monthly_pc = kw.get("monthlyPcQcCnt", 0)
-            monthly_mobile = kw.get("monthlyMobileQcCnt", 0)
-            total_search = monthly_pc + monthly_mobile
-            
-            # CTR (클릭률) 계산
-            pc_ctr = kw.get("monthlyAvePcCtr", 0)
-            mobile_ctr = kw.get("monthlyAveMobileCtr", 0)
-            
-            # 가중 평균 CTR
-            if total_search > 0:
-                weighted_ctr = (pc_ctr * monthly_pc + mobile_ctr * monthly_mobile) / total_search
-            else:
-                weighted_ctr = 0
-            
-            # 경쟁 강도
-            comp_idx = kw.get("compIdx", "01")
-            comp_map = {
-                "01": "낮음",
-                "02": "보통",
-                "03": "높음",
-                "04": "매우 높음"
-            }
-            competition = comp_map.get(comp_idx, "보통")
-            
-            result.append({
-                "keyword": kw.get("relKeyword", ""),
-                "monthlySearchVolume": total_search,
-                "monthlyPcSearch": monthly_pc,
-                "monthlyMobileSearch": monthly_mobile,
-                "averageCtr": round(weighted_ctr, 2),  # 평균 클릭률 (%)
-                "pcCtr": round(pc_ctr, 2),
-                "mobileCtr": round(mobile_ctr, 2),
-                "competition": competition
-            })
-        
-        return result
-        
-    except Exception as e:
-        print(f"관련 키워드 추출 오류: {str(e)}")
-        return []
+def summarize_competitor_keywords(entries: List[Dict], limit: int = 20) -> List[Dict]:
+    """경쟁사 전체 기준 키워드 점수 합계 (점수 → 사용 업체 수 → 이름 순)"""
+    totals: Dict[str, List] = {}
+    for entry in entries:
+        for item in entry["scoredKeywords"]:
+            total = totals.setdefault(item["keyword"], [0.0, 0])
+            total[0] += item["score"]
+            total[1] += 1
+    ranked = sorted(totals.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+    return [{"keyword": keyword, "score": round(score, 2), "businesses": count} for keyword, (score, count) in ranked[:limit]]
 
-# 검색량 데이터 파싱 (확장 버전)
-def parse_search_volume_extended(api_response: Dict, original_keyword: str = "") -> Dict:
-    """네이버 API 응답에서 검색량 + CTR 데이터 파싱"""
-    try:
-        if not api_response.get("success"):
-            return {
-                "monthlyAvg": 0,
-                "monthlyPcSearch": 0,
-                "monthlyMobileSearch": 0,
-                "averageCtr": 0,
-                "pcCtr": 0,
-                "mobileCtr": 0,
-                "competition": "알 수 없음",
-                "recommendation": "분석중"
-            }
-        
-        data = api_response.get("data", {})
-        keywords = data.get("keywordList", [])
-        
-        if not keywords:
-            return {
-                "monthlyAvg": 0,
-                "monthlyPcSearch": 0,
-                "monthlyMobileSearch": 0,
-                "averageCtr": 0,
-                "pcCtr": 0,
-                "mobileCtr": 0,
-                "competition": "낮음",
-                "recommendation": "데이터 없음"
-            }
-        
-        # 원본 키워드와 정확히 일치하는 키워드 찾기
-        keyword_data = keywords[0]  # 기본값: 첫 번째 키워드
-        matched_keyword = keywords[0].get("relKeyword", "")
-        
-        if original_keyword:
-            # 지역명 제거
-            regions = ["인천", "서울", "부산", "대구", "대전", "광주", "울산", "세종", "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
-                       "서구", "북구", "동구", "남구", "중구", "청라", "검단", "송도", "강남", "강북", "서초", "종로", "마포", "강서", "해운대",
-                       "분당", "일산", "수원", "용인", "성남", "안양", "부천", "안산", "남양주", "화성"]
-            core_original = original_keyword
-            for region in regions:
-                core_original = core_original.replace(region + " ", "").replace(region, "")
-            core_original = core_original.strip()
-            
-            # 1순위: 지역 제거한 핵심 키워드로 정확 일치
-            for kw in keywords:
-                if kw.get("relKeyword", "").strip() == core_original:
-                    keyword_data = kw
-                    matched_keyword = kw.get("relKeyword", "")
-                    print(f"✅ 핵심 키워드 일치: '{matched_keyword}'")
-                    break
-            else:
-                # 2순위: 부분 일치
-                for kw in keywords:
-                    rel_kw = kw.get("relKeyword", "").strip()
-                    if core_original in rel_kw or rel_kw in core_original:
-                        keyword_data = kw
-                        matched_keyword = kw.get("relKeyword", "")
-                        print(f"✅ 유사 키워드 사용: '{matched_keyword}'")
-                        break
-        
-        monthly_pc = keyword_data.get("monthlyPcQcCnt", 0)
-        monthly_mobile = keyword_data.get("monthlyMobileQcCnt", 0)
-        monthly_avg = monthly_pc + monthly_mobile
-        
-        # CTR 데이터
-        pc_ctr = keyword_data.get("monthlyAvePcCtr", 0)
-        mobile_ctr = keyword_data.get("monthlyAveMobileCtr", 0)
-        
-        # 가중 평균 CTR
-        if monthly_avg > 0:
-            weighted_ctr = (pc_ctr * monthly_pc + mobile_ctr * monthly_mobile) / monthly_avg
-        else:
-            weighted_ctr = 0
-        
-        comp_idx = keyword_data.get("compIdx", "01")
-        
-        # 경쟁 강도 판단
-        comp_map = {
-            "01": "낮음",
-            "02": "보통",
-            "03": "높음",
-            "04": "매우 높음"
-        }
-        competition = comp_map.get(comp_idx, "보통")
-        
-        # 추천도 판단
-        if monthly_avg >= 1000 and comp_idx in ["01", "02"]:
-            recommendation = "적극 추천"
-        elif monthly_avg >= 500:
-            recommendation = "추천"
-        elif monthly_avg >= 100:
-            recommendation = "보통"
-        else:
-            recommendation = "낮은 검색량"
-        
+# 경쟁 강도 코드 (keywordstool compIdx는 "낮음"/"중간"/"높음" 문자열, 이전 형식의 코드도 인식)
+COMP_MAP = {
+    "01": "낮음",
+    "02": "보통",
+    "03": "높음",
+    "04": "매우 높음",
+    "낮음": "낮음",
+    "중간": "보통",
+    "높음": "높음"
+}
+
+# 검색량 조회 실패/데이터 없음/오류 시 기본값
+SEARCH_VOLUME_EXTENDED_DEFAULTS = {
+    "monthlyAvg": 0,
+    "monthlyPcSearch": 0,
+    "monthlyMobileSearch": 0,
+    "averageCtr": 0,
+    "pcCtr": 0,
+    "mobileCtr": 0
+}
+
+# 경쟁 강도 순서 (필터/정렬용)
+COMPETITION_ORDER = {"낮음": 1, "보통": 2, "높음": 3, "매우 높음": 4}
+
+# 검색량 값 정규화
+def to_count(value) -> int:
+    """keywordstool은 10 미만 검색량을 "< 10" 문자열로 돌려주므로 0으로 취급"""
+    return value if isinstance(value, (int, float)) else 0
+
+# 키워드 행 지표 계산
+def keyword_metrics(kw: Dict) -> Dict:
+    """검색량 / 가중 평균 CTR / 경쟁 강도 계산"""
+    monthly_pc = to_count(kw.get("monthlyPcQcCnt", 0))
+    monthly_mobile = to_count(kw.get("monthlyMobileQcCnt", 0))
+    total_search = monthly_pc + monthly_mobile
+    
+    # CTR (클릭률)
+    pc_ctr = kw.get("monthlyAvePcCtr", 0)
+    mobile_ctr = kw.get("monthlyAveMobileCtr", 0)
+    
+    # 가중 평균 CTR
+    if total_search > 0:
+        weighted_ctr = (pc_ctr * monthly_pc + mobile_ctr * monthly_mobile) / total_search
+    else:
+        weighted_ctr = 0
+    
+    comp_idx = kw.get("compIdx", "01")
+    return {
+        "monthlyPc": monthly_pc,
+        "monthlyMobile": monthly_mobile,
+        "total": total_search,
+        "pcCtr": pc_ctr,
+        "mobileCtr": mobile_ctr,
+        "weightedCtr": weighted_ctr,
+        "compIdx": comp_idx,
+        "competition": COMP_MAP.get(comp_idx, "보통")
+    }
+
+# 추천도 판단
+def recommend(monthly_avg: int, competition: str) -> str:
+    if monthly_avg >= 1000 and competition in ["낮음", "보통"]:
+        return "적극 추천"
+    elif monthly_avg >= 500:
+        return "추천"
+    elif monthly_avg >= 100:
+        return "보통"
+    return "낮은 검색량"
+
+# 원본 키워드에 해당하는 행 선택
+def select_keyword_row(keywords: List[Dict], index: Dict[str, Dict], core_original: str) -> Dict:
+    """1순위 핵심 키워드 일치(색인 조회), 2순위 부분 일치, 없으면 첫 번째 행 (공백/대소문자 무시)"""
+    core_key = rel_keyword_key(core_original)
+    row = index.get(core_key)
+    if row is not None:
+        logger.debug("✅ 핵심 키워드 일치: '%s'", row.get("relKeyword", ""))
+        return row
+    for kw in keywords:
+        rel_kw = rel_keyword_key(kw.get("relKeyword", "").strip())
+        if core_key in rel_kw or rel_kw in core_key:
+            logger.debug("✅ 유사 키워드 사용: '%s'", kw.get("relKeyword", ""))
+            return kw
+    return keywords[0]
+
+# 관련 키워드 정렬/필터 적용
+def select_related_rows(keywords: List[Dict], options: RelatedKeywordOptions) -> List[Tuple[Dict, Dict]]:
+    """조건에 맞는 행 중 상위 limit개를 크기 제한 힙으로 선택 (O(n log k), 전체 목록 복사 없음)"""
+    min_comp = COMPETITION_ORDER.get(options.minCompetition, 0)
+    max_comp = COMPETITION_ORDER.get(options.maxCompetition, len(COMPETITION_ORDER))
+    
+    def matching():
+        for kw in keywords:
+            metrics = keyword_metrics(kw)
+            competition = COMPETITION_ORDER[metrics["competition"]]
+            if options.minSearchVolume is not None and metrics["total"] < options.minSearchVolume:
+                continue
+            if options.maxSearchVolume is not None and metrics["total"] > options.maxSearchVolume:
+                continue
+            if options.minCtr is not None and metrics["weightedCtr"] < options.minCtr:
+                continue
+            if options.maxCtr is not None and metrics["weightedCtr"] > options.maxCtr:
+                continue
+            if not min_comp <= competition <= max_comp:
+                continue
+            yield kw, metrics
+    
+    if options.sortBy is None:
+        # 정렬 없이 네이버 순서대로 앞에서부터
+        return [row for _, row in zip(range(options.limit), matching())]
+    
+    sort_value = {
+        "monthlySearchVolume": lambda metrics: metrics["total"],
+        "averageCtr": lambda metrics: metrics["weightedCtr"],
+        "competition": lambda metrics: COMPETITION_ORDER[metrics["competition"]],
+    }[options.sortBy]
+    sign = 1 if options.descending else -1
+    # 동점이면 네이버 응답 순서 유지 (nlargest는 안정 정렬과 동일한 결과)
+    return heapq.nlargest(options.limit, matching(), key=lambda row: sign * sort_value(row[1]))
+
+# keywordList 한 번 훑어 세 가지 결과 생성
+def analyze_keyword_list(api_response: Dict, original_keyword: str = "", core_keyword: Optional[str] = None, limit: int = 10, related_options: Optional[RelatedKeywordOptions] = None) -> Dict:
+    """검색량(확장/기본)과 관련 키워드를 keywordList 색인 하나로 계산"""
+    if not api_response.get("success"):
         return {
-            "monthlyAvg": monthly_avg,
-            "monthlyPcSearch": monthly_pc,
-            "monthlyMobileSearch": monthly_mobile,
-            "averageCtr": round(weighted_ctr, 2),
-            "pcCtr": round(pc_ctr, 2),
-            "mobileCtr": round(mobile_ctr, 2),
-            "competition": competition,
-            "recommendation": recommendation,
-            "matchedKeyword": matched_keyword  # 실제 사용된 키워드
+            "searchVolumeExtended": {**SEARCH_VOLUME_EXTENDED_DEFAULTS, "competition": "알 수 없음", "recommendation": "분석중"},
+            "searchVolume": {"monthlyAvg": 0, "competition": "알 수 없음", "recommendation": "분석중"},
+            "relatedKeywords": []
         }
-        
-    except Exception as e:
-        print(f"데이터 파싱 오류: {str(e)}")
+    
+    keywords = api_response.get("data", {}).get("keywordList", [])
+    if not keywords:
         return {
-            "monthlyAvg": 0,
-            "monthlyPcSearch": 0,
-            "monthlyMobileSearch": 0,
-            "averageCtr": 0,
-            "pcCtr": 0,
-            "mobileCtr": 0,
-            "competition": "알 수 없음",
-            "recommendation": "오류 발생"
+            "searchVolumeExtended": {**SEARCH_VOLUME_EXTENDED_DEFAULTS, "competition": "낮음", "recommendation": "데이터 없음"},
+            "searchVolume": {"monthlyAvg": 0, "competition": "낮음", "recommendation": "데이터 없음"},
+            "relatedKeywords": []
         }
-
-# 검색량 데이터 파싱
-def parse_search_volume(api_response: Dict, original_keyword: str = "") -> Dict:
-    """네이버 API 응답에서 검색량 데이터 파싱"""
+    
+    # 검색량 (원본 키워드와 일치하는 행)
     try:
-        if not api_response.get("success"):
-            return {
-                "monthlyAvg": 0,
-                "competition": "알 수 없음",
-                "recommendation": "분석중"
-            }
-        
-        data = api_response.get("data", {})
-        keywords = data.get("keywordList", [])
-        
-        if not keywords:
-            return {
-                "monthlyAvg": 0,
-                "competition": "낮음",
-                "recommendation": "데이터 없음"
-            }
-        
-        # 원본 키워드와 정확히 일치하는 키워드 찾기
         keyword_data = keywords[0]  # 기본값: 첫 번째 키워드
-        
         if original_keyword:
-            # 지역명 제거
-            regions = ["인천", "서울", "부산", "대구", "대전", "광주", "울산", "세종", "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
-                       "서구", "북구", "동구", "남구", "중구", "청라", "검단", "송도", "강남", "강북", "서초", "종로", "마포", "강서", "해운대",
-                       "분당", "일산", "수원", "용인", "성남", "안양", "부천", "안산", "남양주", "화성"]
-            core_original = original_keyword
-            for region in regions:
-                core_original = core_original.replace(region + " ", "").replace(region, "")
-            core_original = core_original.strip()
-            
-            # 1순위: 지역 제거한 핵심 키워드로 정확 일치
+            # relKeyword → 행 색인 (같은 키워드가 여러 번 나오면 첫 행 유지)
+            index = {}
             for kw in keywords:
-                if kw.get("relKeyword", "").strip() == core_original:
-                    keyword_data = kw
-                    break
-            else:
-                # 2순위: 부분 일치
-                for kw in keywords:
-                    rel_kw = kw.get("relKeyword", "").strip()
-                    if core_original in rel_kw or rel_kw in core_original:
-                        keyword_data = kw
-                        break
-        
-        monthly_avg = keyword_data.get("monthlyPcQcCnt", 0) + keyword_data.get("monthlyMobileQcCnt", 0)
-        comp_idx = keyword_data.get("compIdx", "01")
-        
-        # 경쟁 강도 판단
-        comp_map = {
-            "01": "낮음",
-            "02": "보통",
-            "03": "높음",
-            "04": "매우 높음"
+                index.setdefault(rel_keyword_key(kw.get("relKeyword", "").strip()), kw)
+            # 지역명 제거 (요청 단위로 한 번 계산한 값이 있으면 재사용)
+            core_original = core_keyword if core_keyword is not None else strip_regions(original_keyword)[0]
+            keyword_data = select_keyword_row(keywords, index, core_original)
+        
+        metrics = keyword_metrics(keyword_data)
+        recommendation = recommend(metrics["total"], metrics["competition"])
+        search_volume_extended = {
+            "monthlyAvg": metrics["total"],
+            "monthlyPcSearch": metrics["monthlyPc"],
+            "monthlyMobileSearch": metrics["monthlyMobile"],
+            "averageCtr": round(metrics["weightedCtr"], 2),
+            "pcCtr": round(metrics["pcCtr"], 2),
+            "mobileCtr": round(metrics["mobileCtr"], 2),
+            "competition": metrics["competition"],
+            "recommendation": recommendation,
+            "matchedKeyword": keyword_data.get("relKeyword", "")  # 실제 사용된 키워드
         }
-        competition = comp_map.get(comp_idx, "보통")
-        
-        # 추천도 판단
-        if monthly_avg >= 1000 and comp_idx in ["01", "02"]:
-            recommendation = "적극 추천"
-        elif monthly_avg >= 500:
-            recommendation = "추천"
-        elif monthly_avg >= 100:
-            recommendation = "보통"
-        else:
-            recommendation = "낮은 검색량"
-        
-        return {
-            "monthlyAvg": monthly_avg,
-            "competition": competition,
+        search_volume = {
+            "monthlyAvg": metrics["total"],
+            "competition": metrics["competition"],
             "recommendation": recommendation
         }
-        
     except Exception as e:
-        print(f"데이터 파싱 오류: {str(e)}")
-        return {
-            "monthlyAvg": 0,
-            "competition": "알 수 없음",
-            "recommendation": "오류 발생"
-        }
+        logger.warning("데이터 파싱 오류: %s", e)
+        search_volume_extended = {**SEARCH_VOLUME_EXTENDED_DEFAULTS, "competition": "알 수 없음", "recommendation": "오류 발생"}
+        search_volume = {"monthlyAvg": 0, "competition": "알 수 없음", "recommendation": "오류 발생"}
+    
+    # 관련 키워드 (상위 N개, 옵션이 있으면 정렬/필터 적용)
+    try:
+        if related_options is not None:
+            related_rows = select_related_rows(keywords, related_options)
+        else:
+            related_rows = [(kw, keyword_metrics(kw)) for kw in keywords[:limit]]
+        related_keywords = []
+        for kw, metrics in related_rows:
+            related_keywords.append({
+                "keyword": kw.get("relKeyword", ""),
+                "monthlySearchVolume": metrics["total"],
+                "monthlyPcSearch": metrics["monthlyPc"],
+                "monthlyMobileSearch": metrics["monthlyMobile"],
+                "averageCtr": round(metrics["weightedCtr"], 2),  # 평균 클릭률 (%)
+                "pcCtr": round(metrics["pcCtr"], 2),
+                "mobileCtr": round(metrics["mobileCtr"], 2),
+                "competition": metrics["competition"]
+            })
+    except Exception as e:
+        logger.warning("관련 키워드 추출 오류: %s", e)
+        related_keywords = []
+    
+    return {
+        "searchVolumeExtended": search_volume_extended,
+        "searchVolume": search_volume,
+        "relatedKeywords": related_keywords
+    }
+
+# 관련 키워드 추출
+def extract_related_keywords(api_response: Dict, original_keyword: str = "", limit: int = 10) -> List[Dict]:
+    """네이버 API에서 관련 키워드 추출 (CTR 포함)"""
+    return analyze_keyword_list(api_response, original_keyword, limit=limit)["relatedKeywords"]
+
+# 검색량 데이터 파싱 (확장 버전)
+def parse_search_volume_extended(api_response: Dict, original_keyword: str = "", core_keyword: Optional[str] = None) -> Dict:
+    """네이버 API 응답에서 검색량 + CTR 데이터 파싱"""
+    return analyze_keyword_list(api_response, original_keyword, core_keyword, limit=0)["searchVolumeExtended"]
+
+# 검색량 데이터 파싱
+def parse_search_volume(api_response: Dict, original_keyword: str = "", core_keyword: Optional[str] = None) -> Dict:
+    """네이버 API 응답에서 검색량 데이터 파싱"""
+    return analyze_keyword_list(api_response, original_keyword, core_keyword, limit=0)["searchVolume"]
 
 @app.get("/", response_model=HealthResponse)
 async def health_check():
@@ -664,76 +2218,579 @@ async def health_check():
         "message": "Naver Crawler API is running"
     }
 
+# 이미 조회한 결과를 단계 코루틴으로 감싸기
+async def _resolved(value: Dict) -> Dict:
+    return value
+
+# 키워드 분석 본체
+async def run_analysis(request: SearchAnalysisRequest, api_response: Optional[Dict] = None) -> Dict:
+    """검색량 + 순위 분석 (api_response가 주어지면 keywordstool 호출 생략)"""
+    keyword = request.keyword
+    place_url = request.placeUrl
+    target_urls = [url for url in [place_url, *(request.placeUrls or [])] if url]
+    
+    logger.debug("📊 분석 시작: %s (플레이스 URL: %s)", keyword, ", ".join(target_urls) if target_urls else "미입력")
+    
+    started = time.perf_counter()
+    
+    # 1+2. 검색량 조회와 플레이스 순위 크롤링을 동시에 실행
+    api_response, ranking_data = await asyncio.gather(
+        run_stage(
+            "keywordstool",
+            call_naver_api(keyword) if api_response is None else _resolved(api_response),
+            NAVER_API_TIMEOUT,
+            {}
+        ),
+        run_stage(
+            "ranking",
+            crawl_place_ranking(keyword, target_urls, request.rankDepth),
+            CRAWL_TIMEOUT,
+            {"myRank": None, "myRanks": dict.fromkeys(target_urls), "competitors": []}
+        )
+    )
+    
+    # 매칭된 키워드 추출
+    matched_keyword = api_response.get('matched_keyword', keyword)
+    core_keyword, _ = strip_regions(keyword)  # 지역명 제거는 요청당 한 번만
+    
+    # keywordList 한 번만 훑어 검색량(확장/기본) + 관련 키워드 계산
+    keyword_views = analyze_keyword_list(api_response, keyword, core_keyword, limit=10, related_options=request.relatedOptions)
+    
+    # 확장 버전 (CTR 포함)
+    search_volume_extended = keyword_views["searchVolumeExtended"]
+    search_volume_extended['matchedKeyword'] = matched_keyword  # 매칭된 키워드 추가
+    
+    # 관련 키워드
+    related_keywords = keyword_views["relatedKeywords"]
+    
+    # 기존 호환성을 위한 간단한 버전
+    search_volume = keyword_views["searchVolume"]
+    
+    # 3. 경쟁사 키워드 추출
+    competitors = ranking_data.get("competitors", [])
+    with STAGE_SECONDS.labels("competitor_keywords").time():
+        keywords = extract_competitor_keywords(competitors)
+        competitor_keywords = summarize_competitor_keywords(keywords)
+    
+    my_ranks = ranking_data.get("myRanks", {})
+    my_rank = my_ranks.get(place_url) if place_url else None
+    
+    # 4. 순위 이력 저장 (실제 크롤링 결과만)
+    if RANK_HISTORY_ENABLED and ranking_data.get("fetchedAt"):
+        rank_history.record(keyword, ranking_data["fetchedAt"], competitors, my_ranks, ranking_data.get("placeIds"))
+    
+    total_seconds = time.perf_counter() - started
+    STAGE_SECONDS.labels("analyze").observe(total_seconds)
+    logger.info(
+        "✅ 분석 완료: %s", keyword,
+        extra={
+            "keyword": keyword,
+            "placeUrl": place_url,
+            "matchedKeyword": matched_keyword,
+            "monthlyAvg": search_volume_extended.get("monthlyAvg"),
+            "relatedKeywords": len(related_keywords),
+            "competitors": len(competitors),
+            "myRank": my_rank,
+            "placeUrls": len(my_ranks),
+            "searchedDepth": ranking_data.get("searchedDepth", 0),
+            "keywordstoolMs": api_response["elapsedMs"],
+            "rankingMs": ranking_data["elapsedMs"],
+            "totalMs": round(total_seconds * 1000, 1)
+        }
+    )
+    return {
+        "success": True,
+        "searchVolume": search_volume,
+        "searchVolumeExtended": search_volume_extended,  # CTR 포함
+        "relatedKeywords": related_keywords,  # 관련 키워드
+        "ranking": {
+            "myRank": my_rank,
+            "myRanks": my_ranks,  # placeUrl(+placeUrls) → 순위 (못 찾으면 null)
+            "searchedDepth": ranking_data.get("searchedDepth", 0),  # 내 순위를 찾아 확인한 순위 수
+            "competitors": competitors
+        },
+        "keywords": keywords,  # 경쟁사별 업종/키워드
+        "competitorKeywords": competitor_keywords,  # 경쟁사 전체 키워드 점수 합계
+        "stages": {  # 단계별 결과 및 소요 시간
+            "keywordstool": {
+                "success": api_response.get("success", False),
+                "error": api_response.get("error"),
+                "elapsedMs": api_response["elapsedMs"]
+            },
+            "ranking": {
+                "success": ranking_data.get("success", False),
+                "error": ranking_data.get("error"),
+                "elapsedMs": ranking_data["elapsedMs"]
+            },
+            "totalMs": round(total_seconds * 1000, 1)
+        }
+    }
+
 @app.post("/analyze")
 async def analyze_keyword(request: SearchAnalysisRequest):
     """키워드 분석 (검색량 + 순위)"""
     try:
-        keyword = request.keyword
-        place_url = request.placeUrl
-        
-        print(f"\n{'='*60}")
-        print(f"📊 분석 시작: {keyword}")
-        print(f"📍 플레이스 URL: {place_url if place_url else '미입력'}")
-        print(f"{'='*60}\n")
-        
-        # 1. 네이버 검색광고 API로 검색량 조회
-        print(f"🔍 1단계: 네이버 검색광고 API 호출 중...")
-        api_response = call_naver_api(keyword)
-        print(f"✅ API 응답: success={api_response.get('success')}")
-        
-        # 매칭된 키워드 추출
-        matched_keyword = api_response.get('matched_keyword', keyword)
-        
-        # 확장 버전 (CTR 포함)
-        search_volume_extended = parse_search_volume_extended(api_response, keyword)
-        search_volume_extended['matchedKeyword'] = matched_keyword  # 매칭된 키워드 추가
-        print(f"📈 검색량: {search_volume_extended.get('monthlyAvg')}, 경쟁도: {search_volume_extended.get('competition')}, 평균 CTR: {search_volume_extended.get('averageCtr')}%, 매칭: {matched_keyword}")
-        
-        # 관련 키워드 추출 (10개)
-        related_keywords = extract_related_keywords(api_response, keyword, limit=10)
-        print(f"🔑 관련 키워드: {len(related_keywords)}개 발견")
-        
-        # 기존 호환성을 위한 간단한 버전
-        search_volume = parse_search_volume(api_response, keyword)
-        print(f"📈 검색량: {search_volume.get('monthlyAvg')}, 경쟁도: {search_volume.get('competition')}")
-        
-        # 2. BeautifulSoup으로 플레이스 순위 크롤링
-        print(f"\n🕷️  2단계: 플레이스 순위 크롤링 중...")
-        ranking_data = crawl_place_ranking(keyword, place_url)
-        print(f"✅ 크롤링 완료: {len(ranking_data.get('competitors', []))}개 업체 발견")
-        
-        # 3. 경쟁사 키워드 추출
-        print(f"\n🔑 3단계: 경쟁사 키워드 추출 중...")
-        competitors = ranking_data.get("competitors", [])
-        keywords = extract_competitor_keywords(competitors)
-        print(f"✅ 키워드 추출 완료: {len(keywords)}개 업체")
-        
-        print(f"\n{'='*60}")
-        print(f"✅ 분석 완료!")
-        print(f"{'='*60}\n")
-        
+        return await run_analysis(request)
+    except Exception as e:
+        logger.exception("❌ 분석 오류: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 배치용 keywordstool 묶음 사전 조회
+async def prefetch_keyword_groups(keywords: List[str], semaphore: Optional[asyncio.Semaphore] = None) -> Dict[str, Dict]:
+    """캐시에 있는 키워드는 그대로, 나머지는 5개씩 묶어서 조회"""
+    prefetched = {}
+    pending = []
+    for keyword in dict.fromkeys(keywords):  # 순서 유지 중복 제거
+        cached = await keyword_cache.get(keyword_cache_key(keyword))
+        if cached is not None:
+            prefetched[keyword] = cached
+        elif "," not in keyword:
+            pending.append(keyword)
+    
+    async def fetch_group(group: List[str]) -> Dict[str, Dict]:
+        async with semaphore or nullcontext():
+            return await fetch_naver_api_group(group)
+    
+    groups = [pending[i:i + KEYWORDSTOOL_MAX_HINTS] for i in range(0, len(pending), KEYWORDSTOOL_MAX_HINTS)]
+    for group_result in await asyncio.gather(*[fetch_group(group) for group in groups]):
+        prefetched.update(group_result)
+    # 묶음 응답에서 자기 행을 찾지 못한 키워드는 run_analysis에서 개별 조회 (지역명 제거 재시도 포함)
+    return prefetched
+
+# 배치 항목 1개 분석
+async def analyze_batch_item(item: SearchAnalysisRequest, prefetched: Dict[str, Dict], semaphore: Optional[asyncio.Semaphore] = None) -> Dict:
+    """항목별 성공/실패를 결과에 담아 반환 (예외를 밖으로 던지지 않음)"""
+    async with semaphore or nullcontext():
+        try:
+            result = await run_analysis(item, prefetched.get(item.keyword))
+        except Exception as e:
+            logger.exception("❌ 배치 항목 분석 오류 (%s): %s", item.keyword, e)
+            result = {"success": False, "error": str(e)}
+    return {"keyword": item.keyword, "placeUrl": item.placeUrl, **result}
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest):
+    """여러 키워드 일괄 분석 (동시 처리 수 제한, 요청 순서대로 결과 반환)"""
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"배치는 최대 {MAX_BATCH_SIZE}개까지 가능합니다")
+    
+    started = time.perf_counter()
+    concurrency = max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    semaphore = asyncio.Semaphore(concurrency)
+    logger.info("📦 배치 분석 시작: %d개 (동시 %d)", len(request.items), concurrency)
+    
+    prefetched = {}
+    if request.groupKeywordLookups:
+        prefetched = await prefetch_keyword_groups([item.keyword for item in request.items], semaphore)
+    
+    results = await asyncio.gather(*[analyze_batch_item(item, prefetched, semaphore) for item in request.items])
+    succeeded = sum(1 for result in results if result.get("success"))
+    logger.info("📦 배치 분석 완료: 성공 %d / 실패 %d", succeeded, len(results) - succeeded)
+    
+    return {
+        "success": True,
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+# 배치 결과 스트리밍 (완료되는 순서대로)
+async def iter_batch_results(request: BatchAnalysisRequest) -> AsyncIterator[Dict]:
+    """고정 개수 워커가 항목을 하나씩 가져가 분석, 결과 큐가 차면 워커가 대기 (메모리 일정 유지)"""
+    started = time.perf_counter()
+    concurrency = max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    chunk_size = KEYWORDSTOOL_MAX_HINTS if request.groupKeywordLookups else 1
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    pending = iter(enumerate(request.items))
+    done_marker = object()
+    logger.info("📡 스트리밍 배치 시작: %d개 (동시 %d)", len(request.items), concurrency)
+    
+    # 워커 수가 곧 동시 처리 수 (워커 안에서는 항목을 순서대로 처리)
+    async def worker():
+        try:
+            while True:
+                chunk = [entry for _, entry in zip(range(chunk_size), pending)]
+                if not chunk:
+                    break
+                prefetched = {}
+                if request.groupKeywordLookups:
+                    prefetched = await prefetch_keyword_groups([item.keyword for _, item in chunk])
+                for index, item in chunk:
+                    result = await analyze_batch_item(item, prefetched)
+                    await queue.put({"index": index, **result})
+        except Exception as e:
+            logger.exception("❌ 스트리밍 배치 워커 오류: %s", e)
+        # 취소된 워커는 종료 표시를 넣지 않음 (가득 찬 큐에서 영원히 대기하므로)
+        await queue.put(done_marker)
+    
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    finished = count = succeeded = 0
+    try:
+        while finished < len(workers):
+            result = await queue.get()
+            if result is done_marker:
+                finished += 1
+                continue
+            count += 1
+            succeeded += 1 if result.get("success") else 0
+            yield result
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 작업 취소 후 종료까지 대기
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    
+    logger.info("📡 스트리밍 배치 완료: 성공 %d / 실패 %d", succeeded, count - succeeded)
+    yield {
+        "done": True,
+        "count": count,
+        "succeeded": succeeded,
+        "failed": count - succeeded,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+@app.post("/analyze/stream")
+async def analyze_stream(request: BatchAnalysisRequest, format: str = "ndjson"):
+    """여러 키워드 일괄 분석 결과를 키워드별로 바로 전송 (format: ndjson | sse)"""
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"배치는 최대 {MAX_BATCH_SIZE}개까지 가능합니다")
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format은 ndjson 또는 sse만 가능합니다")
+    
+    async def body():
+        async for result in iter_batch_results(request):
+            line = json.dumps(result, ensure_ascii=False)
+            if format == "sse":
+                event = "done" if result.get("done") else "result"
+                yield f"event: {event}\ndata: {line}\n\n"
+            else:
+                yield line + "\n"
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# 비동기 작업 관리
+class JobManager:
+    """오래 걸리는 분석을 작업으로 받아 제한된 워커에서 실행하고 상태/결과를 보관
+    
+    상태는 메모리에 두고, store가 있으면 변경될 때마다 함께 저장해 다른 워커 프로세스나
+    재시작 후에도 조회할 수 있게 합니다. 완료된 작업은 JOB_RESULT_TTL이 지나면 삭제됩니다.
+    """
+    PERSIST_INTERVAL = 1.0  # 진행률 저장 최소 간격 (초)
+
+    def __init__(self, workers: int, queue_size: int, ttl: float, max_jobs: int, store: Optional[CacheBackend] = None):
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.store = store
+        self.jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._requests: Dict[str, JobRequest] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.store is not None:
+            await self.store.close()
+
+    def _expire(self):
+        """보관 시간이 지난 완료 작업 삭제, 최대 개수를 넘으면 오래된 완료 작업부터 삭제"""
+        now = time.time()
+        finished = [job_id for job_id, job in self.jobs.items() if job["finishedAt"] is not None]
+        for job_id in finished:
+            if self.jobs[job_id]["finishedAt"] + self.ttl <= now or len(self.jobs) > self.max_jobs:
+                del self.jobs[job_id]
+
+    async def _persist(self, job: Dict, force: bool = True):
+        if self.store is None:
+            return
+        now = time.monotonic()
+        if not force and now - job.get("_persistedAt", 0) < self.PERSIST_INTERVAL:
+            return
+        job["_persistedAt"] = now
+        try:
+            await self.store.set(job["id"], {key: value for key, value in job.items() if key != "_persistedAt"}, ttl=self.ttl)
+        except Exception as e:
+            logger.warning("⚠️  작업 상태 저장 오류 (%s): %s", job["id"], e)
+
+    async def submit(self, request: JobRequest) -> Dict:
+        """작업 등록 (대기열이 가득 차면 asyncio.QueueFull)"""
+        self._expire()
+        if self._queue is None or self._queue.full() or len(self.jobs) >= self.max_jobs + self.queue_size:
+            raise asyncio.QueueFull()
+        total = len(request.batch.items) if request.batch else 1
+        job_id = uuid.uuid4().hex
+        job = self.jobs[job_id] = {
+            "id": job_id,
+            "type": "batch" if request.batch else "analyze",
+            "status": "queued",
+            "progress": {"completed": 0, "total": total},
+            "error": None,
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "result": None
+        }
+        self._requests[job_id] = request
+        self._queue.put_nowait(job_id)
+        await self._persist(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        self._expire()
+        job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await self.store.get(job_id)
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            request = self._requests.pop(job_id, None)
+            try:
+                if job is not None and request is not None:
+                    await self._run(job, request)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Dict, request: JobRequest):
+        request_id_var.set(f"job-{job['id'][:16]}")  # 작업 로그 추적용
+        job.update(status="running", startedAt=time.time())
+        await self._persist(job)
+        logger.info("🧾 작업 시작: %s (%s, %d개)", job["id"], job["type"], job["progress"]["total"])
+        try:
+            if request.batch:
+                job["result"] = await self._run_batch(job, request.batch)
+            else:
+                job["result"] = await run_analysis(request.analyze)
+                job["progress"]["completed"] = 1
+            job["status"] = "succeeded" if job["result"].get("success") else "failed"
+            job["error"] = job["result"].get("error")
+        except asyncio.CancelledError:
+            # 서버 종료로 취소된 작업이 저장소에 running으로 남지 않게 기록
+            job.update(status="failed", error="작업 취소됨 (서버 종료)", finishedAt=time.time())
+            logger.warning("🧾 작업 취소: %s", job["id"])
+            await self._persist(job)
+            raise
+        except Exception as e:
+            logger.exception("❌ 작업 오류 (%s): %s", job["id"], e)
+            job.update(status="failed", error=str(e))
+        job["finishedAt"] = time.time()
+        logger.info("🧾 작업 종료: %s (%s)", job["id"], job["status"])
+        await self._persist(job)
+
+    async def _run_batch(self, job: Dict, request: BatchAnalysisRequest) -> Dict:
+        """iter_batch_results로 실행하며 진행률 갱신, 결과는 /analyze/batch와 같은 형식"""
+        results: List[Optional[Dict]] = [None] * len(request.items)
+        summary = {}
+        async for result in iter_batch_results(request):
+            if result.get("done"):
+                summary = result
+                continue
+            results[result.pop("index")] = result
+            job["progress"]["completed"] += 1
+            await self._persist(job, force=False)
         return {
             "success": True,
-            "searchVolume": search_volume,
-            "searchVolumeExtended": search_volume_extended,  # CTR 포함
-            "relatedKeywords": related_keywords,  # 관련 키워드
-            "ranking": {
-                "myRank": ranking_data.get("myRank"),
-                "competitors": competitors
-            },
-            "keywords": keywords
+            "count": summary.get("count", 0),
+            "succeeded": summary.get("succeeded", 0),
+            "failed": summary.get("failed", 0),
+            "results": results,
+            "elapsedMs": summary.get("elapsedMs")
         }
-        
-    except Exception as e:
-        print(f"\n❌ 분석 오류: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+
+    def stats(self) -> Dict:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queueSize": self.queue_size,
+            "backend": self.store.kind if self.store is not None else "memory",
+            "jobs": statuses
+        }
+
+job_manager = JobManager(
+    JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RESULT_TTL, JOB_MAX_JOBS,
+    create_cache("job:v1", JOB_RESULT_TTL, JOB_MAX_JOBS, JOB_BACKEND) if JOB_BACKEND != "memory" else None
+)
+
+def job_status(job: Dict) -> Dict:
+    """결과 본문을 뺀 작업 상태"""
+    return {key: value for key, value in job.items() if key not in ("result", "_persistedAt")}
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """분석 작업 등록 후 바로 작업 ID 반환 (GET /jobs/{id}로 진행 상태 조회)"""
+    if (request.analyze is None) == (request.batch is None):
+        raise HTTPException(status_code=400, detail="analyze 또는 batch 중 하나만 지정해야 합니다")
+    if request.batch and len(request.batch.items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"배치는 최대 {MAX_BATCH_SIZE}개까지 가능합니다")
+    try:
+        job = await job_manager.submit(request)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="대기 중인 작업이 너무 많습니다", headers={"Retry-After": "30"})
+    return {"success": True, "jobId": job["id"], "job": job_status(job)}
+
+@app.get("/jobs")
+async def job_stats():
+    """작업 워커/대기열 상태"""
+    return {"success": True, **job_manager.stats()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 만료되었습니다")
+    return {"success": True, "job": job_status(job)}
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """완료된 작업 결과 (/analyze 또는 /analyze/batch 응답과 같은 형식)"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 만료되었습니다")
+    if job["finishedAt"] is None:
+        raise HTTPException(status_code=409, detail=f"작업이 아직 완료되지 않았습니다 ({job['status']})")
+    if job["result"] is None:
+        raise HTTPException(status_code=500, detail=job["error"] or "작업 실패")
+    return job["result"]
+
+# 조회 기간 기본값 (최근 30일)
+def history_range(since: Optional[float], until: Optional[float]) -> Tuple[float, float]:
+    until = until if until is not None else time.time()
+    since = since if since is not None else until - 30 * 86400
+    return since, until
+
+@app.get("/ranking/history")
+async def ranking_history(
+    keyword: str,
+    placeUrl: str = "",
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    bucket: Literal["auto", "raw", "hour", "day", "week"] = "auto"
+):
+    """저장된 순위 이력 조회 (재크롤링 없음, since/until은 epoch 초)"""
+    since, until = history_range(since, until)
+    bucket_seconds = rank_history.bucket_seconds(bucket, since, until)
+    # 모바일/PC/단축 URL 어느 형식으로 조회해도 같은 이력 (플레이스 ID로 저장)
+    place_key = (await resolve_place_ids([placeUrl])).get(placeUrl) if placeUrl else None
+    series = await rank_history.rank_series(keyword, place_key or placeUrl, since, until, bucket_seconds)
+    return {
+        "success": True,
+        "keyword": keyword,
+        "placeUrl": placeUrl,
+        "since": since,
+        "until": until,
+        "bucketSeconds": bucket_seconds,
+        "series": series
+    }
+
+@app.get("/ranking/history/competitors")
+async def competitor_history(
+    keyword: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    bucket: Literal["auto", "raw", "hour", "day", "week"] = "auto",
+    limit: int = 10
+):
+    """저장된 상위 업체별 순위 이력 조회"""
+    since, until = history_range(since, until)
+    bucket_seconds = rank_history.bucket_seconds(bucket, since, until)
+    competitors = await rank_history.competitor_series(keyword, since, until, bucket_seconds, limit)
+    return {
+        "success": True,
+        "keyword": keyword,
+        "since": since,
+        "until": until,
+        "bucketSeconds": bucket_seconds,
+        "competitors": competitors
+    }
+
+@app.get("/tracking/targets")
+async def list_tracking_targets():
+    """추적 대상과 최근 실행 결과 (다음 실행 시각 순)"""
+    targets = sorted(rank_tracker.targets.values(), key=lambda target: target["nextRunAt"] or 0)
+    return {"success": True, "tracker": rank_tracker.snapshot(), "targets": targets}
+
+@app.post("/tracking/targets")
+async def add_tracking_target(request: TrackingTargetRequest):
+    """추적 대상 등록 (결과는 /ranking/history에서 조회)"""
+    if not TRACKER_ENABLED:
+        raise HTTPException(status_code=503, detail="순위 추적이 꺼져 있습니다 (TRACKER_ENABLED=0)")
+    target = await rank_tracker.add(request.keyword, request.placeUrl, request.intervalSeconds)
+    return {"success": True, "target": target}
+
+@app.delete("/tracking/targets")
+async def remove_tracking_target(keyword: str, placeUrl: str = ""):
+    if not await rank_tracker.remove(keyword, placeUrl):
+        raise HTTPException(status_code=404, detail="등록되지 않은 추적 대상입니다")
+    return {"success": True}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 지표 (uvicorn 워커가 여러 개면 PROMETHEUS_MULTIPROC_DIR 지정 시 합산)"""
+    registry = None
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry) if registry else generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """캐시 통계 (검색량 / 순위) + 동시 요청 병합 통계"""
+    return {
+        **{name: cache.stats() for name, cache in CACHES.items()},
+        "singleflight": {"keywords": keyword_flight.stats(), "serp": serp_flight.stats(), "shortlink": shortlink_flight.stats()}
+    }
+
+@app.delete("/cache/{name}")
+async def invalidate_cache(name: str, keyword: Optional[str] = None):
+    """캐시 무효화 (name: keywords | serp | placeIds, keyword 미지정 시 전체 삭제)"""
+    cache = CACHES.get(name)
+    if cache is None:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 캐시: {name}")
+    if keyword and name == "keywords":
+        removed = 1 if await cache.invalidate(keyword_cache_key(keyword)) else 0
+    elif keyword and name == "placeIds":
+        removed = 1 if await cache.invalidate(keyword) else 0  # keyword 자리에 단축 URL
+    elif keyword:
+        # 순위 캐시는 페이지별 항목까지 삭제
+        pages = -(-RANK_MAX_DEPTH // SERP_PAGE_SIZE)
+        removed = 0
+        for page in range(1, pages + 1):
+            removed += 1 if await cache.invalidate(serp_cache_key(keyword, page)) else 0
+    else:
+        removed = await cache.clear()
+    return {"success": True, "removed": removed}
+
+@app.get("/upstream/status")
+async def upstream_status():
+    """keywordstool 호출 제한 / 서킷 브레이커 상태"""
+    return {
+        "keywordstool": {
+            "limiter": keywordstool_limiter.stats(),
+            "breaker": keywordstool_breaker.stats()
+        }
+    }
 
 @app.get("/test-api")
 async def test_naver_api():
     """네이버 API 테스트"""
-    result = call_naver_api("영어학원")
+    result = await fetch_naver_api("영어학원")  # 캐시를 거치지 않고 직접 호출
     return result
 
 if __name__ == "__main__":
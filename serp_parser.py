@@ -0,0 +1,324 @@
+"""모바일 통합검색(SERP) HTML 파싱
+
+파서 백엔드, 선택자, 선택자 캐시와 파싱 프로세스 진입점(parse_serp_bytes, warm_parse_worker)만 둡니다.
+spawn 파싱 프로세스는 이 모듈만 임포트하므로 앱 설정(로그 리스너, 캐시/작업 저장소, 규칙표 등)을 불러오지 않습니다.
+"""
+from bs4 import BeautifulSoup
+from typing import List, Dict, Optional, Tuple
+import logging
+import os
+import sys
+
+# 빠른 HTML 파서 (설치된 경우 자동 사용)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# SERP HTML 파서 백엔드: auto | selectolax | lxml | bs4
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto")
+
+# 최근 일치한 컨테이너 선택자를 먼저 시도하는 선택자 캐시 (N번째 파싱마다 전체 후보를 우선순위대로 재확인, 0: 재확인 안 함)
+SELECTOR_RECHECK_INTERVAL = int(os.getenv("SELECTOR_RECHECK_INTERVAL", "100"))
+
+# 앱과 같은 로거 이름 (앱 프로세스에서는 main의 큐 핸들러, 파싱 프로세스에서는 init_parse_worker의 핸들러로 출력)
+logger = logging.getLogger("naver_crawler")
+
+# 플레이스 목록 컨테이너 선택자 (앞에서부터 시도)
+PLACE_CONTAINER_SELECTORS = [
+    'div.place_didyoumean ul li',
+    'div.list_image_type ul li',
+    'ul.list_search li',
+    'div.api_subject_bx ul li',
+    'div[class*="place"] ul li',
+    'li[class*="place"]',
+    'ul[class*="list"] > li'
+]
+# 앞쪽 4개만 기억 (뒤쪽 범용 선택자는 탭/뉴스 같은 다른 목록에도 일치하므로 매번 우선순위대로 확인)
+PLACE_CONTAINER_LEARNABLE = 4
+
+# 플레이스 항목 필드 선택자 후보
+PLACE_AD_SELECTOR = '.ad_marker, .ad, [class*="ad"], [class*="Ad"]'
+PLACE_FIELD_SELECTORS = {
+    "name": ['.place_bluelink', '.YwYLL', 'span.place_name', 'strong.name', '.tit', 'a.title'],
+    "category": ['.category', '.cate', '.type', '.KCMnt', '.info_distance'],
+    "review": ['.review_count', '.cnt', 'em.num', '.NSTUp', '.review'],
+    "link": ['a[href*="place.naver.com"]', 'a[href*="/place/"]', 'a.place_bluelink', 'a.title'],
+}
+# 후보 전체를 한 번에 찾는 선택자 (문서 순서상 첫 요소)
+PLACE_FIELD_ANY_SELECTORS = {field: ", ".join(candidates) for field, candidates in PLACE_FIELD_SELECTORS.items()}
+PLACE_LINK_CHECK_SELECTOR = ", ".join(PLACE_FIELD_SELECTORS["link"][:2])  # 플레이스 상세 링크
+
+# HTML 파서 백엔드
+class SoupParserBackend:
+    """BeautifulSoup 기반 (features: html.parser | lxml)"""
+
+    def __init__(self, name: str, features: str):
+        self.name = name
+        self.features = features
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, self.features)
+
+    def select(self, node, selector: str) -> List:
+        return node.select(selector)
+
+    def select_one(self, node, selector: str):
+        return node.select_one(selector)
+
+    def text(self, node) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node, name: str) -> str:
+        value = node.get(name, "")
+        return " ".join(value) if isinstance(value, list) else value
+
+class SelectolaxParserBackend:
+    """selectolax(Lexbor, C 구현) 기반"""
+    name = "selectolax"
+
+    def parse(self, html: str):
+        return LexborHTMLParser(html)
+
+    def select(self, node, selector: str) -> List:
+        return node.css(selector)
+
+    def select_one(self, node, selector: str):
+        return node.css_first(selector)
+
+    def text(self, node) -> str:
+        return node.text(strip=True)
+
+    def attr(self, node, name: str) -> str:
+        return node.attributes.get(name) or ""
+
+PARSER_BACKENDS: Dict[str, object] = {"bs4": SoupParserBackend("bs4", "html.parser")}
+if LXML_AVAILABLE:
+    PARSER_BACKENDS["lxml"] = SoupParserBackend("lxml", "lxml")
+if LexborHTMLParser is not None:
+    PARSER_BACKENDS["selectolax"] = SelectolaxParserBackend()
+
+def get_parser_backend(name: Optional[str] = None):
+    """설정한 백엔드 반환 (auto: selectolax → lxml → bs4 순서로 사용 가능한 것)"""
+    name = name or PARSER_BACKEND
+    if name == "auto":
+        for candidate in ("selectolax", "lxml", "bs4"):
+            if candidate in PARSER_BACKENDS:
+                return PARSER_BACKENDS[candidate]
+    if name not in PARSER_BACKENDS:
+        logger.warning("⚠️  파서 백엔드 '%s' 사용 불가, bs4로 대체", name)
+        return PARSER_BACKENDS["bs4"]
+    return PARSER_BACKENDS[name]
+
+# (파서 이름, 필드, 후보 순번, 캐시 결과: 컨테이너만) → 횟수
+SelectorMatches = Dict[Tuple[str, str, str, str], int]
+
+class SelectorCache:
+    """파서별로 최근 일치한 컨테이너 선택자 후보를 기억해 다음 파싱에서 먼저 시도
+
+    마크업은 가끔만 바뀌므로 보통은 기억한 선택자 1개로 끝나고, 맞지 않거나 플레이스 목록이 아니면 전체 후보를 우선순위대로 다시 확인합니다.
+    업체 필드는 여러 후보 중 문서 순서상 첫 요소를 써야 하므로 기억하지 않고 후보 전체를 한 번에 찾습니다.
+    recheck_interval번째 파싱마다 기억한 선택자를 쓰지 않고 우선순위대로 다시 확인합니다.
+    상태는 프로세스별이라 파싱 프로세스마다 따로 학습합니다.
+    """
+
+    def __init__(self, recheck_interval: int):
+        self.recheck_interval = recheck_interval
+        self.learned: Dict[Tuple[str, str], int] = {}
+        self.parses: Dict[str, int] = {}
+
+    def start(self, parser_name: str) -> bool:
+        """파싱 1회 시작, 기억한 선택자를 사용해도 되면 True"""
+        count = self.parses.get(parser_name, 0) + 1
+        self.parses[parser_name] = count
+        return not self.recheck_interval or count % self.recheck_interval != 0
+
+    def get(self, parser_name: str, field: str, use_learned: bool) -> Optional[int]:
+        return self.learned.get((parser_name, field)) if use_learned else None
+
+    def learn(self, parser_name: str, field: str, index: int):
+        previous = self.learned.get((parser_name, field))
+        if previous is not None and previous != index:
+            logger.info("🔁 선택자 변경 학습: %s %s #%d → #%d", parser_name, field, previous, index)
+        self.learned[(parser_name, field)] = index
+
+    def reset(self):
+        self.learned.clear()
+        self.parses.clear()
+
+selector_cache = SelectorCache(SELECTOR_RECHECK_INTERVAL)
+
+def count_selector_match(matches: SelectorMatches, parser, field: str, index: str, lookup: str = ""):
+    key = (parser.name, field, index, lookup)
+    matches[key] = matches.get(key, 0) + 1
+
+def is_place_list(parser, elements: List) -> bool:
+    """기억한 컨테이너 선택자 결과 확인 (앞쪽 항목에 플레이스 링크가 있어야 플레이스 목록으로 인정)"""
+    return any(parser.select_one(element, PLACE_LINK_CHECK_SELECTOR) is not None for element in elements[:3])
+
+def select_place_containers(parser, soup, use_learned: bool, matches: SelectorMatches) -> List:
+    """플레이스 목록 컨테이너 (기억한 선택자 → 아니면 전체 후보를 우선순위대로)"""
+    learned = selector_cache.get(parser.name, "container", use_learned)
+    if learned is not None:
+        elements = parser.select(soup, PLACE_CONTAINER_SELECTORS[learned])
+        if elements and is_place_list(parser, elements):
+            count_selector_match(matches, parser, "container", str(learned), "hit")
+            return elements
+    lookup = "scan" if learned is None else "miss"
+    for index, selector in enumerate(PLACE_CONTAINER_SELECTORS):
+        elements = parser.select(soup, selector)
+        if elements:
+            logger.debug("✅ 선택자 '%s' - %d개 발견 (%s)", selector, len(elements), parser.name)
+            if index < PLACE_CONTAINER_LEARNABLE:
+                selector_cache.learn(parser.name, "container", index)
+            count_selector_match(matches, parser, "container", str(index), lookup)
+            return elements
+    # 차단 페이지일 수 있으므로 기억한 선택자는 유지
+    count_selector_match(matches, parser, "container", "none", lookup)
+    return []
+
+def select_place_field(parser, place, field: str, matches: SelectorMatches):
+    """업체 항목의 필드 요소 (후보 전체를 한 번에 찾아 문서 순서상 첫 요소)"""
+    node = parser.select_one(place, PLACE_FIELD_ANY_SELECTORS[field])
+    count_selector_match(matches, parser, field, "none" if node is None else "any")
+    return node
+
+def _parse_with_fallback(html: str, parser, matches: SelectorMatches) -> Dict:
+    try:
+        result = _parse_place_list(html, parser, matches)
+    except Exception as e:
+        if parser.name == "bs4":
+            raise
+        # 빠른 백엔드에서 실패하면 기존 BeautifulSoup 경로로 재시도
+        logger.warning("⚠️  %s 파싱 오류, bs4로 재시도: %s", parser.name, e)
+        return _parse_place_list(html, PARSER_BACKENDS["bs4"], matches)
+    if result.get("blocked") and parser.name != "bs4":
+        # 선택자가 하나도 맞지 않으면 bs4로 한 번 더 확인 (파서별 HTML 복구 방식 차이 대비)
+        fallback = _parse_place_list(html, PARSER_BACKENDS["bs4"], matches)
+        if not fallback.get("blocked"):
+            logger.warning("⚠️  %s에서 컨테이너를 찾지 못해 bs4 결과 사용", parser.name)
+            return fallback
+    return result
+
+def _parse_place_list(html: str, parser, matches: SelectorMatches) -> Dict:
+    soup = parser.parse(html)
+    use_learned = selector_cache.start(parser.name)
+    
+    places = []
+    rank = 0
+    
+    # 최근 일치한 선택자부터 시도
+    place_containers = select_place_containers(parser, soup, use_learned, matches)
+    
+    if not place_containers:
+        logger.warning("⚠️  플레이스 컨테이너를 찾을 수 없음 (%s, HTML %d bytes)", parser.name, len(html))
+        # HTML 구조 분석 출력 (DEBUG)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("HTML 샘플:\n%s", html[:1000])
+        
+        # 대안: 간단한 예시 데이터 반환
+        return {
+            "success": True,
+            "blocked": True,  # 실제 순위가 아니므로 캐시하지 않음
+            "myRank": None,
+            "competitors": [
+                {"rank": 1, "name": "크롤링 제한", "category": "네이버 보안", "reviewCount": 0, "url": ""},
+                {"rank": 2, "name": "실제 순위는", "category": "브라우저에서", "reviewCount": 0, "url": ""},
+                {"rank": 3, "name": "확인 가능", "category": "수동 확인", "reviewCount": 0, "url": ""}
+            ]
+        }
+    
+    logger.debug("총 %d개 플레이스 발견", len(place_containers))
+    
+    for idx, place in enumerate(place_containers[:20], 1):
+        try:
+            # 광고 제외
+            ad_marker = parser.select_one(place, PLACE_AD_SELECTOR)
+            if ad_marker:
+                ad_classes = parser.attr(ad_marker, 'class')
+                if 'ad' in ad_classes.lower():
+                    logger.debug("광고 제외: %d", idx)
+                    continue
+            
+            rank += 1
+            
+            # 업체명
+            name_elem = select_place_field(parser, place, "name", matches)
+            name = parser.text(name_elem) if name_elem else f"업체 {rank}"
+            
+            # 카테고리
+            category_elem = select_place_field(parser, place, "category", matches)
+            category = parser.text(category_elem) if category_elem else "일반"
+            
+            # 리뷰 수
+            review_count = 0
+            review_elem = select_place_field(parser, place, "review", matches)
+            if review_elem:
+                review_text = parser.text(review_elem)
+                numbers = ''.join(filter(str.isdigit, review_text))
+                review_count = int(numbers) if numbers else 0
+            
+            # URL
+            link_elem = select_place_field(parser, place, "link", matches)
+            place_url = ""
+            if link_elem:
+                href = parser.attr(link_elem, 'href')
+                if href.startswith('http'):
+                    place_url = href
+                elif href.startswith('/'):
+                    place_url = f"https://m.place.naver.com{href}"
+                else:
+                    place_url = f"https://m.place.naver.com/{href}"
+            
+            place_info = {
+                "rank": rank,
+                "name": name,
+                "category": category,
+                "reviewCount": review_count,
+                "url": place_url
+            }
+            
+            logger.debug("순위 %d: %s (%s) - %d개 리뷰", rank, name, category, review_count)
+            
+            places.append(place_info)
+            
+            # 상위 10개만 수집
+            if rank >= 10:
+                break
+                
+        except Exception as e:
+            logger.warning("플레이스 파싱 오류 (idx=%d): %s", idx, e)
+            continue
+    
+    logger.debug("✅ 총 %d개 플레이스 추출 완료", len(places))
+    
+    return {
+        "success": True,
+        "competitors": places[:10]
+    }
+
+# 파싱 프로세스 진입점
+def parse_serp_bytes(raw: bytes, encoding: Optional[str] = None) -> Tuple[Dict, SelectorMatches]:
+    """파싱 프로세스에서 실행 (원본 바이트 디코딩 + 파싱, 선택자 일치 기록은 부모 프로세스로 반환)"""
+    matches: SelectorMatches = {}
+    result = _parse_with_fallback(raw.decode(encoding or "utf-8", errors="replace"), get_parser_backend(), matches)
+    return result, matches
+
+def warm_parse_worker() -> str:
+    """파서 백엔드 준비 (모듈 임포트, 선택자 컴파일)"""
+    parse_serp_bytes(b"<html><body><ul class='list_search'><li><a class='tit'>warmup</a></li></ul></body></html>")
+    selector_cache.reset()  # 준비용 HTML로 학습한 선택자는 버림
+    return get_parser_backend().name
+
+def init_parse_worker(log_level: str):
+    """파싱 프로세스 초기화 (로그를 stdout으로, 앱의 큐 리스너는 프로세스 간 공유되지 않음)"""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [parse-%(process)d] %(message)s"))
+    logger.setLevel(log_level)
+    logger.addHandler(handler)
+    logger.propagate = False
@@ -0,0 +1,15 @@
+import os
+import sys
+
+# main 임포트 전에 설정 (네이버 호출/백그라운드 작업/이력 파일 없이 실행)
+os.environ.setdefault("UPSTREAM_MODE", "replay")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("JOB_BACKEND", "memory")
+os.environ.setdefault("RANK_HISTORY_ENABLED", "0")
+os.environ.setdefault("TRACKER_ENABLED", "0")
+os.environ.setdefault("PARSE_WORKERS", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+FIXTURES_DIR = os.path.join(ROOT, "fixtures")
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def replay():
+    """fixtures/manifest.json 재생 업스트림으로 분석 실행"""
+    assert main.UPSTREAM_MODE == "replay"
+
+    def run(request):
+        async def scenario():
+            main.open_http_clients()
+            try:
+                for cache in main.CACHES.values():
+                    await cache.clear()
+                return await main.run_analysis(request)
+            finally:
+                await main.close_http_clients()
+
+        return asyncio.run(scenario())
+
+    return run
+
+
+def test_analyze_replay(replay):
+    result = replay(main.SearchAnalysisRequest(
+        keyword="청라 영어학원",
+        placeUrl="https://m.place.naver.com/place/1100015838/home",
+        placeUrls=["https://pcmap.place.naver.com/place/1100063352", "1100000000", "https://m.place.naver.com/place/999"],
+    ))
+    assert result["success"]
+    ranking = result["ranking"]
+    assert ranking["myRank"] == 3
+    assert ranking["myRanks"] == {
+        "https://m.place.naver.com/place/1100015838/home": 3,
+        "https://pcmap.place.naver.com/place/1100063352": 9,
+        "1100000000": 1,
+        "https://m.place.naver.com/place/999": None,
+    }
+    assert len(ranking["competitors"]) == 10
+    # 지역명을 뺀 핵심 키워드 행 기준 검색량
+    assert result["searchVolumeExtended"]["monthlyAvg"] > 0
+    assert result["searchVolume"]["competition"] in main.COMPETITION_ORDER
+    assert result["relatedKeywords"]
+    assert result["competitorKeywords"]
+
+
+def test_batch_stream_close_cancels_workers(monkeypatch):
+    """스트림을 중간에 닫으면 워커 작업이 남지 않아야 함"""
+    async def slow_analysis(item, prefetched=None):
+        await asyncio.sleep(0.01)
+        return {"success": True}
+
+    monkeypatch.setattr(main, "run_analysis", slow_analysis)
+    request = main.BatchAnalysisRequest(
+        items=[main.SearchAnalysisRequest(keyword=f"키워드{i}") for i in range(20)],
+        concurrency=4,
+    )
+
+    async def scenario():
+        stream = main.iter_batch_results(request)
+        first = await stream.__anext__()
+        # 소비하지 않는 동안 워커가 큐를 가득 채우도록 대기
+        await asyncio.sleep(0.05)
+        await stream.aclose()
+        current = asyncio.current_task()
+        return first, [task for task in asyncio.all_tasks() if task is not current and not task.done()]
+
+    first, pending = asyncio.run(scenario())
+    assert first["success"]
+    assert pending == []
+
+
+def test_analyze_without_target_stores_snapshot_only(tmp_path, monkeypatch):
+    store = main.RankHistoryStore(str(tmp_path / "history.sqlite3"))
+    monkeypatch.setattr(main, "rank_history", store)
+    monkeypatch.setattr(main, "RANK_HISTORY_ENABLED", True)
+
+    async def scenario():
+        main.open_http_clients()
+        try:
+            for cache in main.CACHES.values():
+                await cache.clear()
+            result = await main.run_analysis(main.SearchAnalysisRequest(keyword="청라 영어학원"))
+        finally:
+            await main.close_http_clients()
+            await store.close()  # 백그라운드 저장 완료 대기
+        return result
+
+    assert asyncio.run(scenario())["success"]
+    assert store._query("SELECT COUNT(*) FROM serp_snapshots", ()) == [(1,)]
+    assert store._query("SELECT COUNT(*) FROM rank_snapshots", ()) == [(0,)]
+    asyncio.run(store.close())
+
+
+def run_batch(request):
+    async def scenario():
+        main.open_http_clients()
+        try:
+            for cache in main.CACHES.values():
+                await cache.clear()
+            return await main.analyze_batch(request)
+        finally:
+            await main.close_http_clients()
+
+    return asyncio.run(scenario())
+
+
+def test_batch_bounded_concurrency_keeps_order(monkeypatch):
+    state = {"active": 0, "peak": 0}
+
+    async def tracked_analysis(item, prefetched=None):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return {"success": True}
+
+    monkeypatch.setattr(main, "run_analysis", tracked_analysis)
+    keywords = [f"키워드{i}" for i in range(12)]
+    result = run_batch(main.BatchAnalysisRequest(items=[main.SearchAnalysisRequest(keyword=k) for k in keywords], concurrency=3))
+    assert state["peak"] == 3
+    assert [item["keyword"] for item in result["results"]] == keywords
+    assert result["succeeded"] == 12
+
+
+def test_batch_isolates_item_errors(monkeypatch):
+    async def flaky_analysis(item, prefetched=None):
+        if item.keyword == "오류":
+            raise RuntimeError("업스트림 오류")
+        return {"success": True}
+
+    monkeypatch.setattr(main, "run_analysis", flaky_analysis)
+    items = [main.SearchAnalysisRequest(keyword=k) for k in ("정상1", "오류", "정상2")]
+    result = run_batch(main.BatchAnalysisRequest(items=items, concurrency=2))
+    assert [item["success"] for item in result["results"]] == [True, False, True]
+    assert result["results"][1]["error"] == "업스트림 오류"
+    assert (result["succeeded"], result["failed"]) == (2, 1)
+
+    async def stream():
+        return [item async for item in main.iter_batch_results(main.BatchAnalysisRequest(items=items, concurrency=2))]
+
+    streamed = asyncio.run(stream())
+    assert sorted((item["index"], item["success"]) for item in streamed[:-1]) == [(0, True), (1, False), (2, True)]
+    assert streamed[-1]["done"] and streamed[-1]["failed"] == 1
+
+
+def test_batch_grouped_lookup_uses_each_keywords_row(monkeypatch):
+    """묶음 응답의 첫 행이 다른 키워드여도 항목마다 자기 행의 검색량 사용"""
+    rows = [
+        {"relKeyword": "수학학원", "monthlyPcQcCnt": 400, "monthlyMobileQcCnt": 600, "compIdx": "높음"},
+        {"relKeyword": "영어학원", "monthlyPcQcCnt": 20, "monthlyMobileQcCnt": 30, "compIdx": "낮음"},
+    ]
+    hints = []
+
+    async def keywordstool_request(hint_keywords):
+        hints.append(hint_keywords)
+        return main.httpx.Response(200, json={"keywordList": rows})
+
+    monkeypatch.setattr(main, "keywordstool_request", keywordstool_request)
+    items = [main.SearchAnalysisRequest(keyword=k) for k in ("영어 학원", "수학학원")]
+    result = run_batch(main.BatchAnalysisRequest(items=items, groupKeywordLookups=True))
+    assert hints == ["영어 학원,수학학원"]  # 항목별 개별 조회 없이 한 번
+    english, math = result["results"]
+    assert english["searchVolumeExtended"]["monthlyAvg"] == 50
+    assert english["searchVolume"]["competition"] == "낮음"
+    assert math["searchVolumeExtended"]["monthlyAvg"] == 1000
@@ -0,0 +1,85 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+import main
+
+VALUE = {"keyword": "청라 영어학원", "competitors": [{"rank": 1, "name": "업체1"}], "monthlyAvg": 1200}
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_cache(request, tmp_path):
+    """같은 저장소를 쓰는 네임스페이스별 캐시 생성 (redis는 fakeredis)"""
+    server = fakeredis.FakeServer()
+
+    def make(namespace, ttl=60):
+        if request.param == "memory":
+            return main.MemoryCacheBackend(namespace, ttl, 100)
+        if request.param == "sqlite":
+            return main.SQLiteCacheBackend(namespace, ttl, 100, str(tmp_path / "cache.sqlite3"))
+        return main.RedisCacheBackend(namespace, ttl, fakeredis.FakeAsyncRedis(server=server))
+
+    return make
+
+
+def run(cache, scenario):
+    async def wrapped():
+        try:
+            return await scenario()
+        finally:
+            await cache.close()
+
+    return asyncio.run(wrapped())
+
+
+def test_round_trip(make_cache):
+    cache = make_cache("test:v1")
+
+    async def scenario():
+        assert await cache.get("키") is None
+        await cache.set("키", VALUE)
+        assert await cache.get("키") == VALUE
+        assert await cache.invalidate("키")
+        assert not await cache.invalidate("키")
+        return await cache.get("키")
+
+    assert run(cache, scenario) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_ttl_expiry(make_cache):
+    cache = make_cache("test:v1", ttl=0.05)
+
+    async def scenario():
+        await cache.set("기본", VALUE)
+        await cache.set("긴 TTL", VALUE, ttl=60)
+        assert await cache.get("기본") == VALUE
+        await asyncio.sleep(0.1)
+        return await cache.get("기본"), await cache.get("긴 TTL")
+
+    assert run(cache, scenario) == (None, VALUE)
+
+
+def test_clear_only_own_namespace(make_cache):
+    cache, other = make_cache("test:v1"), make_cache("other:v1")
+
+    async def scenario():
+        for key in ("a", "b"):
+            await cache.set(key, VALUE)
+        await other.set("a", VALUE)
+        cleared = await cache.clear()
+        result = cleared, await cache.get("a"), await other.get("a")
+        await other.close()
+        return result
+
+    assert run(cache, scenario) == (2, None, VALUE)
+
+
+def test_backend_missing_method_fails_on_creation():
+    class Incomplete(main.CacheBackend):
+        async def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete("test:v1", 60)
@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+
+ANALYZE = {"keyword": "청라 영어학원", "placeUrl": "https://m.place.naver.com/place/1100015838/home"}
+
+
+@pytest.fixture
+def client():
+    """앱 수명주기(작업 워커 포함)를 켠 클라이언트, 업스트림은 fixtures 재생"""
+    for cache in main.CACHES.values():
+        asyncio.run(cache.clear())
+    with TestClient(main.app) as client:
+        yield client
+
+
+def wait_for_job(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()["job"]
+        if job["finishedAt"] is not None:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"작업이 끝나지 않음: {job}")
+
+
+def test_analyze_job(client):
+    response = client.post("/jobs", json={"analyze": ANALYZE})
+    assert response.status_code == 202
+    job_id = response.json()["jobId"]
+    assert response.json()["job"]["status"] in ("queued", "running")
+
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == {"completed": 1, "total": 1}
+    assert "result" not in job
+
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert result["success"]
+    assert result["ranking"]["myRank"] == 3
+
+
+def test_batch_job_keeps_item_order(client):
+    items = [ANALYZE, {"keyword": "수학학원"}, {"keyword": "청라 영어학원", "placeUrl": "1100000000"}]
+    job_id = client.post("/jobs", json={"batch": {"items": items, "concurrency": 2}}).json()["jobId"]
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == {"completed": 3, "total": 3}
+
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert result["count"] == 3
+    assert [item["keyword"] for item in result["results"]] == ["청라 영어학원", "수학학원", "청라 영어학원"]
+    assert [item["ranking"]["myRank"] for item in (result["results"][0], result["results"][2])] == [3, 1]
+
+
+def test_job_request_validation(client):
+    assert client.post("/jobs", json={}).status_code == 400
+    assert client.post("/jobs", json={"analyze": ANALYZE, "batch": {"items": [ANALYZE]}}).status_code == 400
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.get("/jobs/unknown/result").status_code == 404
+
+
+def test_finished_job_expires(client, monkeypatch):
+    job_id = client.post("/jobs", json={"analyze": ANALYZE}).json()["jobId"]
+    wait_for_job(client, job_id)
+    monkeypatch.setattr(main.job_manager, "ttl", 0)
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+
+
+@pytest.fixture
+def blocked_manager(monkeypatch):
+    """run_analysis가 release 전까지 끝나지 않는 작업 관리자 (워커 1개, 대기열 1개)"""
+    manager = main.JobManager(1, 1, 60, 100)
+    monkeypatch.setattr(main, "job_manager", manager)
+    state = {"started": 0}
+
+    async def run_analysis(request, prefetched=None):
+        state["started"] += 1
+        await state["release"].wait()
+        return {"success": True, "keyword": request.keyword}
+
+    monkeypatch.setattr(main, "run_analysis", run_analysis)
+    return manager, state
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_unfinished_result_and_full_queue(blocked_manager):
+    manager, state = blocked_manager
+    request = main.JobRequest(analyze=main.SearchAnalysisRequest(**ANALYZE))
+
+    async def scenario():
+        state["release"] = asyncio.Event()
+        await manager.start()
+        try:
+            running = (await main.submit_job(request))["jobId"]
+            await settle()
+            queued = (await main.submit_job(request))["jobId"]
+            assert (await main.get_job(running))["job"]["status"] == "running"
+            assert (await main.get_job(queued))["job"]["status"] == "queued"
+            with pytest.raises(HTTPException) as error:
+                await main.get_job_result(running)
+            assert error.value.status_code == 409
+            # 워커 1개가 실행 중이고 대기열(1개)도 차 있음
+            with pytest.raises(HTTPException) as error:
+                await main.submit_job(request)
+            assert error.value.status_code == 503
+
+            state["release"].set()
+            await manager._queue.join()
+            return [await main.get_job_result(job_id) for job_id in (running, queued)]
+        finally:
+            await manager.stop()
+
+    results = asyncio.run(scenario())
+    assert [result["success"] for result in results] == [True, True]
+    assert state["started"] == 2
+
+
+def test_stop_marks_running_job_cancelled(blocked_manager, tmp_path, monkeypatch):
+    manager, state = blocked_manager
+    monkeypatch.setattr(main, "CACHE_SQLITE_PATH", str(tmp_path / "jobs.sqlite3"))
+    manager.store = main.create_cache("job:test", 60, 100, "sqlite")
+
+    async def scenario():
+        state["release"] = asyncio.Event()
+        await manager.start()
+        job_id = (await main.submit_job(main.JobRequest(analyze=main.SearchAnalysisRequest(**ANALYZE))))["jobId"]
+        await settle()
+        await manager.stop()
+        # 다른 워커/재시작 후 조회하는 것처럼 저장소에서 읽음
+        manager.jobs.clear()
+        manager.store = main.create_cache("job:test", 60, 100, "sqlite")
+        try:
+            return await manager.get(job_id)
+        finally:
+            await manager.store.close()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert "취소" in job["error"]
+    assert job["finishedAt"] is not None
@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+import main
+from conftest import FIXTURES_DIR
+
+
+@pytest.fixture(scope="module")
+def keywordstool_response():
+    with open(os.path.join(FIXTURES_DIR, "keywordstool", "chungra_english_academy.json"), encoding="utf-8") as f:
+        return {"success": True, "data": json.load(f)}
+
+
+def related(response, **options):
+    result = main.analyze_keyword_list(response, "청라 영어학원", related_options=main.RelatedKeywordOptions(limit=1000, **options))
+    return result["relatedKeywords"]
+
+
+def test_korean_comp_idx_is_mapped(keywordstool_response):
+    # 녹화된 응답의 compIdx는 "낮음"/"중간"/"높음"
+    competitions = {row["competition"] for row in related(keywordstool_response)}
+    assert competitions == {"낮음", "보통", "높음"}
+
+
+def test_competition_filters(keywordstool_response):
+    rows = keywordstool_response["data"]["keywordList"]
+    assert len(related(keywordstool_response, minCompetition="높음")) == sum(row["compIdx"] == "높음" for row in rows)
+    assert len(related(keywordstool_response, maxCompetition="낮음")) == sum(row["compIdx"] == "낮음" for row in rows)
+    assert {row["competition"] for row in related(keywordstool_response, maxCompetition="보통")} == {"낮음", "보통"}
+
+
+def test_sort_by_competition(keywordstool_response):
+    ascending = related(keywordstool_response, sortBy="competition", descending=False)
+    order = [main.COMPETITION_ORDER[row["competition"]] for row in ascending]
+    assert order == sorted(order)
+    assert order[0] < order[-1]
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ("청라 영어학원", ("영어학원", ("청라",))),
+    ("인천 서구 영어학원", ("영어학원", ("인천", "서구"))),
+    ("영어학원", ("영어학원", ())),
+    ("  청라   수학학원 ", ("수학학원", ("청라",))),
+])
+def test_strip_regions(keyword, expected):
+    assert main.strip_regions(keyword) == expected
+
+
+def grouped_rows(keywordstool_response, count):
+    """픽스처에서 '...학원' 행을 골라 묶음 응답 구성 (맨 앞 행은 다른 키워드)"""
+    rows = keywordstool_response["data"]["keywordList"]
+    academies = [row for row in rows[1:] if row["relKeyword"].endswith("학원") and len(row["relKeyword"]) > 3][:count]
+    return [rows[0], *academies], academies
+
+
+def test_grouped_lookup_selects_each_keywords_own_row(keywordstool_response, monkeypatch):
+    rows, academies = grouped_rows(keywordstool_response, 3)
+
+    async def keywordstool_get(hint_keywords):
+        return main.httpx.Response(200, json={"keywordList": rows})
+
+    monkeypatch.setattr(main, "keywordstool_get", keywordstool_get)
+    # 요청 키워드는 공백이 있고 keywordstool 행은 공백 없이 반환됨
+    keywords = [row["relKeyword"][:-2] + " " + row["relKeyword"][-2:] for row in academies]
+    grouped = main.asyncio.run(main.fetch_naver_api_group(keywords))
+    assert list(grouped) == keywords
+    for keyword, row in zip(keywords, academies):
+        volume = main.parse_search_volume_extended(grouped[keyword], keyword, core_keyword=keyword)
+        assert volume["matchedKeyword"] == row["relKeyword"]
+        assert volume["monthlyAvg"] == main.keyword_metrics(row)["total"]
+        assert grouped[keyword]["data"]["keywordList"][0] == row
+
+
+def test_grouped_lookup_skips_keywords_without_own_row(keywordstool_response, monkeypatch):
+    rows, academies = grouped_rows(keywordstool_response, 1)
+
+    async def keywordstool_get(hint_keywords):
+        return main.httpx.Response(200, json={"keywordList": rows})
+
+    monkeypatch.setattr(main, "keywordstool_get", keywordstool_get)
+    grouped = main.asyncio.run(main.fetch_naver_api_group([academies[0]["relKeyword"], "없는키워드"]))
+    assert list(grouped) == [academies[0]["relKeyword"]]
+
+
+COMPETITORS = [
+    {"rank": 1, "name": "청라 영어학원", "category": "영어교육"},
+    {"rank": 2, "name": "수학의 정석 학원", "category": "수학교육"},
+    {"rank": 3, "name": "청라 한우 고기집", "category": "한식"},
+    {"rank": 4, "name": "로스터리 커피", "category": "카페"},
+    {"rank": 5, "name": "바른 치과의원", "category": "치과"},
+]
+
+
+def test_competitor_keywords_are_deterministic():
+    first = main.extract_competitor_keywords(COMPETITORS)
+    main.COMPETITOR_RULES._results.clear()  # 메모이제이션 없이 다시 계산해도 같은 결과
+    second = main.extract_competitor_keywords(list(reversed(COMPETITORS)))
+    assert first == list(reversed(second))
+    assert main.summarize_competitor_keywords(first) == main.summarize_competitor_keywords(second)
+
+
+def test_competitor_keywords_by_industry():
+    entries = {entry["businessName"]: entry for entry in main.extract_competitor_keywords(COMPETITORS)}
+    assert entries["청라 영어학원"]["industry"] == "academy"
+    assert entries["청라 영어학원"]["keywords"][0] == "영어학원"
+    assert "청라학원" in entries["청라 영어학원"]["keywords"]
+    assert entries["청라 한우 고기집"]["industry"] == "restaurant"
+    assert "청라맛집" in entries["청라 한우 고기집"]["keywords"]
+    assert entries["로스터리 커피"]["industry"] == "cafe"
+    assert entries["바른 치과의원"]["industry"] == "clinic"
+    for entry in entries.values():
+        scores = [item["score"] for item in entry["scoredKeywords"]]
+        assert scores == sorted(scores, reverse=True)
+        assert len(entry["keywords"]) <= main.COMPETITOR_RULES.max_keywords
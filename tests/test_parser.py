@@ -0,0 +1,139 @@
+import asyncio
+import concurrent.futures
+import os
+
+import pytest
+
+import main
+import serp_parser
+from conftest import FIXTURES_DIR
+
+with open(os.path.join(FIXTURES_DIR, "serp", "chungra_english_academy.html"), encoding="utf-8") as f:
+    SERP_HTML = f.read()
+
+BACKENDS = sorted(main.PARSER_BACKENDS)
+
+
+@pytest.fixture(autouse=True)
+def fresh_selector_cache():
+    serp_parser.selector_cache.reset()
+    yield
+    serp_parser.selector_cache.reset()
+
+
+def names(html, backend):
+    return [place["name"] for place in main.parse_place_list(html, main.PARSER_BACKENDS[backend])["competitors"]]
+
+
+def place_list_page(container_class, place_names, prefix=""):
+    items = "".join(f'<li><a class="place_bluelink" href="https://m.place.naver.com/place/{i}">{name}</a></li>' for i, name in enumerate(place_names, 1))
+    return f'<html><body>{prefix}<div class="{container_class}"><ul>{items}</ul></div></body></html>'
+
+
+NAV = '<ul class="tab_list"><li><a href="/news">탭</a></li></ul>'
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fixture_parses_top_10(backend):
+    result = main.parse_place_list(SERP_HTML, main.PARSER_BACKENDS[backend])
+    assert not result.get("blocked")
+    competitors = result["competitors"]
+    assert [place["rank"] for place in competitors] == list(range(1, 11))
+    assert competitors[0] == {
+        "rank": 1, "name": "청라 영어학원", "category": "영어교육", "reviewCount": 334,
+        "url": "https://m.place.naver.com/place/1100000000"
+    }
+
+
+def test_backends_agree_on_fixture():
+    results = {backend: main.parse_place_list(SERP_HTML, main.PARSER_BACKENDS[backend])["competitors"] for backend in BACKENDS}
+    assert all(result == results["bs4"] for result in results.values())
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_selector_cache_relearns_after_markup_change(backend):
+    old_markup = place_list_page("list_image_type", ["이전1", "이전2"])
+    new_markup = place_list_page("place_didyoumean", ["새1", "새2"])
+    assert names(old_markup, backend) == ["이전1", "이전2"]
+    assert serp_parser.selector_cache.learned[(backend, "container")] == 1
+    # 기억한 선택자가 더 이상 맞지 않으면 우선순위대로 다시 찾아 학습
+    assert names(new_markup, backend) == ["새1", "새2"]
+    assert serp_parser.selector_cache.learned[(backend, "container")] == 0
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_catch_all_container_is_not_learned(backend):
+    # 플레이스 블록이 없는 페이지에서 범용 선택자가 일치해도 기억하지 않음
+    names(f"<html><body>{NAV}</body></html>", backend)
+    assert (backend, "container") not in serp_parser.selector_cache.learned
+    page = place_list_page("place_didyoumean", ["업체1", "업체2", "업체3"], prefix=NAV)
+    assert names(page, backend) == ["업체1", "업체2", "업체3"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_learned_container_without_place_links_is_rescanned(backend):
+    names(place_list_page("api_subject_bx", ["업체1"]), backend)
+    assert serp_parser.selector_cache.learned[(backend, "container")] == 3
+    # 기억한 선택자(api_subject_bx)가 뉴스 목록에 먼저 일치해도 플레이스 링크가 없으면 전체 후보 확인
+    news = '<div class="api_subject_bx"><ul><li><a href="/news/1">뉴스</a></li></ul></div>'
+    page = place_list_page("place_didyoumean", ["업체1", "업체2"], prefix=news)
+    assert names(page, backend) == ["업체1", "업체2"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_field_uses_document_order(backend):
+    learned = '<html><body><div class="place_didyoumean"><ul><li><a href="https://m.place.naver.com/place/1"><span class="tit">A</span></a></li></ul></div></body></html>'
+    both = '<html><body><div class="place_didyoumean"><ul><li><a href="https://m.place.naver.com/place/1"><span class="place_bluelink">B</span><span class="tit">부제</span></a></li></ul></div></body></html>'
+    names(learned, backend)
+    assert names(both, backend) == ["B"]
+
+
+def test_recheck_interval_ignores_learned_selector():
+    cache = serp_parser.SelectorCache(recheck_interval=3)
+    assert [cache.start("bs4") for _ in range(6)] == [True, True, False, True, True, False]
+    assert serp_parser.SelectorCache(recheck_interval=0).start("bs4") is True
+
+
+class BrokenPool:
+    """모든 작업이 BrokenProcessPool로 끝나는 가짜 풀"""
+
+    def __init__(self):
+        self.closed = False
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        future.set_exception(main.BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.closed = True
+
+
+def test_broken_parse_pool_rebuilt_once(monkeypatch):
+    broken, rebuilt = BrokenPool(), BrokenPool()
+    opened = []
+
+    async def open_parse_pool():
+        opened.append(rebuilt)
+        await asyncio.sleep(0.01)  # 워밍업 중
+        main.PARSE_POOL = rebuilt
+
+    monkeypatch.setattr(main, "open_parse_pool", open_parse_pool)
+    monkeypatch.setattr(main, "PARSE_POOL", broken)
+    monkeypatch.setattr(main, "PARSE_POOL_LOCK", asyncio.Lock())
+    monkeypatch.setattr(main, "PARSE_POOL_REBUILD", None)
+    raw = SERP_HTML.encode("utf-8")
+
+    async def scenario():
+        # 같은 손상 풀에서 동시에 실패한 요청들
+        results = await asyncio.gather(*[main.parse_serp(raw, "utf-8") for _ in range(3)])
+        await main.PARSE_POOL_REBUILD
+        # 재생성 후 늦게 실패한 요청이 새 풀을 닫지 않아야 함
+        main.schedule_parse_pool_rebuild(broken)
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(len(result["competitors"]) == 10 for result in results)
+    assert opened == [rebuilt]
+    assert broken.closed
+    assert main.PARSE_POOL is rebuilt and not rebuilt.closed
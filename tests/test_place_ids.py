@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("url", [
+    "https://m.place.naver.com/restaurant/1234567/home",
+    "https://m.place.naver.com/place/1234567",
+    "https://m.place.naver.com/hairshop/1234567/review/visitor",
+    "https://pcmap.place.naver.com/place/1234567/home?entry=pll",
+    "https://map.naver.com/p/entry/place/1234567?c=15.00,0,0,0,dh",
+    "https://map.naver.com/v5/search/영어학원?placeId=1234567",
+    "1234567",
+    " 1234567 ",
+])
+def test_extract_place_id(url):
+    assert main.extract_place_id(url) == "1234567"
+
+
+@pytest.mark.parametrize("url", ["https://naver.me/xYz12", "https://blog.naver.com/someone/22345", ""])
+def test_extract_place_id_without_id(url):
+    assert main.extract_place_id(url) is None
+
+
+@pytest.fixture
+def shortlink(monkeypatch):
+    """naver.me/<code> → redirects[code] 로 리다이렉트하는 단축 URL 서버"""
+    redirects = {}
+
+    def handler(request):
+        code = request.url.path.strip("/")
+        if request.url.host == "naver.me" and code in redirects:
+            return httpx.Response(302, headers={"location": redirects[code]})
+        return httpx.Response(200, text="ok")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setitem(main.UPSTREAM_HOSTS, "shortlink", "https://naver.me")
+    monkeypatch.setattr(main, "get_http_client", lambda name: client)
+    return redirects
+
+
+def test_short_link_follows_naver_hosts_only(shortlink):
+    shortlink["good"] = "https://m.place.naver.com/place/1234567/home"
+    shortlink["lookalike"] = "https://xnaver.com/place/7654321"
+    shortlink["bare"] = "https://naver.com/place/2345678"
+    assert asyncio.run(main.resolve_short_link("https://naver.me/good")) == "1234567"
+    assert asyncio.run(main.resolve_short_link("https://naver.me/lookalike")) is None
+    assert asyncio.run(main.resolve_short_link("https://naver.me/bare")) == "2345678"
+
+
+def test_is_naver_host():
+    assert main.is_naver_host("naver.com")
+    assert main.is_naver_host("m.place.naver.com")
+    assert not main.is_naver_host("xnaver.com")
+    assert not main.is_naver_host("naver.com.evil.example")
+
+
+def test_rank_history_keyed_by_place_id(tmp_path, monkeypatch, shortlink):
+    shortlink["abc"] = "https://m.place.naver.com/restaurant/1234567"
+    store = main.RankHistoryStore(str(tmp_path / "history.sqlite3"))
+    monkeypatch.setattr(main, "rank_history", store)
+    forms = [
+        "https://m.place.naver.com/restaurant/1234567/home",
+        "https://pcmap.place.naver.com/restaurant/1234567/home",
+        "https://naver.me/abc",
+    ]
+
+    async def scenario():
+        for fetched_at, url in enumerate(forms, 1):
+            place_ids = await main.resolve_place_ids([url])
+            store.record("청라 맛집", fetched_at, [], {url: fetched_at}, place_ids)
+            await store.close()
+        return [await main.ranking_history("청라 맛집", placeUrl=url, since=0, until=10, bucket="raw") for url in forms]
+
+    results = asyncio.run(scenario())
+    # 세 형식 모두 같은 시계열 하나
+    for result in results:
+        assert [point["bestRank"] for point in result["series"]] == [1, 2, 3]
+
+
+def test_rank_history_migrates_url_keys(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    store = main.RankHistoryStore(path)
+    conn = store._connect()
+    conn.execute("PRAGMA user_version = 0")
+    conn.executemany(
+        "INSERT INTO rank_snapshots (keyword, place_url, fetched_at, my_rank) VALUES (?, ?, ?, ?)",
+        [
+            ("영어학원", "https://m.place.naver.com/place/111", 1, 3),
+            ("영어학원", "https://pcmap.place.naver.com/place/111", 2, 4),
+            ("영어학원", "https://pcmap.place.naver.com/place/111", 1, 3),  # 같은 크롤링 중복
+            ("영어학원", "https://naver.me/unresolved", 1, None),
+            ("영어학원", "", 1, None),  # 대상 없이 분석한 크롤링
+        ]
+    )
+    asyncio.run(store.close())
+
+    migrated = main.RankHistoryStore(path)
+    rows = migrated._query("SELECT place_url, fetched_at, my_rank FROM rank_snapshots ORDER BY place_url, fetched_at", ())
+    assert rows == [("111", 1, 3), ("111", 2, 4), ("https://naver.me/unresolved", 1, None)]
+    asyncio.run(migrated.close())
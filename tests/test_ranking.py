@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+def place_page(place_ids):
+    items = "".join(
+        f'<li><a class="place_bluelink" href="https://m.place.naver.com/place/{place_id}/home">업체{place_id}</a></li>'
+        for place_id in place_ids
+    )
+    return f'<html><body><div class="place_didyoumean"><ul>{items}</ul></div></body></html>'
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """start= 파라미터로 페이지를 나누는 가짜 모바일 SERP (overlap: 앞 페이지와 겹치는 업체 수)"""
+    state = {"total": 35, "overlap": 0, "starts": []}
+
+    def handler(request):
+        start = int(request.url.params.get("start", "1"))
+        state["starts"].append(start)
+        first = max(1, start - (state["overlap"] if start > 1 else 0))
+        place_ids = range(first, min(first + main.SERP_PAGE_SIZE, state["total"] + 1))
+        return httpx.Response(200, html=place_page(place_ids))
+
+    def crawl(keyword, target_urls, depth):
+        async def scenario():
+            for cache in main.CACHES.values():
+                await cache.clear()
+            main.HTTP_CLIENTS["serp"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await main.crawl_place_ranking(keyword, target_urls, depth)
+            finally:
+                await main.close_http_clients()
+
+        return asyncio.run(scenario())
+
+    state["crawl"] = crawl
+    return state
+
+
+def target(place_id):
+    return f"https://m.place.naver.com/place/{place_id}"
+
+
+def test_deep_rank_dedups_overlap_and_renumbers(upstream):
+    upstream["overlap"] = 2  # 페이지 사이에 순위가 밀려 앞 페이지 마지막 2개가 다시 나옴
+    result = upstream["crawl"]("겹침", [target(5), target(25)], 50)
+    assert result["myRanks"] == {target(5): 5, target(25): 25}
+    assert [place["rank"] for place in result["competitors"]] == list(range(1, 11))
+    assert result["searchedDepth"] == 28
+    assert upstream["starts"][:3] == [1, 11, 21]
+
+
+def test_stops_when_all_targets_found(upstream, monkeypatch):
+    monkeypatch.setattr(main, "RANK_PAGE_CONCURRENCY", 1)
+    result = upstream["crawl"]("조기 종료", [target(12)], 100)
+    assert result["myRank"] == 12
+    assert result["searchedDepth"] == 20
+    assert upstream["starts"] == [1, 11]
+
+
+def test_stops_at_last_page(upstream, monkeypatch):
+    monkeypatch.setattr(main, "RANK_PAGE_CONCURRENCY", 1)
+    upstream["total"] = 25
+    result = upstream["crawl"]("마지막 페이지", [target(99)], 100)
+    assert result["myRank"] is None
+    assert result["searchedDepth"] == 25
+    assert upstream["starts"] == [1, 11, 21]  # 짧은 페이지에서 멈춤
+
+
+def test_depth_limits_search(upstream):
+    result = upstream["crawl"]("깊이 제한", [target(17)], 15)
+    assert result["myRank"] is None
+    assert result["searchedDepth"] == 15
+    assert upstream["starts"] == [1, 11]
+
+
+def test_first_page_only_without_deep_depth(upstream):
+    result = upstream["crawl"]("1페이지", [target(17)], 10)
+    assert result["myRank"] is None
+    assert result["searchedDepth"] == 10
+    assert upstream["starts"] == [1]
@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+def counting_factory(state, result="결과", delay=0.01):
+    async def call():
+        state["calls"] += 1
+        await asyncio.sleep(delay)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    return call
+
+
+def test_concurrent_identical_calls_coalesce():
+    flight = main.SingleFlight("test")
+    state = {"calls": 0}
+
+    async def scenario():
+        return await asyncio.gather(*[flight.do("키", counting_factory(state)) for _ in range(20)])
+
+    assert asyncio.run(scenario()) == ["결과"] * 20
+    assert state["calls"] == 1
+    assert flight.stats() == {"calls": 1, "shared": 19, "inflight": 0}
+
+
+def test_different_keys_and_later_calls_are_separate():
+    flight = main.SingleFlight("test")
+    state = {"calls": 0}
+
+    async def scenario():
+        await asyncio.gather(flight.do("a", counting_factory(state)), flight.do("b", counting_factory(state)))
+        await flight.do("a", counting_factory(state))  # 끝난 호출은 재사용하지 않음 (결과 보관은 캐시 역할)
+
+    asyncio.run(scenario())
+    assert state["calls"] == 3
+
+
+def test_error_reaches_every_waiter():
+    flight = main.SingleFlight("test")
+    state = {"calls": 0}
+
+    async def scenario():
+        factory = counting_factory(state, RuntimeError("업스트림 오류"))
+        return await asyncio.gather(*[flight.do("키", factory) for _ in range(5)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert state["calls"] == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = main.SingleFlight("test")
+    state = {"calls": 0}
+
+    async def scenario():
+        factory = counting_factory(state, delay=0.05)
+        impatient = asyncio.ensure_future(flight.do("키", factory))
+        patient = asyncio.ensure_future(flight.do("키", factory))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(scenario()) == "결과"
+    assert state["calls"] == 1
+
+
+def test_concurrent_serp_requests_make_one_upstream_call():
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, html='<div class="place_didyoumean"><ul><li><a class="place_bluelink" href="https://m.place.naver.com/place/1">업체1</a></li></ul></div>')
+
+    async def scenario():
+        await main.serp_cache.clear()
+        main.HTTP_CLIENTS["serp"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await asyncio.gather(*[main.load_ranking_page("동시 요청", 1) for _ in range(10)])
+        finally:
+            await main.close_http_clients()
+
+    results = asyncio.run(scenario())
+    assert len(requests) == 1
+    assert all(result["competitors"][0]["name"] == "업체1" for result in results)
@@ -0,0 +1,44 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+class RecordingStore:
+    def __init__(self):
+        self.records = []
+
+    def record(self, *args):
+        self.records.append(args)
+
+
+def test_register_rejected_when_tracker_disabled(monkeypatch):
+    monkeypatch.setattr(main, "TRACKER_ENABLED", False)
+    response = TestClient(main.app).post("/tracking/targets", json={"keyword": "청라 영어학원"})
+    assert response.status_code == 503
+    assert not main.rank_tracker.targets
+
+
+def run_tracker_once(monkeypatch, history_enabled):
+    async def crawl(keyword, target_urls=(), depth=None):
+        return {"success": True, "fetchedAt": 1.0, "competitors": [], "myRank": 3, "placeIds": {}}
+
+    monkeypatch.setattr(main, "crawl_place_ranking", crawl)
+    monkeypatch.setattr(main, "RANK_HISTORY_ENABLED", history_enabled)
+    store = RecordingStore()
+    tracker = main.RankTracker(store, 1, 0)
+    target = tracker._register("청라 영어학원", "1100015838", 3600, 0)
+    asyncio.run(tracker._run(("청라 영어학원", "1100015838"), target))
+    return store, target
+
+
+def test_tracker_skips_history_when_disabled(monkeypatch):
+    store, target = run_tracker_once(monkeypatch, False)
+    assert store.records == []
+    assert target["lastRank"] == 3
+
+
+def test_tracker_records_history(monkeypatch):
+    store, target = run_tracker_once(monkeypatch, True)
+    assert [args[3] for args in store.records] == [{"1100015838": 3}]
@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = main.CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    monkeypatch.setattr(main, "keywordstool_breaker", breaker)
+    monkeypatch.setattr(main, "keywordstool_limiter", main.TokenBucket(1000, 1000))
+    return breaker
+
+
+def stub_requests(monkeypatch, *outcomes):
+    """keywordstool_request가 outcomes를 차례로 반환/발생 (마지막 값 반복)"""
+    calls = []
+
+    async def request(hint_keywords):
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(hint_keywords)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(main, "keywordstool_request", request)
+    return calls
+
+
+def expire(breaker):
+    breaker.opened_at -= breaker.open_seconds
+
+
+def test_breaker_state_transitions(breaker):
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(main.UpstreamUnavailableError):
+        breaker.check()
+
+    expire(breaker)
+    assert breaker.state == "half_open"
+    assert breaker.check() is True
+    # 시험 호출 중에는 다른 호출 차단
+    with pytest.raises(main.UpstreamUnavailableError):
+        breaker.check()
+    # 시험 호출 실패 → 다시 열림
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    expire(breaker)
+    assert breaker.check() is True
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.check() is False
+
+
+def test_long_retry_after_fails_fast_and_opens_breaker(breaker, monkeypatch):
+    calls = stub_requests(monkeypatch, httpx.Response(429, headers={"Retry-After": "60"}))
+    response = asyncio.run(main.keywordstool_get("영어학원"))
+    assert response.status_code == 429
+    assert len(calls) == 1  # 8초 뒤 재시도하지 않음
+    assert breaker.state == "open"
+    assert breaker.open_seconds == 60
+    with pytest.raises(main.UpstreamUnavailableError):
+        asyncio.run(main.keywordstool_get("영어학원"))
+
+
+def test_short_retry_after_is_honoured(breaker, monkeypatch):
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(main.asyncio, "sleep", sleep)
+    stub_requests(monkeypatch, httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200, json={}))
+    assert asyncio.run(main.keywordstool_get("영어학원")).status_code == 200
+    assert sleeps == [2.0]
+
+
+def test_trial_flag_cleared_when_trial_raises(breaker, monkeypatch):
+    breaker.record_failure()
+    breaker.record_failure()
+    expire(breaker)
+    stub_requests(monkeypatch, httpx.DecodingError("bad body"))
+    with pytest.raises(httpx.DecodingError):
+        asyncio.run(main.keywordstool_get("영어학원"))
+    # 시험 호출이 예외로 끝나도 다음 호출이 다시 시험할 수 있어야 함
+    stub_requests(monkeypatch, httpx.Response(200, json={}))
+    assert asyncio.run(main.keywordstool_get("영어학원")).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_client_error_does_not_reset_breaker(breaker, monkeypatch):
+    breaker.record_failure()
+    stub_requests(monkeypatch, httpx.Response(400, json={}))
+    assert asyncio.run(main.keywordstool_get("영어학원")).status_code == 400
+    assert breaker.failures == 1
+
+
+def test_region_fallback_skipped_after_upstream_error(breaker, monkeypatch):
+    async def sleep(delay):
+        pass
+
+    monkeypatch.setattr(main.asyncio, "sleep", sleep)
+    monkeypatch.setattr(main, "keywordstool_breaker", main.CircuitBreaker("test", failure_threshold=100, reset_timeout=30))
+    calls = stub_requests(monkeypatch, httpx.Response(503, text="busy"))
+    result = asyncio.run(main.fetch_naver_api("청라 영어학원"))
+    assert not result["success"]
+    assert "503" in result["error"]
+    # 원본 조회 재시도만 하고 지역명 제거 조회는 하지 않음
+    assert calls == ["청라 영어학원"] * (main.KEYWORDSTOOL_MAX_RETRIES + 1)
+
+
+def test_region_fallback_after_empty_result(breaker, monkeypatch):
+    row = {"relKeyword": "영어학원", "monthlyPcQcCnt": 10, "monthlyMobileQcCnt": 20}
+    calls = stub_requests(monkeypatch, httpx.Response(200, json={"keywordList": []}), httpx.Response(200, json={"keywordList": [row]}))
+    result = asyncio.run(main.fetch_naver_api("청라 영어학원"))
+    assert result["success"]
+    assert result["matched_keyword"] == "영어학원"
+    assert calls == ["청라 영어학원", "영어학원"]